@@ -0,0 +1,145 @@
+# apps/change_log.py
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+from apps.resource_index import row_identity
+from utils import codec
+
+# ------------------------------------------------------------
+# Logging
+# ------------------------------------------------------------
+logger = logging.getLogger("change_log")
+
+# ------------------------------------------------------------
+# 설정
+# - CHANGES_LOG_MAX   : 보관할 변경 이벤트 수 (이보다 오래된 커서는 reset=true로 전체 재동기화 요구)
+# - CHANGES_PAGE_MAX  : /changes 한 번에 돌려줄 최대 이벤트 수
+# ------------------------------------------------------------
+CHANGES_LOG_MAX = int(os.getenv("CHANGES_LOG_MAX", "50000"))
+CHANGES_PAGE_MAX = int(os.getenv("CHANGES_PAGE_MAX", "10000"))
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _content_hash(item: Any) -> str:
+    # 캐시 본문과 같은 정렬된 JSON 직렬화 기준이라 키 순서/타입 표현 차이로 거짓 변경이 생기지 않는다
+    return hashlib.blake2b(codec.dumps(item), digest_size=16).hexdigest()
+
+
+def _identities(resource: str, data: Any) -> Dict[str, Any]:
+    """
+    스냅샷 데이터를 식별자 -> 항목으로 펼친다.
+    - 목록: ARN 컬럼, 없으면 상세 조회 키 컬럼(+ 리전), 둘 다 없으면 첫 컬럼 값
+    - dict(feature_groups): 키가 곧 식별자
+    """
+    if isinstance(data, dict):
+        return {str(k): v for k, v in data.items()}
+    if not isinstance(data, list):
+        return {}
+    return {row_identity(resource, row): row for row in data if isinstance(row, dict)}
+
+
+class ChangeLog:
+    """
+    스냅샷 갱신 사이의 리소스 단위 변경 기록.
+    - 리소스 타입별로 (식별자 -> 내용 해시)를 유지하고, 새 스냅샷이 오면 비교해 added/modified/removed 이벤트를 남긴다
+    - 이벤트는 단조 증가 seq를 갖고 링 버퍼(CHANGES_LOG_MAX)에 보관
+    - 커서는 "<epoch>-<seq>" 형태: 프로세스가 재시작되면 epoch가 바뀌어 이전 커서는 reset 처리된다
+    - 처음 로드되는 리소스는 모든 항목이 added로 기록된다 (그 전에 동기화한 클라이언트도 놓치지 않도록)
+    """
+
+    def __init__(self, max_events: int = CHANGES_LOG_MAX):
+        self.epoch = format(int(time.time() * 1000), "x")
+        self._events: deque[dict] = deque(maxlen=max_events)
+        self._hashes: Dict[str, Dict[str, str]] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    # ── 커서 ────────────────────────────────────────────────
+    def cursor(self, seq: Optional[int] = None) -> str:
+        return f"{self.epoch}-{self._seq if seq is None else seq}"
+
+    def _parse_cursor(self, cursor: str) -> Optional[int]:
+        """현재 epoch의 seq, 다른 epoch(재시작 전)면 None"""
+        epoch, sep, seq = cursor.rpartition("-")
+        if not sep or not seq.isdigit():
+            raise InvalidCursor(f"invalid cursor: {cursor}")
+        return int(seq) if epoch == self.epoch else None
+
+    # ── 기록 (스냅샷 리스너, 스레드에서 호출) ─────────────────────
+    def update(self, resource: str, data: Any):
+        items = _identities(resource, data)
+        hashes = {ident: _content_hash(item) for ident, item in items.items()}
+        with self._lock:
+            previous = self._hashes.get(resource, {})
+            now = time.time()
+            for ident, h in hashes.items():
+                old = previous.get(ident)
+                if old == h:
+                    continue
+                self._append(resource, ident, "added" if old is None else "modified", items[ident], now)
+            for ident in previous.keys() - hashes.keys():
+                self._append(resource, ident, "removed", None, now)
+            self._hashes[resource] = hashes
+
+    def _append(self, resource: str, ident: str, op: str, item: Any, ts: float):
+        self._seq += 1
+        event = {"seq": self._seq, "resource": resource, "id": ident, "op": op, "ts": ts}
+        if item is not None:
+            event["item"] = item
+        self._events.append(event)
+
+    # ── 조회 ────────────────────────────────────────────────
+    def since(self, cursor: Optional[str], limit: int = CHANGES_PAGE_MAX,
+              resources: Optional[set[str]] = None) -> Dict[str, Any]:
+        """
+        cursor 이후 변경 이벤트.
+        cursor가 없거나, 재시작 전 것이거나, 링 버퍼에서 밀려난 경우 reset=true
+        (클라이언트는 /all-resources로 전체를 받은 뒤 next_cursor부터 이어서 동기화).
+        """
+        with self._lock:
+            current = self._seq
+            seq = self._parse_cursor(cursor) if cursor else None
+            oldest = self._events[0]["seq"] if self._events else current + 1
+            if seq is None or seq > current or seq < oldest - 1:
+                return {"reset": True, "changes": [], "next_cursor": self.cursor(current), "has_more": False}
+
+            changes: List[dict] = []
+            last = seq
+            # 링 버퍼의 seq는 연속이므로 시작 위치를 바로 계산할 수 있다
+            start = seq - oldest + 1
+            for event in islice(self._events, max(start, 0), None):
+                last = event["seq"]
+                if resources is None or event["resource"] in resources:
+                    changes.append(event)
+                    if len(changes) >= limit:
+                        break
+            truncated = len(changes) >= limit and last < current
+            return {
+                "reset": False,
+                "changes": changes,
+                "next_cursor": self.cursor(last if truncated else current),
+                "has_more": truncated,
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cursor": self.cursor(),
+                "events": len(self._events),
+                "oldest_seq": self._events[0]["seq"] if self._events else None,
+                "tracked": {name: len(h) for name, h in self._hashes.items()},
+            }
+
+
+change_log = ChangeLog()
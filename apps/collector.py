@@ -1,13 +1,14 @@
 # collector.py
-from sqlalchemy import create_engine, text
-from sqlalchemy.exc import OperationalError
-import numpy as np
-import math
-import pandas as pd
-import boto3
+from __future__ import annotations
+import asyncio
+import re
+import time
+import threading
 import os
 import logging
 
+from utils import steampipe
+
 # ------------------------------------------------------------
 # Logging
 # ------------------------------------------------------------
@@ -16,114 +17,198 @@ if not logger.handlers:
     logging.basicConfig(level=logging.INFO)
 
 # ------------------------------------------------------------
-# Steampipe PostgreSQL 연결
+# Steampipe PostgreSQL 연결 (utils/steampipe.py 공용 엔진/풀 사용)
 # ------------------------------------------------------------
-def _build_steampipe_url() -> str:
-    url = os.getenv("STEAMPIPE_DB_URL")
-    if url:
-        return url
+SKIP_MARKERS = (
+    "OptInRequired",
+    "SubscriptionRequiredException",
+    "AccessDenied",
+    "UnauthorizedOperation",
+    "AuthFailure",
+    "ExpiredToken",
+    "AccessDeniedException",
+    "Throttling",  # 혹시 모를 과금/제한
+)
 
-    user = os.getenv("STEAMPIPE_DB_USER", "steampipe")
-    password = os.getenv("STEAMPIPE_DB_PASSWORD", "")
-    host = os.getenv("STEAMPIPE_DB_HOST", "localhost")
-    port = os.getenv("STEAMPIPE_DB_PORT", "9193")
-    name = os.getenv("STEAMPIPE_DB_NAME", "steampipe")
-    credentials = f"{user}:{password}" if password else user
-    return f"postgresql://{credentials}@{host}:{port}/{name}"
+# SKIP_MARKERS 중 잠시 후 다시 시도하면 풀리는 오류 (스냅샷은 이전 데이터를 유지하고 재시도)
+TRANSIENT_SKIP_MARKERS = ("Throttling", "ExpiredToken")
 
-engine = create_engine(_build_steampipe_url())
+def _is_blocked(msg: str) -> bool:
+    """opt-in 안 된 리전/권한 없음처럼 재시도해도 같은 결과인 오류 → 정상적인 빈 결과로 취급"""
+    return any(m in msg for m in SKIP_MARKERS) and not any(m in msg for m in TRANSIENT_SKIP_MARKERS)
+
+def _handle_fetch_error(e: Exception):
+    """OptIn/권한 오류와 연결 실패는 빈 결과로, 그 외는 그대로 올림(디버그 필요)"""
+    msg = str(e)
+    if any(m in msg for m in SKIP_MARKERS):
+        logger.warning(f"Steampipe query skipped (opt-in/permission): {msg.splitlines()[0]}")
+        return []
+    if steampipe.is_connection_error(e):
+        logger.error(f"Steampipe connection failed: {e}")
+        return []
+    raise e
 
 def fetch(query: str):
     """
     Steampipe PostgreSQL에서 쿼리 실행 후 결과 반환.
+    DataFrame을 거치지 않고 커서에서 배치 단위로 읽어 바로 dict로 변환한다.
     OptIn/권한 오류는 건너뛰고 빈 리스트 반환하여 API가 500으로 터지지 않도록 방어.
     """
-    SKIP_MARKERS = (
-        "OptInRequired",
-        "SubscriptionRequiredException",
-        "AccessDenied",
-        "UnauthorizedOperation",
-        "AuthFailure",
-        "ExpiredToken",
-        "AccessDeniedException",
-        "Throttling",  # 혹시 모를 과금/제한
-    )
     try:
-        with engine.connect() as conn:
-            try:
-                df = pd.read_sql_query(text(query), conn, params=())
-                # pandas -> dict 변환 시 NaN/NaT/inf가 남으면 JSON 직렬화에서 ValueError 발생하므로 None으로 치환
-                df = df.replace({np.nan: None, np.inf: None, -np.inf: None})
-                df = df.where(pd.notnull(df), None)
-                data = df.to_dict(orient="records")
-
-                def _sanitize(val):
-                    if isinstance(val, float):
-                        if math.isnan(val) or math.isinf(val):
-                            return None
-                        return val
-                    if isinstance(val, list):
-                        return [_sanitize(v) for v in val]
-                    if isinstance(val, dict):
-                        return {k: _sanitize(v) for k, v in val.items()}
-                    return val
-
-                return [_sanitize(row) for row in data]
-            except Exception as e:
-                msg = str(e)
-                if any(m in msg for m in SKIP_MARKERS):
-                    logger.warning(f"Steampipe query skipped (opt-in/permission): {msg.splitlines()[0]}")
-                    return []
-                # 알 수 없는 예외는 그대로 올림(디버그 필요)
-                raise
-    except OperationalError as e:
-        logger.error(f"Steampipe connection failed: {e}")
-        return []
+        return steampipe.query(query)
+    except Exception as e:
+        return _handle_fetch_error(e)
+
+async def afetch(query: str, raise_errors: bool = False):
+    """
+    fetch의 비동기 버전 (asyncpg, 스레드 미사용).
+    raise_errors=True면 연결/스로틀링 등 일시적인 오류는 빈 결과로 바꾸지 않고 올린다
+    (스냅샷 수집기용: 실패를 "리소스 0개"로 저장하면 이전 데이터와 오류 정보가 사라진다).
+    opt-in/권한 오류는 재시도해도 그대로이므로 이 경우에도 빈 결과
+    """
+    try:
+        return await steampipe.aquery(query)
+    except Exception as e:
+        if raise_errors and not _is_blocked(str(e)):
+            raise
+        return _handle_fetch_error(e)
 
 # ------------------------------------------------------------
 # opt-in 리전 로딩 & 필터 헬퍼
 # ------------------------------------------------------------
-def get_opted_in_regions():
-    """aws_region에서 opt-in된 리전만 로딩 (환경변수 ALLOWED_REGIONS 우선)"""
-    env = os.getenv("ALLOWED_REGIONS")
-    if env:
-        regions = [r.strip() for r in env.split(",") if r.strip()]
-        return regions
+# - ALLOWED_REGIONS     : 쉼표 구분 리전 목록 (지정 시 Steampipe 조회 없이 고정)
+# - REGIONS_REFRESH_SEC : Steampipe aws_region 재조회 주기(초)
+# - REGIONS_RETRY_SEC   : 조회 실패 시 폴백 리전을 쓰다가 다시 시도할 간격(초)
+# import 시점에는 아무것도 조회하지 않는다: Steampipe가 아직 안 떠 있어도 앱은 바로 기동되고,
+# 첫 수집 시(또는 /ready) 로딩된다.
+REGIONS_REFRESH_SEC = int(os.getenv("REGIONS_REFRESH_SEC", "3600"))
+REGIONS_RETRY_SEC = int(os.getenv("REGIONS_RETRY_SEC", "60"))
+FALLBACK_REGION = os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION") or "ap-northeast-2"
 
-    try:
-        rows = fetch("""
-            select region
-            from aws_region
-            where opt_in_status in ('opted-in', 'opt-in-not-required')
-        """)
-        return [r["region"] for r in rows]
-    except Exception as e:
-        # 연결 실패 시 서비스가 부팅조차 되지 않는 문제를 막기 위한 안전 장치
-        fallback = os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION") or "ap-northeast-2"
-        logger.warning(f"Steampipe region lookup failed: {e}. Falling back to [{fallback}]")
-        return [fallback]
+_OPTED_IN_REGIONS_SQL = """
+    select region
+    from aws_region
+    where opt_in_status in ('opted-in', 'opt-in-not-required')
+"""
 
-ALLOWED_REGIONS = get_opted_in_regions() or ["ap-northeast-2"]  # 안전 기본값
+def _env_regions() -> list[str]:
+    return [r.strip() for r in os.getenv("ALLOWED_REGIONS", "").split(",") if r.strip()]
 
-DEFAULT_BOTO_REGION = (
-    os.getenv("AWS_REGION")
-    or os.getenv("AWS_DEFAULT_REGION")
-    or (ALLOWED_REGIONS[0] if ALLOWED_REGIONS else "ap-northeast-2")
-)
 
-def region_in_clause(alias: str = "") -> str:
-    """region 컬럼이 있는 테이블에서 쓰는 WHERE 절 스니펫."""
+class RegionProvider:
+    """
+    opt-in 리전 목록 (지연 로딩 + 주기 갱신).
+    - ALLOWED_REGIONS 환경변수가 있으면 그대로 사용
+    - 없으면 Steampipe aws_region 조회 결과를 REGIONS_REFRESH_SEC 동안 캐시
+    - 조회 실패 시: 이전 목록이 있으면 유지, 없으면 [FALLBACK_REGION]으로 응답하고 REGIONS_RETRY_SEC 후 재시도
+    """
+
+    def __init__(self):
+        self.regions: list[str] | None = None
+        self.source: str | None = None  # env | steampipe | fallback
+        self.loaded_at: float | None = None
+        self.last_error: str | None = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._inflight: asyncio.Task | None = None
+
+    def _fresh(self) -> bool:
+        return self.regions is not None and time.monotonic() < self._expires_at
+
+    def _apply(self, rows: list | None, error: Exception | None = None):
+        env = _env_regions()
+        if env:
+            self.regions, self.source, self._expires_at = env, "env", float("inf")
+        elif error is None and rows:
+            self.regions, self.source = [r["region"] for r in rows], "steampipe"
+            self._expires_at = time.monotonic() + REGIONS_REFRESH_SEC
+            self.last_error = None
+        else:
+            self.last_error = str(error).splitlines()[0] if error else "aws_region returned no rows"
+            logger.warning(f"Steampipe region lookup failed: {self.last_error}. Retrying in {REGIONS_RETRY_SEC}s")
+            if self.source != "steampipe":
+                self.regions, self.source = [FALLBACK_REGION], "fallback"
+            self._expires_at = time.monotonic() + REGIONS_RETRY_SEC
+        self.loaded_at = time.time()
+
+    def get(self) -> list[str]:
+        """동기 경로용 (필요하면 이 스레드에서 조회)"""
+        if not self._fresh():
+            with self._lock:
+                if not self._fresh():
+                    if _env_regions():
+                        self._apply(None)
+                    else:
+                        try:
+                            self._apply(steampipe.query(_OPTED_IN_REGIONS_SQL))
+                        except Exception as e:
+                            self._apply(None, e)
+        return self.regions
+
+    async def _aload(self):
+        try:
+            self._apply(await steampipe.aquery(_OPTED_IN_REGIONS_SQL))
+        except Exception as e:
+            self._apply(None, e)
+
+    async def aget(self) -> list[str]:
+        """비동기 경로용 (동시 호출은 조회 하나를 공유)"""
+        if self._fresh():
+            return self.regions
+        if _env_regions():
+            self._apply(None)
+            return self.regions
+        task = self._inflight
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._inflight = asyncio.create_task(self._aload())
+        await asyncio.shield(task)
+        return self.regions
+
+    def invalidate(self):
+        """다음 조회 때 다시 로딩 (폴백 상태에서 Steampipe가 살아난 경우 등)"""
+        self._expires_at = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.source in ("env", "steampipe")
+
+    def status(self) -> dict:
+        return {
+            "regions": self.regions,
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "last_error": self.last_error,
+        }
+
+
+region_provider = RegionProvider()
+
+def allowed_regions() -> list[str]:
+    return region_provider.get()
+
+def get_opted_in_regions():
+    """예전 호출부 호환 (allowed_regions()와 같음)"""
+    return allowed_regions()
+
+def default_boto_region() -> str:
+    return os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION") or allowed_regions()[0]
+
+def region_in_clause(alias: str = "", regions: list[str] | None = None) -> str:
+    """region 컬럼이 있는 테이블에서 쓰는 WHERE 절 스니펫 (regions 미지정 시 allowed_regions())."""
     col = f"{alias}.region" if alias else "region"
-    quoted = ", ".join(f"'{r}'" for r in ALLOWED_REGIONS)
+    regions = regions or allowed_regions()
+    if len(regions) == 1:
+        return f"{col} = '{regions[0]}'"
+    quoted = ", ".join(f"'{r}'" for r in regions)
     return f"{col} in ({quoted})"
 
-def az_matches_allowed(alias: str = "") -> str:
+def az_matches_allowed(alias: str = "", regions: list[str] | None = None) -> str:
     """
     availability_zone만 있는 테이블(EBS 등) 필터.
     '<region>%’ 패턴과 매칭.
     """
     col = f"{alias}.availability_zone" if alias else "availability_zone"
-    values_rows = ", ".join(f"('{r}')" for r in ALLOWED_REGIONS)
+    values_rows = ", ".join(f"('{r}')" for r in (regions or allowed_regions()))
     return f"""exists (
         select 1
         from (values {values_rows}) as v(region)
@@ -131,126 +216,356 @@ def az_matches_allowed(alias: str = "") -> str:
     )"""
 
 # ------------------------------------------------------------
-# AWS 리소스 조회 함수들 (select * + opt-in 필터)
+# 컬럼 프로젝션 프로필
+# - "full"   : select * (기존 동작, 상세/스냅샷용)
+# - "summary": 인벤토리 목록에 필요한 컬럼만 조회
+#   Steampipe는 select된 컬럼에 필요한 hydrate API만 호출하므로
+#   policy/acl/lifecycle 같은 버킷별 추가 호출을 건너뛸 수 있다.
 # ------------------------------------------------------------
-def get_s3_buckets():
-    return fetch(f"""
-        select *
-        from aws_s3_bucket
-        where {region_in_clause()}
-        order by 1;
-    """)
+DEFAULT_PROFILE = "full"
 
-def get_ebs_volumes():
-    return fetch(f"""
-        select *
-        from aws_ebs_volume
-        where {az_matches_allowed()}
-        order by 1;
-    """)
+# 리소스 키 -> (Steampipe 테이블, 리전 필터 헬퍼)
+RESOURCE_TABLES = {
+    "s3_buckets": ("aws_s3_bucket", region_in_clause),
+    "ebs_volumes": ("aws_ebs_volume", az_matches_allowed),
+    "efs_filesystems": ("aws_efs_file_system", region_in_clause),
+    "fsx_filesystems": ("aws_fsx_file_system", region_in_clause),
+    "rds_instances": ("aws_rds_db_instance", region_in_clause),
+    "dynamodb_tables": ("aws_dynamodb_table", region_in_clause),
+    "redshift_clusters": ("aws_redshift_cluster", region_in_clause),
+    "rds_snapshots": ("aws_rds_db_snapshot", region_in_clause),
+    "elasticache_clusters": ("aws_elasticache_cluster", region_in_clause),
+    "glacier_vaults": ("aws_glacier_vault", region_in_clause),
+    "backup_plans": ("aws_backup_plan", region_in_clause),
+    "glue_databases": ("aws_glue_catalog_database", region_in_clause),
+    "kinesis_streams": ("aws_kinesis_stream", region_in_clause),
+    "msk_clusters": ("aws_msk_cluster", region_in_clause),
+}
 
-def get_efs_filesystems():
-    return fetch(f"""
-        select *
-        from aws_efs_file_system
-        where {region_in_clause()}
-        order by 1;
-    """)
+# 첫 컬럼이 정렬 키(order by 1)가 되므로 식별자 컬럼을 맨 앞에 둔다.
+COLUMN_PROFILES = {
+    "s3_buckets": {
+        "summary": ["name", "arn", "region", "account_id", "creation_date"],
+    },
+    "ebs_volumes": {
+        "summary": ["volume_id", "arn", "volume_type", "size", "state", "encrypted",
+                    "kms_key_id", "availability_zone", "region", "create_time", "tags"],
+    },
+    "efs_filesystems": {
+        "summary": ["file_system_id", "name", "arn", "life_cycle_state", "performance_mode",
+                    "encrypted", "kms_key_id", "size_in_bytes", "region", "creation_time"],
+    },
+    "fsx_filesystems": {
+        "summary": ["file_system_id", "arn", "file_system_type", "lifecycle", "storage_type",
+                    "storage_capacity", "kms_key_id", "dns_name", "region", "creation_time"],
+    },
+    "rds_instances": {
+        "summary": ["db_instance_identifier", "arn", "engine", "engine_version", "class", "status",
+                    "allocated_storage", "storage_encrypted", "publicly_accessible",
+                    "endpoint_address", "endpoint_port", "region", "create_time"],
+    },
+    "dynamodb_tables": {
+        "summary": ["name", "arn", "table_status", "billing_mode", "item_count",
+                    "table_size_bytes", "region", "creation_date_time"],
+    },
+    "redshift_clusters": {
+        "summary": ["cluster_identifier", "arn", "cluster_status", "node_type", "number_of_nodes",
+                    "db_name", "encrypted", "publicly_accessible", "endpoint", "region",
+                    "cluster_create_time"],
+    },
+    "rds_snapshots": {
+        "summary": ["db_snapshot_identifier", "arn", "db_instance_identifier", "engine", "status",
+                    "type", "allocated_storage", "encrypted", "kms_key_id", "region", "create_time"],
+    },
+    "elasticache_clusters": {
+        "summary": ["cache_cluster_id", "arn", "engine", "engine_version", "cache_node_type",
+                    "cache_cluster_status", "num_cache_nodes", "at_rest_encryption_enabled",
+                    "transit_encryption_enabled", "region", "cache_cluster_create_time"],
+    },
+    "glacier_vaults": {
+        "summary": ["vault_name", "vault_arn", "number_of_archives", "size_in_bytes",
+                    "region", "creation_date", "last_inventory_date"],
+    },
+    "backup_plans": {
+        "summary": ["name", "arn", "backup_plan_id", "region", "creation_date", "last_execution_date"],
+    },
+    "glue_databases": {
+        "summary": ["name", "catalog_id", "description", "location_uri", "region", "create_time"],
+    },
+    "kinesis_streams": {
+        "summary": ["stream_name", "stream_arn", "stream_status", "encryption_type", "key_id",
+                    "retention_period_hours", "open_shard_count", "region",
+                    "stream_creation_timestamp"],
+    },
+    "msk_clusters": {
+        "summary": ["cluster_name", "arn", "state", "cluster_type", "current_version",
+                    "region", "creation_time"],
+    },
+}
 
-def get_fsx_filesystems():
-    return fetch(f"""
-        select *
-        from aws_fsx_file_system
-        where {region_in_clause()}
-        order by 1;
-    """)
+_IDENTIFIER_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
 
-def get_rds_instances():
-    return fetch(f"""
-        select *
-        from aws_rds_db_instance
-        where {region_in_clause()}
-        order by 1;
-    """)
+def project_columns(resource: str, fields: str | None = None, profile: str | None = None) -> list[str] | None:
+    """
+    선택할 컬럼 목록 (None = 전체 컬럼).
+    - fields: 쉼표 구분 컬럼 목록 (profile보다 우선)
+    - profile: "summary" | "full"
+    잘못된 컬럼명/프로필은 ValueError (라우터에서 400으로 변환)
+    """
+    if fields:
+        cols = [c.strip().lower() for c in fields.split(",") if c.strip()]
+        bad = [c for c in cols if not _IDENTIFIER_RE.match(c)]
+        if bad:
+            raise ValueError(f"invalid field name(s): {', '.join(bad)}")
+        if not cols:
+            raise ValueError("fields is empty")
+        # 순서 유지 중복 제거
+        return list(dict.fromkeys(cols))
 
-def get_dynamodb_tables():
-    return fetch(f"""
-        select *
-        from aws_dynamodb_table
-        where {region_in_clause()}
-        order by 1;
-    """)
+    profile = (profile or DEFAULT_PROFILE).lower()
+    if profile == "full":
+        return None
+    cols = COLUMN_PROFILES.get(resource, {}).get(profile)
+    if cols is None:
+        raise ValueError(f"unknown profile '{profile}' for {resource}")
+    return list(cols)
 
-def get_redshift_clusters():
-    return fetch(f"""
-        select *
-        from aws_redshift_cluster
-        where {region_in_clause()}
-        order by 1;
-    """)
+# Steampipe 테이블 -> 컬럼 이름 집합 (information_schema 조회 결과, 플러그인 스키마는 실행 중 바뀌지 않으므로 캐시)
+_TABLE_COLUMNS: dict[str, frozenset[str]] = {}
 
-def get_rds_snapshots():
-    return fetch(f"""
-        select *
-        from aws_rds_db_snapshot
-        where {region_in_clause()}
-        order by 1;
-    """)
+async def atable_columns(resource: str) -> frozenset[str] | None:
+    """리소스 테이블의 컬럼 집합 (조회 실패 시 None → 검증을 건너뛰고 Steampipe에 맡김)"""
+    table = RESOURCE_TABLES[resource][0]
+    cols = _TABLE_COLUMNS.get(table)
+    if cols is None:
+        try:
+            rows = await steampipe.aquery(
+                f"select column_name from information_schema.columns where table_name = '{table}'")
+        except Exception as e:
+            logger.warning(f"Column lookup failed for {table}: {str(e).splitlines()[0] if str(e) else e}")
+            return None
+        if not rows:
+            return None
+        cols = _TABLE_COLUMNS[table] = frozenset(r["column_name"] for r in rows)
+    return cols
 
-def get_elasticache_clusters():
-    return fetch(f"""
-        select *
-        from aws_elasticache_cluster
-        where {region_in_clause()}
-        order by 1;
-    """)
+async def acheck_columns(resource: str, fields: str | None = None, profile: str | None = None):
+    """project_columns 검증 + fields에 테이블에 없는 컬럼이 있으면 ValueError"""
+    cols = project_columns(resource, fields, profile)
+    if cols is None or not fields:
+        return
+    known = await atable_columns(resource)
+    if known is None:
+        return
+    unknown = [c for c in cols if c not in known]
+    if unknown:
+        raise ValueError(f"unknown field(s) for {resource}: {', '.join(unknown)}")
 
-def get_glacier_vaults():
-    return fetch(f"""
-        select *
-        from aws_glacier_vault
-        where {region_in_clause()}
-        order by 1;
-    """)
+def select_columns(resource: str, fields: str | None = None, profile: str | None = None) -> str:
+    """select 절 생성 (project_columns 기준, 전체면 *)"""
+    cols = project_columns(resource, fields, profile)
+    return "*" if cols is None else ", ".join(f'"{c}"' for c in cols)
 
-def get_backup_plans():
-    return fetch(f"""
-        select *
-        from aws_backup_plan
-        where {region_in_clause()}
+def list_query(resource: str, fields: str | None = None, profile: str | None = None,
+               regions: list[str] | None = None) -> str:
+    """RESOURCE_TABLES 기반 목록 조회 SQL (opt-in 리전 필터 포함, regions로 일부 리전만 지정 가능)."""
+    table, region_filter = RESOURCE_TABLES[resource]
+    return f"""
+        select {select_columns(resource, fields, profile)}
+        from {table}
+        where {region_filter(regions=regions)}
         order by 1;
-    """)
+    """
 
-def get_glue_catalog_database():
-    return fetch(f"""
-        select *
-        from aws_glue_catalog_database
-        where {region_in_clause()}
-        order by 1;
-    """)
+# ------------------------------------------------------------
+# 리전별 fan-out 조회 (비동기 경로)
+# - STEAMPIPE_REGION_FANOUT     : 리소스 목록을 리전마다 따로(동시에) 조회해 합칠지 여부
+#   region in (...) 한 번이면 가장 느린/스로틀된 리전이 테이블 전체를 붙잡지만,
+#   리전별로 나누면 느린 리전은 자기 몫만 비고 나머지는 제때 응답한다.
+# - STEAMPIPE_REGION_TIMEOUT_SEC: 리전 쿼리 하나의 제한 시간 (statement_timeout으로 적용, 풀 대기 시간 제외)
+# ------------------------------------------------------------
+REGION_FANOUT = os.getenv("STEAMPIPE_REGION_FANOUT", "false").lower() in ("1", "true", "yes")
+REGION_TIMEOUT_SEC = float(os.getenv("STEAMPIPE_REGION_TIMEOUT_SEC", "60"))
 
-def get_kinesis_stream():
-    return fetch(f"""
-        select *
-        from aws_kinesis_stream
-        where {region_in_clause()}
-        order by 1;
-    """)
+# 리전과 무관하게 한 번의 글로벌 API로 목록을 가져오는 테이블은 나누지 않는다
+FANOUT_EXCLUDE = {"s3_buckets"}
 
-def get_msk_cluster():
-    return fetch(f"""
-        select *
-        from aws_msk_cluster
-        where {region_in_clause()}
-        order by 1;
-    """)
+# 리소스 -> 리전 -> 마지막 fan-out 결과 (status 엔드포인트에서 노출)
+REGION_REPORTS: dict[str, dict[str, dict]] = {}
+
+class PartialFetchError(Exception):
+    """fan-out 조회에서 일부 리전만 실패: 성공한 리전의 행(rows)과 실패한 리전(failed_regions)을 함께 전달"""
+
+    def __init__(self, resource: str, rows: list, failed_regions: list[str]):
+        super().__init__(f"{resource}: region(s) failed: {', '.join(failed_regions)}")
+        self.rows = rows
+        self.failed_regions = failed_regions
+
+def _first_value_key(row: dict):
+    # 첫 컬럼 값 기준 정렬 키: 숫자 < 그 외(문자열 표현) < NULL
+    # (dict/list 컬럼이나 리전마다 타입이 섞여도 TypeError 없이 결정적인 순서)
+    v = next(iter(row.values()), None)
+    if v is None:
+        return (2, 0, "")
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return (0, v, "")
+    return (1, 0, v if isinstance(v, str) else str(v))
+
+def merge_rows(*parts: list) -> list:
+    """여러 리전 결과를 order by 1과 같은 순서로 합친다"""
+    merged = [row for rows in parts for row in rows]
+    merged.sort(key=_first_value_key)
+    return merged
+
+async def _fetch_region(resource: str, fields: str | None, profile: str | None, region: str):
+    """(행 목록, 리포트) — 오류는 리포트에만 남기고 빈 결과"""
+    started = time.perf_counter()
+    report = {"status": "ok", "rows": 0}
+    rows = []
+    try:
+        rows = await asyncio.wait_for(
+            steampipe.aquery(list_query(resource, fields, profile, [region]), timeout_ms=int(REGION_TIMEOUT_SEC * 1000)),
+            # statement_timeout이 우선, 이쪽은 풀 대기/네트워크까지 포함한 안전장치
+            timeout=REGION_TIMEOUT_SEC + steampipe.POOL_TIMEOUT_SEC,
+        )
+        report["rows"] = len(rows)
+    except Exception as e:
+        msg = str(e).splitlines()[0] if str(e) else e.__class__.__name__
+        if isinstance(e, asyncio.TimeoutError) or "statement timeout" in msg:
+            report.update(status="timeout", error=msg)
+        elif _is_blocked(msg):
+            # opt-in 안 된 리전/권한 없음: 실패가 아니라 이 리전에 보이는 리소스가 없는 것
+            report.update(status="skipped", error=msg)
+        else:
+            report.update(status="error", error=msg)
+        logger.warning(f"Steampipe region query {report['status']} for {resource}/{region}: {msg}")
+    report["latency_ms"] = round((time.perf_counter() - started) * 1000)
+    return rows, report
+
+async def alist(resource: str, fields: str | None = None, profile: str | None = None, raise_errors: bool = False):
+    """목록 조회 (fan-out 모드면 리전별 동시 조회 후 병합, 아니면 한 번에)"""
+    regions = await region_provider.aget()
+    if not REGION_FANOUT or resource in FANOUT_EXCLUDE or len(regions) < 2:
+        return await afetch(list_query(resource, fields, profile, regions), raise_errors)
+
+    results = await asyncio.gather(*(_fetch_region(resource, fields, profile, r) for r in regions))
+    REGION_REPORTS[resource] = {region: report for region, (_, report) in zip(regions, results)}
+    failed = [region for region, (_, report) in zip(regions, results) if report["status"] not in ("ok", "skipped")]
+    if len(failed) == len(regions):
+        if raise_errors:
+            raise RuntimeError(f"{resource}: all regions failed ({REGION_REPORTS[resource][failed[0]].get('error')})")
+        # 모든 리전이 실패했으면 (Steampipe 연결 자체 문제 등) 단일 쿼리 경로와 같게 처리
+        return await afetch(list_query(resource, fields, profile, regions))
+    merged = merge_rows(*(rows for rows, _ in results))
+    if failed:
+        # 실패한 리전의 몫이 빠진 결과를 "전체"로 저장하지 않도록 스냅샷에는 부분 결과임을 알린다
+        # (스냅샷은 해당 리전의 이전 행을 유지, 직접 조회 라우트는 성공한 리전만 응답)
+        if raise_errors:
+            raise PartialFetchError(resource, merged, failed)
+        logger.warning(f"{resource}: partial result, failed regions: {', '.join(failed)}")
+    return merged
+
+def region_report(resource: str) -> dict | None:
+    return REGION_REPORTS.get(resource)
+
+# ------------------------------------------------------------
+# AWS 리소스 조회 함수들 (프로필/필드 프로젝션 + opt-in 필터)
+# ------------------------------------------------------------
+def get_s3_buckets(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("s3_buckets", fields, profile))
+
+def get_ebs_volumes(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("ebs_volumes", fields, profile))
+
+def get_efs_filesystems(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("efs_filesystems", fields, profile))
+
+def get_fsx_filesystems(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("fsx_filesystems", fields, profile))
+
+def get_rds_instances(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("rds_instances", fields, profile))
+
+def get_dynamodb_tables(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("dynamodb_tables", fields, profile))
+
+def get_redshift_clusters(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("redshift_clusters", fields, profile))
+
+def get_rds_snapshots(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("rds_snapshots", fields, profile))
+
+def get_elasticache_clusters(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("elasticache_clusters", fields, profile))
+
+def get_glacier_vaults(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("glacier_vaults", fields, profile))
+
+def get_backup_plans(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("backup_plans", fields, profile))
+
+def get_glue_catalog_database(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("glue_databases", fields, profile))
+
+def get_kinesis_stream(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("kinesis_streams", fields, profile))
+
+def get_msk_cluster(fields: str | None = None, profile: str | None = None):
+    return fetch(list_query("msk_clusters", fields, profile))
+
+# ------------------------------------------------------------
+# 비동기 버전 (라우터/스냅샷에서 스레드 없이 await)
+# ------------------------------------------------------------
+async def aget_s3_buckets(fields: str | None = None, profile: str | None = None):
+    return await alist("s3_buckets", fields, profile)
+
+async def aget_ebs_volumes(fields: str | None = None, profile: str | None = None):
+    return await alist("ebs_volumes", fields, profile)
+
+async def aget_efs_filesystems(fields: str | None = None, profile: str | None = None):
+    return await alist("efs_filesystems", fields, profile)
+
+async def aget_fsx_filesystems(fields: str | None = None, profile: str | None = None):
+    return await alist("fsx_filesystems", fields, profile)
+
+async def aget_rds_instances(fields: str | None = None, profile: str | None = None):
+    return await alist("rds_instances", fields, profile)
+
+async def aget_dynamodb_tables(fields: str | None = None, profile: str | None = None):
+    return await alist("dynamodb_tables", fields, profile)
+
+async def aget_redshift_clusters(fields: str | None = None, profile: str | None = None):
+    return await alist("redshift_clusters", fields, profile)
+
+async def aget_rds_snapshots(fields: str | None = None, profile: str | None = None):
+    return await alist("rds_snapshots", fields, profile)
+
+async def aget_elasticache_clusters(fields: str | None = None, profile: str | None = None):
+    return await alist("elasticache_clusters", fields, profile)
+
+async def aget_glacier_vaults(fields: str | None = None, profile: str | None = None):
+    return await alist("glacier_vaults", fields, profile)
+
+async def aget_backup_plans(fields: str | None = None, profile: str | None = None):
+    return await alist("backup_plans", fields, profile)
+
+async def aget_glue_catalog_database(fields: str | None = None, profile: str | None = None):
+    return await alist("glue_databases", fields, profile)
+
+async def aget_kinesis_stream(fields: str | None = None, profile: str | None = None):
+    return await alist("kinesis_streams", fields, profile)
+
+async def aget_msk_cluster(fields: str | None = None, profile: str | None = None):
+    return await alist("msk_clusters", fields, profile)
 
 # ------------------------------------------------------------
 # boto3 API (예: SageMaker)
 # ------------------------------------------------------------
 def get_sagemaker_feature_group():
-    # boto3는 코드에 리전 고정 or ALLOWED_REGIONS 첫 번째 사용
-    client = boto3.client("sagemaker", region_name=DEFAULT_BOTO_REGION)
+    import boto3  # 지연 임포트 (기동 시간 단축)
+
+    # boto3는 코드에 리전 고정 or 허용 리전 첫 번째 사용
+    client = boto3.client("sagemaker", region_name=default_boto_region())
     resp = client.list_feature_groups()
     return {
         fg["FeatureGroupName"]: {
@@ -259,3 +574,7 @@ def get_sagemaker_feature_group():
         }
         for fg in resp.get("FeatureGroupSummaries", [])
     }
+
+async def aget_sagemaker_feature_group():
+    # boto3는 동기 API이므로 스레드에서 실행
+    return await asyncio.to_thread(get_sagemaker_feature_group)
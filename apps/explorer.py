@@ -2,114 +2,321 @@
 from __future__ import annotations
 
 import base64
-import boto3
-import gzip
+import heapq
 import json
 import os
-import psycopg2
-import redis
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait as futures_wait
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from botocore.exceptions import ClientError, NoCredentialsError, EndpointConnectionError
+from utils.kafka_pool import kafka_pool
+from utils.metrics import EXPLORER_REDIS_KEYS, EXPLORER_S3_BYTES, EXPLORER_S3_OBJECTS
+from utils.pg_pool import pg_pool
 
 AWS_REGION = os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION") or "ap-northeast-2"
 
+
+def _boto3_client(service: str, **kwargs):
+    # boto3/redis는 무거우므로 처음 쓸 때 임포트 (앱 기동 시간 단축)
+    import boto3
+
+    return boto3.client(service, region_name=AWS_REGION, **kwargs)
+
+
+def _client_config(pool_size: int):
+    # botocore도 boto3와 함께 처음 클라이언트를 만들 때 임포트
+    from botocore.config import Config
+
+    return Config(max_pool_connections=max(pool_size, 10), retries={"max_attempts": 5, "mode": "adaptive"})
+
 # ──────────────────────────────────────────────────────────────────────────────
-# S3: 버킷/프리픽스에서 객체 본문을 일부 수집 (최대 max_keys)
-# - 버킷 미존재/권한/네트워크 등의 예외는 JSON 에러로 반환
-# - 각 객체별 파싱 실패는 해당 객체 요소에 error 필드로 기록
+# S3: 공유 클라이언트 + 동시 객체 수집
+# - S3_FETCH_CONCURRENCY: 요청당 동시에 GetObject 하는 스레드 수
+# - boto3 클라이언트는 스레드 세이프하므로 프로세스 전체에서 하나를 공유하고
+#   커넥션 풀 크기를 동시성에 맞춘다 (기본 10이면 풀 대기 발생)
 # ──────────────────────────────────────────────────────────────────────────────
-def get_s3_all_objects_content(bucket_name: str, prefix: str = "", max_keys: int = 1000000000):
-    client = boto3.client("s3", region_name=AWS_REGION)
-    paginator = client.get_paginator("list_objects_v2")
+S3_FETCH_CONCURRENCY = int(os.getenv("S3_FETCH_CONCURRENCY", "16"))
+
+# ── 샘플링 크기 상한 (DSPM 샘플러이므로 객체 앞부분만 읽는다)
+# - S3_SAMPLE_BYTES      : 객체당 읽는 바이트 (Range GetObject, gzip은 해제 후 기준)
+# - S3_REQUEST_MAX_BYTES : 요청 하나가 읽을 수 있는 총 바이트 (초과분 객체는 skipped)
+# - S3_GLOBAL_MAX_BYTES  : 프로세스 전체에서 동시에 메모리에 올라와 있는 샘플 버퍼 총량
+S3_SAMPLE_BYTES = int(os.getenv("S3_SAMPLE_BYTES", str(64 * 1024)))
+S3_REQUEST_MAX_BYTES = int(os.getenv("S3_REQUEST_MAX_BYTES", str(32 * 1024 * 1024)))
+S3_GLOBAL_MAX_BYTES = int(os.getenv("S3_GLOBAL_MAX_BYTES", str(256 * 1024 * 1024)))
+S3_GLOBAL_WAIT_SEC = float(os.getenv("S3_GLOBAL_WAIT_SEC", "30"))
+
+
+class _ByteBudget:
+    """바이트 단위 예산. 요청별(소진형)과 전역(대여/반납형) 상한에 같이 쓴다."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._cond = threading.Condition()
+
+    def try_acquire(self, n: int) -> bool:
+        with self._cond:
+            if self.used + n > self.limit:
+                return False
+            self.used += n
+            return True
+
+    def acquire(self, n: int, timeout: float) -> bool:
+        n = min(n, self.limit)  # 단일 객체가 전체 한도보다 크면 한도만큼만 기다림
+        with self._cond:
+            ok = self._cond.wait_for(lambda: self.used + n <= self.limit, timeout=timeout)
+            if ok:
+                self.used += n
+            return ok
+
+    def release(self, n: int):
+        n = min(n, self.limit)
+        with self._cond:
+            self.used = max(self.used - n, 0)
+            self._cond.notify_all()
+
+_s3_global_budget = _ByteBudget(S3_GLOBAL_MAX_BYTES)
+
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+def _get_s3_client():
+    global _s3_client
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                _s3_client = _boto3_client(
+                    "s3",
+                    config=_client_config(S3_FETCH_CONCURRENCY),
+                )
+    return _s3_client
+
+
+def _gunzip_prefix(raw: bytes, limit: int) -> tuple[bytes, bool]:
+    """
+    gzip 앞부분만 스트리밍 해제 (최대 limit 바이트).
+    반환: (해제된 바이트, 잘렸는지 여부). gzip이 아니면 원본 그대로.
+    """
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        out = d.decompress(raw, limit)
+    except zlib.error:
+        # gzip이 아니거나 깨진 파일일 수 있으니 그대로 진행
+        return raw, False
+    return out, bool(d.unconsumed_tail) or not d.eof
 
-    results: List[Dict[str, Any]] = []
-    count = 0
 
+def _parse_sample(body: bytes, truncated: bool) -> Any:
+    # JSON 시도 → 실패 시 텍스트 → 그래도 실패 시 바이트 프리뷰
+    try:
+        return json.loads(body)
+    except Exception:
+        pass
     try:
-        # 버킷/프리픽스 목록 페이지네이션
-        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
-            contents = page.get("Contents", [])
-            if not contents:
+        text = body.decode("utf-8", errors="strict" if truncated else "ignore")
+    except UnicodeDecodeError as e:
+        # 잘린 경계에서 멀티바이트 문자가 끊긴 경우만 허용
+        if e.start < len(body) - 3:
+            return {"raw_bytes": (body[:200]).hex() + ("..." if len(body) > 200 else "")}
+        text = body[:e.start].decode("utf-8", errors="ignore")
+    return {"text": text}
+
+
+def _read_s3_object(client, bucket_name: str, obj: Dict[str, Any], sample_bytes: int = S3_SAMPLE_BYTES) -> Dict[str, Any]:
+    """
+    객체 앞부분(sample_bytes)만 Range GetObject로 읽어 파싱.
+    잘린 객체는 실패가 아니라 truncated=True로 표시. 실패는 해당 요소의 error 필드로 기록
+    """
+    from botocore.exceptions import ClientError
+
+    key = obj["Key"]
+    size = obj.get("Size")
+    item: Dict[str, Any] = {
+        "key": key,
+        "size": size,
+        "last_modified": obj.get("LastModified").isoformat() if obj.get("LastModified") else None,
+    }
+
+    reserve = min(size, sample_bytes) if size is not None else sample_bytes
+    if not _s3_global_budget.acquire(reserve, timeout=S3_GLOBAL_WAIT_SEC):
+        item["error"] = "global sampling memory budget busy"
+        EXPLORER_S3_OBJECTS.inc("budget_busy")
+        return item
+
+    try:
+        params = {"Bucket": bucket_name, "Key": key}
+        # 빈 객체에 Range를 주면 InvalidRange(416)이므로 작은 객체는 통째로 요청
+        if size is None or size > sample_bytes:
+            params["Range"] = f"bytes=0-{sample_bytes - 1}"
+        stream = client.get_object(**params)["Body"]
+        try:
+            raw = stream.read(sample_bytes)
+        finally:
+            stream.close()
+
+        truncated = size is not None and size > len(raw)
+        body = raw
+        if key.endswith(".gz"):
+            body, gz_truncated = _gunzip_prefix(raw, sample_bytes)
+            truncated = truncated or gz_truncated
+
+        item["content"] = _parse_sample(body, truncated)
+        item["sampled_bytes"] = len(body)
+        item["truncated"] = truncated
+        EXPLORER_S3_OBJECTS.inc("ok")
+        EXPLORER_S3_BYTES.inc(amount=len(raw))
+        return item
+
+    except ClientError as ce:
+        EXPLORER_S3_OBJECTS.inc("error")
+        return {"key": key, "error": str(ce)}
+    except Exception as e:
+        EXPLORER_S3_OBJECTS.inc("error")
+        return {"key": key, "error": str(e)}
+    finally:
+        _s3_global_budget.release(reserve)
+
+
+def _iter_s3_objects(
+    bucket_name: str,
+    prefix: str,
+    max_keys: int,
+    concurrency: int,
+    sample_bytes: int = S3_SAMPLE_BYTES,
+    max_total_bytes: int = S3_REQUEST_MAX_BYTES,
+):
+    """
+    목록 순서대로 객체 내용을 흘려보내는 제너레이터.
+    동시에 진행 중인 GetObject는 최대 concurrency*2개로 제한 (메모리 상한).
+    요청 바이트 예산을 넘는 객체는 읽지 않고 skipped로 표시.
+    목록 조회(ListObjectsV2) 오류는 호출자에게 그대로 올린다.
+    """
+    client = _get_s3_client()
+    paginator = client.get_paginator("list_objects_v2")
+    window = max(concurrency, 1) * 2
+    request_budget = _ByteBudget(max_total_bytes)
+    pending: deque = deque()
+    count = 0
+
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="s3-fetch") as pool:
+        try:
+            # 버킷/프리픽스 목록 페이지네이션
+            for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
                 # 객체가 하나도 없을 수 있음 (정상 케이스)
-                continue
+                for obj in page.get("Contents", []):
+                    if count >= max_keys:  # 안전장치
+                        break
+                    count += 1
+                    size = obj.get("Size")
+                    if not request_budget.try_acquire(min(size, sample_bytes) if size is not None else sample_bytes):
+                        pending.append(_done({
+                            "key": obj["Key"],
+                            "size": size,
+                            "skipped": "request byte budget exhausted",
+                        }))
+                    else:
+                        pending.append(pool.submit(_read_s3_object, client, bucket_name, obj, sample_bytes))
+                    while len(pending) >= window:
+                        yield pending.popleft().result()
+                if count >= max_keys:
+                    break
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # 소비자가 중간에 멈추면 아직 시작 안 한 작업은 취소
+            for fut in pending:
+                fut.cancel()
 
-            for obj in contents:
-                if count >= max_keys:  # 안전장치
-                    return results
-
-                key = obj["Key"]
-                try:
-                    s3_obj = client.get_object(Bucket=bucket_name, Key=key)
-                    body = s3_obj["Body"].read()
-
-                    if key.endswith(".gz"):
-                        try:
-                            body = gzip.decompress(body)
-                        except Exception:
-                            # gzip이 아니거나 깨진 파일일 수 있으니 그대로 진행
-                            pass
-
-                    # JSON 시도 → 실패 시 텍스트 → 그래도 실패 시 바이트 프리뷰
-                    try:
-                        parsed = json.loads(body)
-                    except Exception:
-                        try:
-                            parsed = {"text": body.decode("utf-8", errors="ignore")}
-                        except Exception:
-                            parsed = {"raw_bytes": (body[:200]).hex() + ("..." if len(body) > 200 else "")}
-
-                    results.append({
-                        "key": key,
-                        "size": obj.get("Size"),
-                        "last_modified": obj.get("LastModified").isoformat() if obj.get("LastModified") else None,
-                        "content": parsed
-                    })
-
-                except ClientError as ce:
-                    results.append({"key": key, "error": str(ce)})
-                except Exception as e:
-                    results.append({"key": key, "error": str(e)})
-
-                count += 1
-
-        return results
 
-    except ClientError as e:
+def _done(value) -> Future:
+    fut: Future = Future()
+    fut.set_result(value)
+    return fut
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# S3: 버킷/프리픽스에서 객체 본문을 일부 수집 (최대 max_keys)
+# - 버킷 미존재/권한/네트워크 등의 예외는 JSON 에러로 반환
+# - 각 객체별 파싱 실패는 해당 객체 요소에 error 필드로 기록
+# - 객체당 앞부분 sample_bytes만 읽고, 잘린 객체는 truncated=True
+# - 결과는 목록(listing) 순서 유지
+# ──────────────────────────────────────────────────────────────────────────────
+def _s3_error(e: Exception, bucket_name: str, prefix: str) -> Dict[str, Any]:
+    from botocore.exceptions import ClientError, EndpointConnectionError, NoCredentialsError
+
+    if isinstance(e, ClientError):
         code = e.response.get("Error", {}).get("Code", "")
         # 대표적인 에러들: NoSuchBucket, AccessDenied 등
-        return {
-            "error": str(e),
-            "bucket": bucket_name,
-            "prefix": prefix,
-            "code": code or "ClientError",
-        }
-    except (NoCredentialsError, EndpointConnectionError) as e:
-        return {
-            "error": str(e),
-            "bucket": bucket_name,
-            "prefix": prefix,
-            "code": e.__class__.__name__,
-        }
+        code = code or "ClientError"
+    elif isinstance(e, (NoCredentialsError, EndpointConnectionError)):
+        code = e.__class__.__name__
+    else:
+        code = "UnknownError"
+    return {
+        "error": str(e),
+        "bucket": bucket_name,
+        "prefix": prefix,
+        "code": code,
+    }
+
+
+def iter_s3_objects_content(
+    bucket_name: str,
+    prefix: str = "",
+    max_keys: int = 1000000000,
+    concurrency: Optional[int] = None,
+    sample_bytes: Optional[int] = None,
+    max_total_bytes: Optional[int] = None,
+):
+    """스트리밍(NDJSON)용: 객체를 읽는 즉시 하나씩 내보내고, 목록 조회 실패는 마지막 에러 요소로"""
+    try:
+        yield from _iter_s3_objects(
+            bucket_name, prefix, max_keys,
+            concurrency or S3_FETCH_CONCURRENCY,
+            sample_bytes or S3_SAMPLE_BYTES,
+            max_total_bytes or S3_REQUEST_MAX_BYTES,
+        )
     except Exception as e:
-        return {
-            "error": str(e),
-            "bucket": bucket_name,
-            "prefix": prefix,
-            "code": "UnknownError",
-        }
+        yield _s3_error(e, bucket_name, prefix)
+
+
+def get_s3_all_objects_content(
+    bucket_name: str,
+    prefix: str = "",
+    max_keys: int = 1000000000,
+    concurrency: Optional[int] = None,
+    sample_bytes: Optional[int] = None,
+    max_total_bytes: Optional[int] = None,
+):
+    try:
+        return list(_iter_s3_objects(
+            bucket_name, prefix, max_keys,
+            concurrency or S3_FETCH_CONCURRENCY,
+            sample_bytes or S3_SAMPLE_BYTES,
+            max_total_bytes or S3_REQUEST_MAX_BYTES,
+        ))
+    except Exception as e:
+        return _s3_error(e, bucket_name, prefix)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # DynamoDB: 간단 스캔(페이지 단위)
 # ──────────────────────────────────────────────────────────────────────────────
-def get_dynamodb_items(table_name: str, limit: int = 50, last_key: dict = None):
-    client = boto3.client("dynamodb", region_name=AWS_REGION)
+def _scan_dynamodb_page(table_name: str, limit: int, last_key: dict = None) -> dict:
+    client = _boto3_client("dynamodb")
     params = {"TableName": table_name, "Limit": limit}
     if last_key:
         params["ExclusiveStartKey"] = last_key
+    return client.scan(**params)
+
 
-    response = client.scan(**params)
+def get_dynamodb_items(table_name: str, limit: int = 50, last_key: dict = None):
+    response = _scan_dynamodb_page(table_name, limit, last_key)
 
     return {
         "count": response.get("Count", 0),
@@ -118,179 +325,387 @@ def get_dynamodb_items(table_name: str, limit: int = 50, last_key: dict = None):
     }
 
 
+def iter_dynamodb_items(table_name: str, limit: int = 50, last_key: dict = None):
+    """스트리밍용: 아이템을 한 줄씩, 마지막 줄에 페이지 메타(_meta)"""
+    response = _scan_dynamodb_page(table_name, limit, last_key)
+    yield from response.get("Items", [])
+    yield {"_meta": {"count": response.get("Count", 0), "last_evaluated_key": response.get("LastEvaluatedKey")}}
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Glue: 테이블 S3 Location 따라 S3 내용 샘플링
+# - GLUE_TABLE_CONCURRENCY: DB 전체 조회 시 동시에 샘플링하는 테이블 수
+# - GLUE_DEADLINE_SEC     : DB 전체 조회 마감 시간(초), 넘으면 끝난 테이블까지만 응답
 # ──────────────────────────────────────────────────────────────────────────────
-def get_glue_data(database_name: str, table_name: str = None, max_keys: int = 20):
-    glue = boto3.client("glue", region_name=AWS_REGION)
-    results = []
-
-    def fetch_table_data(tbl_name: str):
-        table = glue.get_table(DatabaseName=database_name, Name=tbl_name)
-        sd = table.get("Table", {}).get("StorageDescriptor", {})
-        location = sd.get("Location")
-
-        if not location or not location.startswith("s3://"):
-            return {
-                "table": tbl_name,
-                "error": "지원하지 않는 저장소거나 S3 location 없음",
-                "location": location
-            }
-
-        # s3://bucket/prefix -> bucket, prefix 분리
-        s3_path = location.replace("s3://", "")
-        parts = s3_path.split("/", 1)
-        bucket = parts[0]
-        prefix = parts[1] if len(parts) > 1 else ""
-
-        objects = get_s3_all_objects_content(bucket, prefix, max_keys)
+GLUE_TABLE_CONCURRENCY = int(os.getenv("GLUE_TABLE_CONCURRENCY", "4"))
+GLUE_DEADLINE_SEC = float(os.getenv("GLUE_DEADLINE_SEC", "60"))
+
+
+def _split_s3_uri(uri: str) -> tuple[str, str]:
+    # s3://bucket/prefix -> bucket, prefix 분리
+    s3_path = uri.replace("s3://", "")
+    parts = s3_path.split("/", 1)
+    return parts[0], parts[1] if len(parts) > 1 else ""
+
+
+def _glue_table_sample(table: Dict[str, Any], max_keys: int, concurrency: Optional[int] = None) -> Dict[str, Any]:
+    """get_table/get_tables가 돌려준 테이블 정의의 StorageDescriptor로 S3 샘플링"""
+    tbl_name = table.get("Name")
+    location = table.get("StorageDescriptor", {}).get("Location")
+
+    if not location or not location.startswith("s3://"):
         return {
             "table": tbl_name,
-            "location": location,
-            "objects": objects
+            "error": "지원하지 않는 저장소거나 S3 location 없음",
+            "location": location
         }
 
+    bucket, prefix = _split_s3_uri(location)
+    objects = get_s3_all_objects_content(bucket, prefix, max_keys, concurrency=concurrency)
+    return {
+        "table": tbl_name,
+        "location": location,
+        "objects": objects
+    }
+
+
+def _glue_table_sample_safe(table: Dict[str, Any], max_keys: int, concurrency: Optional[int] = None) -> Dict[str, Any]:
+    try:
+        return _glue_table_sample(table, max_keys, concurrency)
+    except Exception as e:
+        return {"table": table.get("Name"), "error": str(e)}
+
+
+def iter_glue_data(database_name: str, table_name: str = None, max_keys: int = 20,
+                   table_concurrency: Optional[int] = None, deadline_sec: Optional[float] = None):
+    """
+    테이블 단위로 샘플 결과를 하나씩 내보낸다 (table_name 지정 시 한 건).
+    전체 조회는 get_tables 목록의 StorageDescriptor를 그대로 쓰고(get_table 재호출 없음)
+    테이블 여러 개를 동시에 샘플링하며, 마감 시간이 지나면 끝난 테이블까지만 결과를 내고
+    나머지는 timed_out으로 표시한다. 결과 순서는 get_tables 목록 순서.
+    """
+    glue = _boto3_client("glue")
+
     if table_name:
         # 특정 테이블만 조회
         try:
-            return fetch_table_data(table_name)
+            table = glue.get_table(DatabaseName=database_name, Name=table_name).get("Table", {})
+            yield _glue_table_sample(table, max_keys)
         except Exception as e:
-            return {"table": table_name, "error": str(e)}
-    else:
-        # 모든 테이블 조회
+            yield {"table": table_name, "error": str(e)}
+        return
+
+    table_concurrency = max(table_concurrency or GLUE_TABLE_CONCURRENCY, 1)
+    deadline = time.monotonic() + (deadline_sec or GLUE_DEADLINE_SEC)
+    # 테이블 동시성 x 객체 동시성이 S3 커넥션 풀을 넘지 않도록 테이블당 객체 동시성을 나눈다
+    object_concurrency = max(S3_FETCH_CONCURRENCY // table_concurrency, 1)
+
+    executor = ThreadPoolExecutor(max_workers=table_concurrency, thread_name_prefix="glue-table")
+    pending: deque = deque()  # (테이블 이름, S3 location, Future)
+    listing_done = False
+    try:
         paginator = glue.get_paginator("get_tables")
         for page in paginator.paginate(DatabaseName=database_name):
             for tbl in page.get("TableList", []):
-                tbl_name = tbl.get("Name")
-                try:
-                    results.append(fetch_table_data(tbl_name))
-                except Exception as e:
-                    results.append({
-                        "table": tbl_name,
-                        "error": str(e)
-                    })
-        return results
+                pending.append((
+                    tbl.get("Name"),
+                    tbl.get("StorageDescriptor", {}).get("Location"),
+                    executor.submit(_glue_table_sample_safe, tbl, max_keys, object_concurrency),
+                ))
+            if time.monotonic() >= deadline:
+                break
+        else:
+            listing_done = True
+
+        while pending:
+            tbl_name, location, fut = pending.popleft()
+            try:
+                yield fut.result(timeout=max(deadline - time.monotonic(), 0))
+            except FuturesTimeoutError:
+                fut.cancel()
+                yield {
+                    "table": tbl_name,
+                    "location": location,
+                    "error": "deadline exceeded",
+                    "timed_out": True,
+                }
+
+        if not listing_done:
+            yield {"table": None, "error": "deadline exceeded while listing tables", "timed_out": True}
+    finally:
+        # 마감 후 남은 테이블은 시작하지 않고, 이미 도는 샘플링은 기다리지 않는다
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_glue_data(database_name: str, table_name: str = None, max_keys: int = 20,
+                  table_concurrency: Optional[int] = None, deadline_sec: Optional[float] = None):
+    if table_name:
+        return next(iter_glue_data(database_name, table_name, max_keys))
+    return list(iter_glue_data(database_name, None, max_keys, table_concurrency, deadline_sec))
 
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Redshift: 간단 조회
+# RDS/Redshift 공통: psycopg2 조회 (행 단위 제너레이터)
 # ──────────────────────────────────────────────────────────────────────────────
-def get_redshift_data(endpoint: str, port: int, db_name: str, user: str, password: str, table_name: str = None, limit: int = 50):
-    conn = None
-    results = []
-
-    try:
-        conn = psycopg2.connect(
-            host=endpoint,
-            port=port,
-            dbname=db_name,
-            user=user,
-            password=password,
-            connect_timeout=10
-        )
+_PG_FETCH_BATCH = 100
+
+_REDSHIFT_LIST_TABLES_SQL = """
+    SELECT tablename
+    FROM pg_table_def
+    WHERE schemaname = 'public'
+    GROUP BY tablename
+    ORDER BY tablename;
+"""
+
+_RDS_LIST_TABLES_SQL = """
+    SELECT tablename
+    FROM pg_tables
+    WHERE schemaname = 'public'
+    ORDER BY tablename;
+"""
+
+
+def _iter_pg_rows(endpoint: str, port: int, db_name: str, user: str, password: str,
+                  list_tables_sql: str, table_name: str = None, limit: int = 50):
+    """table_name이 없으면 테이블 목록, 있으면 해당 테이블의 행을 하나씩 (커넥션은 풀에서 빌려 씀)"""
+    with pg_pool.connection(endpoint, port, db_name, user, password, connect_timeout=10) as conn:
         cursor = conn.cursor()
+        try:
+            if not table_name:
+                cursor.execute(list_tables_sql)
+                for r in cursor.fetchall():
+                    yield {"table": r[0]}
+            else:
+                cursor.execute(f'SELECT * FROM public."{table_name}" LIMIT {limit};')
+                colnames = [desc[0] for desc in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(_PG_FETCH_BATCH)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(zip(colnames, row))
+        finally:
+            cursor.close()
 
-        if not table_name:
-            cursor.execute("""
-                SELECT tablename
-                FROM pg_table_def
-                WHERE schemaname = 'public'
-                GROUP BY tablename
-                ORDER BY tablename;
-            """)
-            rows = cursor.fetchall()
-            results = [{"table": r[0]} for r in rows]
-        else:
-            cursor.execute(f'SELECT * FROM public."{table_name}" LIMIT {limit};')
-            colnames = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
-            results = [dict(zip(colnames, row)) for row in rows]
 
-        cursor.close()
-        return results
+# ──────────────────────────────────────────────────────────────────────────────
+# Redshift: 간단 조회
+# ──────────────────────────────────────────────────────────────────────────────
+def iter_redshift_data(endpoint: str, port: int, db_name: str, user: str, password: str, table_name: str = None, limit: int = 50):
+    return _iter_pg_rows(endpoint, port, db_name, user, password, _REDSHIFT_LIST_TABLES_SQL, table_name, limit)
 
+
+def get_redshift_data(endpoint: str, port: int, db_name: str, user: str, password: str, table_name: str = None, limit: int = 50):
+    try:
+        return list(iter_redshift_data(endpoint, port, db_name, user, password, table_name, limit))
     except Exception as e:
         return {"error": str(e)}
 
-    finally:
-        if conn:
-            conn.close()
-
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Kinesis: 최신 샤드에서 레코드 샘플링
+# Kinesis: 전체 샤드 동시 샘플링
+# - KINESIS_ITERATOR_TYPE     : 기본 반복자 (TRIM_HORIZON | LATEST | AT_TIMESTAMP)
+#                               LATEST는 조용한 스트림에서 대부분 빈 결과라 기본은 가장 오래된 레코드부터
+# - KINESIS_SHARD_CONCURRENCY : 동시에 읽는 샤드 수
+# - KINESIS_TIME_BUDGET_SEC   : 스트림 하나 샘플링에 쓰는 최대 시간(초), 넘으면 읽은 만큼만 응답
 # ──────────────────────────────────────────────────────────────────────────────
-def get_kinesis_records(stream_name: str, shard_id: str = None, limit: int = 20):
-    client = boto3.client("kinesis", region_name=AWS_REGION)
+KINESIS_ITERATOR_TYPES = ("TRIM_HORIZON", "LATEST", "AT_TIMESTAMP")
+KINESIS_ITERATOR_TYPE = os.getenv("KINESIS_ITERATOR_TYPE", "TRIM_HORIZON").upper()
+KINESIS_SHARD_CONCURRENCY = int(os.getenv("KINESIS_SHARD_CONCURRENCY", "8"))
+KINESIS_TIME_BUDGET_SEC = float(os.getenv("KINESIS_TIME_BUDGET_SEC", "10"))
+
+_kinesis_client = None
+_kinesis_client_lock = threading.Lock()
+
+
+def _get_kinesis_client():
+    global _kinesis_client
+    if _kinesis_client is None:
+        with _kinesis_client_lock:
+            if _kinesis_client is None:
+                _kinesis_client = _boto3_client(
+                    "kinesis",
+                    config=_client_config(KINESIS_SHARD_CONCURRENCY),
+                )
+    return _kinesis_client
+
+
+def _list_kinesis_shards(client, stream_name: str) -> List[Dict[str, Any]]:
+    shards: List[Dict[str, Any]] = []
+    kwargs: Dict[str, Any] = {"StreamName": stream_name}
+    while True:
+        resp = client.list_shards(**kwargs)
+        shards.extend(resp.get("Shards", []))
+        token = resp.get("NextToken")
+        if not token:
+            return shards
+        kwargs = {"NextToken": token}  # NextToken 사용 시 StreamName과 같이 보낼 수 없음
+
+
+def _parse_kinesis_timestamp(value) -> datetime:
+    """AT_TIMESTAMP 기준 시각: epoch 초 또는 ISO 8601 문자열"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    except (TypeError, ValueError):
+        pass
+    ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
 
+
+def _decode_kinesis_record(record: Dict[str, Any], shard_id: str) -> Dict[str, Any]:
     try:
-        if not shard_id:
-            # 샤드가 없을 수 있음
-            desc = client.describe_stream(StreamName=stream_name)
-            shards = desc.get("StreamDescription", {}).get("Shards", [])
-            if not shards:
-                return {"stream_name": stream_name, "error": "No shards in stream."}
-            shard_id = shards[0]["ShardId"]
+        payload = record["Data"]
+        payload = (base64.b64decode(payload) if isinstance(payload, str) else payload).decode("utf-8")
+        try:
+            payload = json.loads(payload)
+        except Exception:
+            pass
+    except Exception:
+        payload = str(record.get("Data"))
 
-        shard_iterator = client.get_shard_iterator(
-            StreamName=stream_name,
-            ShardId=shard_id,
-            ShardIteratorType="LATEST"
-        )["ShardIterator"]
+    arrival = record.get("ApproximateArrivalTimestamp")
+    return {
+        "shard_id": shard_id,
+        "sequence_number": record.get("SequenceNumber"),
+        "partition_key": record.get("PartitionKey"),
+        "approximate_arrival_timestamp": arrival.isoformat() if arrival else None,
+        "data": payload,
+        "_arrival": arrival.timestamp() if arrival else 0.0,
+    }
 
-        response = client.get_records(ShardIterator=shard_iterator, Limit=limit)
 
-        records = []
-        for record in response.get("Records", []):
-            try:
-                payload = base64.b64decode(record["Data"]).decode("utf-8")
-                try:
-                    payload = json.loads(payload)
-                except Exception:
-                    pass
-            except Exception:
-                payload = str(record.get("Data"))
-
-            records.append({
-                "sequence_number": record.get("SequenceNumber"),
-                "partition_key": record.get("PartitionKey"),
-                "data": payload
-            })
+def _read_kinesis_shard(client, stream_name: str, shard_id: str, iterator_type: str,
+                        timestamp: Optional[datetime], limit: int, deadline: float) -> Dict[str, Any]:
+    """샤드 하나에서 최대 limit건을 읽는다 (마감/샤드 끝/최신 위치 도달 시 중단)"""
+    out: Dict[str, Any] = {"shard_id": shard_id, "records": []}
+    try:
+        kwargs: Dict[str, Any] = {"StreamName": stream_name, "ShardId": shard_id, "ShardIteratorType": iterator_type}
+        if iterator_type == "AT_TIMESTAMP":
+            kwargs["Timestamp"] = timestamp
+        it = client.get_shard_iterator(**kwargs)["ShardIterator"]
+
+        while it and len(out["records"]) < limit and time.monotonic() < deadline:
+            resp = client.get_records(ShardIterator=it, Limit=min(limit - len(out["records"]), 10000))
+            out["records"].extend(_decode_kinesis_record(r, shard_id) for r in resp.get("Records", []))
+            it = resp.get("NextShardIterator")
+            if resp.get("MillisBehindLatest", 0) == 0:
+                break  # 최신 위치까지 읽음
+            if not resp.get("Records"):
+                time.sleep(0.2)  # 트림된 구간을 지나는 중: 샤드당 GetRecords 5회/초 한도 고려
+    except Exception as e:
+        out["error"] = str(e)
+    return out
+
+
+def get_kinesis_records(stream_name: str, shard_id: str = None, limit: int = 20,
+                        iterator_type: Optional[str] = None, timestamp=None,
+                        shard_concurrency: Optional[int] = None, time_budget_sec: Optional[float] = None):
+    """
+    전체 샤드(또는 지정 샤드)를 동시에 읽어 도착 시각 순으로 합친 최대 limit건.
+    샤드당 ceil(limit / 샤드 수)건씩 읽으므로 샤드가 많아도 고르게 섞인 샘플이 나온다.
+    """
+    from botocore.exceptions import ClientError
+
+    client = _get_kinesis_client()
+    iterator_type = (iterator_type or KINESIS_ITERATOR_TYPE).upper()
+    if iterator_type not in KINESIS_ITERATOR_TYPES:
+        return {"error": f"Unsupported iterator_type: {iterator_type}", "stream_name": stream_name}
+    at: Optional[datetime] = None
+    if iterator_type == "AT_TIMESTAMP":
+        if timestamp is None:
+            return {"error": "timestamp is required for AT_TIMESTAMP", "stream_name": stream_name}
+        try:
+            at = _parse_kinesis_timestamp(timestamp)
+        except ValueError as e:
+            return {"error": f"Invalid timestamp: {e}", "stream_name": stream_name}
 
-        return {
-            "stream_name": stream_name,
-            "shard_id": shard_id,
-            "records": records
-        }
+    deadline = time.monotonic() + (time_budget_sec or KINESIS_TIME_BUDGET_SEC)
 
+    try:
+        if shard_id:
+            shard_ids = [shard_id]
+        else:
+            shards = _list_kinesis_shards(client, stream_name)
+            if iterator_type == "LATEST":
+                # 닫힌 샤드(리샤딩 전 부모)에는 새 레코드가 들어오지 않는다
+                shards = [sh for sh in shards if "EndingSequenceNumber" not in sh.get("SequenceNumberRange", {})]
+            shard_ids = [sh["ShardId"] for sh in shards]
+            if not shard_ids:
+                return {"stream_name": stream_name, "error": "No shards in stream."}
     except ClientError as e:
         return {"error": str(e), "stream_name": stream_name}
     except Exception as e:
         return {"error": str(e), "stream_name": stream_name}
 
+    per_shard = max(-(-limit // len(shard_ids)), 1)
+    workers = min(max(shard_concurrency or KINESIS_SHARD_CONCURRENCY, 1), len(shard_ids))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kinesis-shard")
+    try:
+        futures = [
+            executor.submit(_read_kinesis_shard, client, stream_name, sid, iterator_type, at, per_shard, deadline)
+            for sid in shard_ids
+        ]
+        # 샤드 리더는 마감 후 진행 중인 GetRecords 한 번만 마치고 돌아오므로 약간의 여유를 둔다
+        futures_wait(futures, timeout=max(deadline - time.monotonic(), 0) + 5)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    shard_results = []
+    for sid, fut in zip(shard_ids, futures):
+        if fut.done() and not fut.cancelled():
+            shard_results.append(fut.result())
+        else:
+            shard_results.append({"shard_id": sid, "records": [], "error": "time budget exceeded", "timed_out": True})
+
+    merged = list(heapq.merge(*(r["records"] for r in shard_results), key=lambda rec: rec["_arrival"]))[:limit]
+    for rec in merged:
+        del rec["_arrival"]
+
+    result: Dict[str, Any] = {
+        "stream_name": stream_name,
+        "iterator_type": iterator_type,
+        "shards": [
+            {"shard_id": r["shard_id"], "records_read": len(r["records"]),
+             **{k: r[k] for k in ("error", "timed_out") if k in r}}
+            for r in shard_results
+        ],
+        "records": merged,
+    }
+    if shard_id:
+        result["shard_id"] = shard_id
+    return result
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # SageMaker Feature Store: Offline Store(S3) 객체 샘플링
 # ──────────────────────────────────────────────────────────────────────────────
-def get_feature_group_data(feature_group_name: str, max_keys: int = 20):
-    sm = boto3.client("sagemaker", region_name=AWS_REGION)
+def _feature_group_offline_store(feature_group_name: str) -> tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """(Offline Store S3 URI, 에러 응답) 중 하나를 돌려준다"""
+    from botocore.exceptions import ClientError
+
+    sm = _boto3_client("sagemaker")
 
     try:
         response = sm.describe_feature_group(FeatureGroupName=feature_group_name)
     except ClientError as e:
-        return {"feature_group": feature_group_name, "error": str(e)}
+        return None, {"feature_group": feature_group_name, "error": str(e)}
 
     offline_store = response.get("OfflineStoreConfig", {}).get("S3StorageConfig", {})
     s3_uri = offline_store.get("ResolvedOutputS3Uri")
 
     if not s3_uri:
-        return {"feature_group": feature_group_name, "error": "Offline Store (S3) 없음"}
+        return None, {"feature_group": feature_group_name, "error": "Offline Store (S3) 없음"}
+    return s3_uri, None
 
-    s3_path = s3_uri.replace("s3://", "")
-    parts = s3_path.split("/", 1)
-    bucket = parts[0]
-    prefix = parts[1] if len(parts) > 1 else ""
 
+def get_feature_group_data(feature_group_name: str, max_keys: int = 20):
+    s3_uri, error = _feature_group_offline_store(feature_group_name)
+    if error:
+        return error
+
+    bucket, prefix = _split_s3_uri(s3_uri)
     objects = get_s3_all_objects_content(bucket, prefix, max_keys)
 
     return {
@@ -300,98 +715,142 @@ def get_feature_group_data(feature_group_name: str, max_keys: int = 20):
     }
 
 
+def iter_feature_group_data(feature_group_name: str, max_keys: int = 20):
+    """스트리밍용: Offline Store 객체를 하나씩"""
+    s3_uri, error = _feature_group_offline_store(feature_group_name)
+    if error:
+        yield error
+        return
+    bucket, prefix = _split_s3_uri(s3_uri)
+    yield from iter_s3_objects_content(bucket, prefix, max_keys)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # RDS(Postgres): 간단 조회
 # ──────────────────────────────────────────────────────────────────────────────
+def iter_rds_data(endpoint: str, port: int, db_name: str, user: str, password: str, table_name: str = None, limit: int = 50):
+    return _iter_pg_rows(endpoint, port, db_name, user, password, _RDS_LIST_TABLES_SQL, table_name, limit)
+
+
 def get_rds_data(endpoint: str, port: int, db_name: str, user: str, password: str, table_name: str = None, limit: int = 50):
-    conn = None
-    results = []
+    try:
+        return list(iter_rds_data(endpoint, port, db_name, user, password, table_name, limit))
+    except Exception as e:
+        return {"error": str(e)}
 
+
+# ──────────────────────────────────────────────────────────────────────────────
+# MSK(Kafka): 파티션 끝부분(tail) 샘플링
+# - 컨슈머는 bootstrap 서버별로 풀에서 재사용 (utils/kafka_pool.py)
+# - 그룹 가입 없이 assign → end_offsets → 파티션마다 (끝 - N)으로 seek 해서 바로 읽는다
+#   (latest 대기가 없으므로 조용한 토픽에서도 즉시 최근 레코드가 나온다)
+# - 할당된 파티션들은 컨슈머 poll 한 번에 브로커별로 동시에 fetch 된다
+# - MSK_SAMPLE_TIMEOUT_SEC   : 샘플 한 번의 최대 대기 시간(초)
+# - MSK_BOOTSTRAP_CACHE_SEC  : 클러스터 ARN → bootstrap 브로커 문자열 캐시 시간(초)
+# ──────────────────────────────────────────────────────────────────────────────
+MSK_SAMPLE_TIMEOUT_SEC = float(os.getenv("MSK_SAMPLE_TIMEOUT_SEC", "5"))
+MSK_BOOTSTRAP_CACHE_SEC = float(os.getenv("MSK_BOOTSTRAP_CACHE_SEC", "3600"))
+
+_msk_bootstrap_cache: Dict[str, tuple[str, float]] = {}
+
+
+def _topic_partition(topic: str, partition: int):
     try:
-        conn = psycopg2.connect(
-            host=endpoint,
-            port=port,
-            dbname=db_name,
-            user=user,
-            password=password,
-            connect_timeout=10
-        )
-        cursor = conn.cursor()
+        from kafka import TopicPartition
+    except ImportError:  # 가짜 컨슈머로 검증할 때 (kafka의 TopicPartition도 같은 namedtuple)
+        from collections import namedtuple
+        TopicPartition = namedtuple("TopicPartition", ["topic", "partition"])
+    return TopicPartition(topic, partition)
 
-        if not table_name:
-            cursor.execute("""
-                SELECT tablename
-                FROM pg_tables
-                WHERE schemaname = 'public'
-                ORDER BY tablename;
-            """)
-            rows = cursor.fetchall()
-            results = [{"table": r[0]} for r in rows]
-        else:
-            cursor.execute(f'SELECT * FROM public."{table_name}" LIMIT {limit};')
-            colnames = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
-            results = [dict(zip(colnames, row)) for row in rows]
 
-        cursor.close()
-        return results
+def _msk_bootstrap_servers(cluster_arn: str) -> str:
+    cached = _msk_bootstrap_cache.get(cluster_arn)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    client = _boto3_client("kafka")
+    servers = client.get_bootstrap_brokers(ClusterArn=cluster_arn).get("BootstrapBrokerString")
+    if servers:
+        _msk_bootstrap_cache[cluster_arn] = (servers, time.monotonic() + MSK_BOOTSTRAP_CACHE_SEC)
+    return servers
 
-    except Exception as e:
-        return {"error": str(e)}
 
-    finally:
-        if conn:
-            conn.close()
+def _decode_kafka_message(msg) -> Dict[str, Any]:
+    try:
+        payload = msg.value.decode("utf-8")
+        try:
+            payload = json.loads(payload)
+        except Exception:
+            pass
+    except Exception:
+        payload = str(msg.value)
 
+    return {
+        "topic": msg.topic,
+        "partition": msg.partition,
+        "offset": msg.offset,
+        "timestamp": msg.timestamp,
+        "key": msg.key.decode("utf-8", errors="ignore") if msg.key else None,
+        "value": payload
+    }
+
+
+def _sample_topic_tail(consumer, topic: str, limit: int, timeout_sec: float) -> Optional[List[Dict[str, Any]]]:
+    """데이터가 있는 파티션마다 최근 ceil(limit / 해당 파티션 수)건을 읽어 타임스탬프 순으로 합친다 (토픽이 없으면 None)"""
+    partitions = consumer.partitions_for_topic(topic)
+    if not partitions:
+        return None
+
+    tps = [_topic_partition(topic, p) for p in sorted(partitions)]
+    end = consumer.end_offsets(tps)
+    begin = consumer.beginning_offsets(tps)
+
+    # 파티션별 끝 오프셋 (빈 파티션은 제외하고 나머지끼리 limit을 나눈다)
+    targets = {tp: end[tp] for tp in tps if begin[tp] < end[tp]}
+    if not targets:
+        return []
+    per_partition = max(-(-limit // len(targets)), 1)
+
+    consumer.assign(list(targets))
+    for tp, stop in targets.items():
+        consumer.seek(tp, max(stop - per_partition, begin[tp]))
+
+    records: List[Dict[str, Any]] = []
+    deadline = time.monotonic() + timeout_sec
+    while targets and time.monotonic() < deadline:
+        batch = consumer.poll(timeout_ms=int(max(deadline - time.monotonic(), 0) * 1000))
+        for tp, msgs in batch.items():
+            stop = targets.get(tp)
+            if stop is None:
+                continue
+            records.extend(_decode_kafka_message(m) for m in msgs if m.offset < stop)
+        # 컴팩션/트랜잭션 마커로 오프셋이 비어 있을 수 있으므로 position으로 완료 판단
+        for tp in [tp for tp, stop in targets.items() if consumer.position(tp) >= stop]:
+            del targets[tp]
+
+    records.sort(key=lambda r: (r["timestamp"] or 0, r["partition"], r["offset"]))
+    return records[-limit:]
+
+
+def get_msk_records(cluster_arn: str, topic: str, limit: int = 20, timeout_sec: Optional[float] = None):
+    from botocore.exceptions import ClientError
 
-# ──────────────────────────────────────────────────────────────────────────────
-# MSK(Kafka): 간단 컨슈밍 샘플
-# ──────────────────────────────────────────────────────────────────────────────
-def get_msk_records(cluster_arn: str, topic: str, limit: int = 20):
-    client = boto3.client("kafka", region_name=AWS_REGION)
     try:
-        brokers_info = client.get_bootstrap_brokers(ClusterArn=cluster_arn)
-        bootstrap_servers = brokers_info.get("BootstrapBrokerString")
+        bootstrap_servers = _msk_bootstrap_servers(cluster_arn)
         if not bootstrap_servers:
             return {"error": "Bootstrap servers not found for cluster."}
     except ClientError as e:
         return {"error": str(e)}
 
-    from kafka import KafkaConsumer  # 지연 임포트(실행 환경 없는 경우 대비)
-
-    consumer = KafkaConsumer(
-        topic,
-        bootstrap_servers=bootstrap_servers,
-        auto_offset_reset="latest",
-        enable_auto_commit=False,
-        consumer_timeout_ms=5000,
-        security_protocol="PLAINTEXT",
-    )
-
-    records = []
     try:
-        for i, msg in enumerate(consumer):
-            if i >= limit:
-                break
-            try:
-                payload = msg.value.decode("utf-8")
-                try:
-                    payload = json.loads(payload)
-                except Exception:
-                    pass
-            except Exception:
-                payload = str(msg.value)
-
-            records.append({
-                "topic": msg.topic,
-                "partition": msg.partition,
-                "offset": msg.offset,
-                "key": msg.key.decode("utf-8", errors="ignore") if msg.key else None,
-                "value": payload
-            })
-    finally:
-        consumer.close()
+        with kafka_pool.consumer(bootstrap_servers) as consumer:
+            if not topic:
+                return {"cluster_arn": cluster_arn, "topics": sorted(consumer.topics())}
+            records = _sample_topic_tail(consumer, topic, limit, timeout_sec or MSK_SAMPLE_TIMEOUT_SEC)
+    except Exception as e:
+        return {"error": str(e), "cluster_arn": cluster_arn, "topic": topic}
 
+    if records is None:
+        return {"error": f"Topic not found or has no partitions: {topic}", "cluster_arn": cluster_arn, "topic": topic}
     return {"cluster_arn": cluster_arn, "topic": topic, "records": records}
 
 
@@ -411,7 +870,155 @@ def _try_parse_bytes(data: Optional[bytes]) -> Any:
         return {"raw_bytes_preview": str(data[:200]) + ("..." if len(data) > 200 else "")}
 
 
-def get_redis_data(
+def _decode_hash_items(pairs: Dict[bytes, bytes]) -> List[Dict[str, Any]]:
+    return [
+        {"field": field.decode("utf-8", errors="ignore"), "value": _try_parse_bytes(val)}
+        for field, val in pairs.items()
+    ]
+
+
+def _finish_scanned(item: Dict[str, Any], ktype_str: str, vals: List[Any], per_collection_limit: int):
+    if ktype_str == "set":
+        item["values"] = [_try_parse_bytes(v) for v in vals[:per_collection_limit]]
+    else:
+        item["items"] = vals[:per_collection_limit]
+
+
+def _queue_value_reads(pipe, k: bytes, ktype_str: str, per_collection_limit: int) -> int:
+    """타입별 값 조회 명령을 파이프라인에 넣고 넣은 명령 수를 반환"""
+    if ktype_str == "string":
+        pipe.get(k)
+        return 1
+    if ktype_str == "list":
+        pipe.lrange(k, 0, max(per_collection_limit - 1, 0))
+        pipe.llen(k)
+        return 2
+    if ktype_str == "set":
+        pipe.sscan(k, 0, count=per_collection_limit)
+        pipe.scard(k)
+        return 2
+    if ktype_str == "zset":
+        pipe.zrange(k, 0, max(per_collection_limit - 1, 0), withscores=True)
+        pipe.zcard(k)
+        return 2
+    if ktype_str == "hash":
+        pipe.hscan(k, 0, count=per_collection_limit)
+        pipe.hlen(k)
+        return 2
+    if ktype_str == "stream":
+        pipe.xrevrange(k, count=per_collection_limit)
+        return 1
+    return 0
+
+
+def _sample_redis_batch(r, keys: List[bytes], per_collection_limit: int) -> List[Dict[str, Any]]:
+    """
+    SCAN 배치 하나를 파이프라인으로 샘플링 (키당 왕복 3~5회 → 배치당 2회 + 필요 시 SSCAN/HSCAN 추가 라운드)
+    1) TYPE / TTL / MEMORY USAGE
+    2) 타입별 값 조회 (+ 길이)
+    """
+    if not keys:
+        return []
+
+    pipe = r.pipeline(transaction=False)
+    for k in keys:
+        pipe.type(k)
+        pipe.ttl(k)
+        pipe.memory_usage(k)
+    meta = pipe.execute(raise_on_error=False)
+
+    items: List[Dict[str, Any]] = []
+    pipe = r.pipeline(transaction=False)
+    queued: List[tuple] = []  # (item 인덱스, 타입, 명령 수)
+    for i, k in enumerate(keys):
+        k_str = k.decode("utf-8", errors="ignore")
+        ktype, ttl, mem = meta[3 * i:3 * i + 3]
+        if isinstance(ktype, Exception) or isinstance(ttl, Exception):
+            err = ktype if isinstance(ktype, Exception) else ttl
+            items.append({"key": k_str, "error": str(err)})
+            continue
+        ktype_str = ktype.decode("utf-8")
+        item: Dict[str, Any] = {
+            "key": k_str,
+            "type": ktype_str,
+            "ttl": ttl,
+            "memory_usage": None if isinstance(mem, Exception) else mem,
+        }
+        items.append(item)
+        n = _queue_value_reads(pipe, k, ktype_str, per_collection_limit)
+        if n:
+            queued.append((len(items) - 1, ktype_str, n))
+        else:
+            item["note"] = "Unsupported or module type (value sampling skipped)."
+
+    results = pipe.execute(raise_on_error=False) if queued else []
+
+    # SSCAN/HSCAN이 한 번에 limit만큼 못 채운 키: 커서를 이어서 추가 라운드
+    pending: Dict[int, tuple] = {}  # item 인덱스 -> (키, 타입, 커서, 누적값)
+    pos = 0
+    for idx, ktype_str, n in queued:
+        res = results[pos:pos + n]
+        pos += n
+        item = items[idx]
+        if isinstance(res[0], Exception):
+            items[idx] = {"key": item["key"], "error": str(res[0])}
+            continue
+        length = res[1] if n > 1 and not isinstance(res[1], Exception) else None
+
+        if ktype_str == "string":
+            item["value"] = _try_parse_bytes(res[0])
+        elif ktype_str == "list":
+            item["values"] = [_try_parse_bytes(v) for v in res[0]]
+            item["length"] = length
+        elif ktype_str == "zset":
+            item["values"] = [{"member": _try_parse_bytes(m), "score": sc} for (m, sc) in res[0]]
+        elif ktype_str == "stream":
+            item["entries"] = [
+                {
+                    "id": entry_id.decode("utf-8", errors="ignore"),
+                    "fields": {
+                        (fk.decode("utf-8", errors="ignore")): _try_parse_bytes(fv)
+                        for fk, fv in fields.items()
+                    },
+                }
+                for entry_id, fields in res[0]
+            ]
+        else:  # set / hash
+            cursor, vals = res[0]
+            vals = list(vals) if ktype_str == "set" else _decode_hash_items(vals)
+            if cursor != 0 and len(vals) < per_collection_limit:
+                pending[idx] = (keys[idx], ktype_str, cursor, vals)
+            else:
+                _finish_scanned(item, ktype_str, vals, per_collection_limit)
+
+        if ktype_str in ("set", "zset", "hash") and length is not None:
+            item["length"] = length
+
+    while pending:
+        pipe = r.pipeline(transaction=False)
+        order = list(pending.items())
+        for _, (k, ktype_str, cursor, _vals) in order:
+            if ktype_str == "set":
+                pipe.sscan(k, cursor, count=per_collection_limit)
+            else:
+                pipe.hscan(k, cursor, count=per_collection_limit)
+        for (idx, (k, ktype_str, _c, vals)), res in zip(order, pipe.execute(raise_on_error=False)):
+            if isinstance(res, Exception):
+                items[idx] = {"key": items[idx]["key"], "error": str(res)}
+                del pending[idx]
+                continue
+            cursor, more = res
+            vals.extend(more if ktype_str == "set" else _decode_hash_items(more))
+            if cursor != 0 and len(vals) < per_collection_limit:
+                pending[idx] = (k, ktype_str, cursor, vals)
+            else:
+                _finish_scanned(items[idx], ktype_str, vals, per_collection_limit)
+                del pending[idx]
+
+    return items
+
+
+def iter_redis_data(
     host: str,
     port: int = 6379,
     password: Optional[str] = None,
@@ -419,153 +1026,61 @@ def get_redis_data(
     pattern: str = "*",
     limit: int = 50,
     per_collection_limit: int = 50,
-) -> Dict[str, Any]:
-    r = None
+):
+    """SCAN으로 키를 찾으며 샘플링한 항목을 하나씩 내보낸다 (연결 오류는 예외로)"""
+    import redis  # 지연 임포트
+
+    r = redis.Redis(
+        host=host,
+        port=port,
+        password=password,
+        db=db,
+        socket_timeout=5,
+        socket_connect_timeout=5,
+        decode_responses=False,
+    )
     try:
-        r = redis.Redis(
-            host=host,
-            port=port,
-            password=password,
-            db=db,
-            socket_timeout=5,
-            socket_connect_timeout=5,
-            decode_responses=False,
-        )
-
         _ = r.ping()  # 연결 확인
 
-        results: List[Dict[str, Any]] = []
         scanned = 0
         cursor = 0
-
         while True:
             cursor, keys = r.scan(cursor=cursor, match=pattern, count=200)
-            for key in keys:
-                if scanned >= limit:
-                    return {
-                        "host": host,
-                        "port": port,
-                        "db": db,
-                        "pattern": pattern,
-                        "keys_returned": len(results),
-                        "keys_limit": limit,
-                        "items": results,
-                    }
-
-                k = key
-                k_str = k.decode("utf-8", errors="ignore")
-
-                try:
-                    ktype = r.type(k)
-                    ktype_str = ktype.decode("utf-8")
-
-                    ttl = r.ttl(k)
-                    try:
-                        mem = r.memory_usage(k)
-                    except Exception:
-                        mem = None
-
-                    item: Dict[str, Any] = {
-                        "key": k_str,
-                        "type": ktype_str,
-                        "ttl": ttl,
-                        "memory_usage": mem,
-                    }
-
-                    if ktype_str == "string":
-                        val = r.get(k)
-                        item["value"] = _try_parse_bytes(val)
-
-                    elif ktype_str == "list":
-                        vals = r.lrange(k, 0, max(per_collection_limit - 1, 0))
-                        item["values"] = [_try_parse_bytes(v) for v in vals]
-                        item["length"] = r.llen(k)
-
-                    elif ktype_str == "set":
-                        scursor = 0
-                        svals: List[Any] = []
-                        while True:
-                            scursor, members = r.sscan(k, scursor, count=per_collection_limit)
-                            svals.extend(members)
-                            if scursor == 0 or len(svals) >= per_collection_limit:
-                                break
-                        item["values"] = [_try_parse_bytes(v) for v in svals[:per_collection_limit]]
-                        try:
-                            item["length"] = r.scard(k)
-                        except Exception:
-                            pass
-
-                    elif ktype_str == "zset":
-                        vals = r.zrange(k, 0, max(per_collection_limit - 1, 0), withscores=True)
-                        item["values"] = [
-                            {"member": _try_parse_bytes(m), "score": s} for (m, s) in vals
-                        ]
-                        try:
-                            item["length"] = r.zcard(k)
-                        except Exception:
-                            pass
-
-                    elif ktype_str == "hash":
-                        hcursor = 0
-                        hitems: List[Dict[str, Any]] = []
-                        while True:
-                            hcursor, pairs = r.hscan(k, hcursor, count=per_collection_limit)
-                            for field, val in pairs.items():
-                                hitems.append({
-                                    "field": field.decode("utf-8", errors="ignore"),
-                                    "value": _try_parse_bytes(val),
-                                })
-                            if hcursor == 0 or len(hitems) >= per_collection_limit:
-                                break
-                        item["items"] = hitems[:per_collection_limit]
-                        try:
-                            item["length"] = r.hlen(k)
-                        except Exception:
-                            pass
-
-                    elif ktype_str == "stream":
-                        entries = r.xrevrange(k, count=per_collection_limit)
-                        parsed = []
-                        for entry_id, fields in entries:
-                            parsed.append({
-                                "id": entry_id.decode("utf-8", errors="ignore"),
-                                "fields": {
-                                    (fk.decode("utf-8", errors="ignore")): _try_parse_bytes(fv)
-                                    for fk, fv in fields.items()
-                                }
-                            })
-                        item["entries"] = parsed
-
-                    else:
-                        item["note"] = "Unsupported or module type (value sampling skipped)."
+            keys = keys[:limit - scanned]
+            for item in _sample_redis_batch(r, keys, per_collection_limit):
+                EXPLORER_REDIS_KEYS.inc("error" if "error" in item else "ok")
+                yield item
+            scanned += len(keys)
 
-                except Exception as e_key:
-                    item = {
-                        "key": k_str,
-                        "error": str(e_key),
-                    }
-
-                results.append(item)
-                scanned += 1
-
-            if cursor == 0:
+            if cursor == 0 or scanned >= limit:
                 break
+    finally:
+        try:
+            r.close()
+        except Exception:
+            pass
 
-        return {
-            "host": host,
-            "port": port,
-            "db": db,
-            "pattern": pattern,
-            "keys_returned": len(results),
-            "keys_limit": limit,
-            "items": results,
-        }
 
+def get_redis_data(
+    host: str,
+    port: int = 6379,
+    password: Optional[str] = None,
+    db: int = 0,
+    pattern: str = "*",
+    limit: int = 50,
+    per_collection_limit: int = 50,
+) -> Dict[str, Any]:
+    try:
+        results = list(iter_redis_data(host, port, password, db, pattern, limit, per_collection_limit))
     except Exception as e:
         return {"error": str(e), "host": host, "port": port, "db": db, "pattern": pattern}
-    finally:
-        if r:
-            try:
-                r.close()
-            except Exception:
-                pass
+
+    return {
+        "host": host,
+        "port": port,
+        "db": db,
+        "pattern": pattern,
+        "keys_returned": len(results),
+        "keys_limit": limit,
+        "items": results,
+    }
@@ -1,130 +1,96 @@
 # inspector.py
-from sqlalchemy import create_engine
-import pandas as pd
-import boto3
+import asyncio
 import os
 
-# Steampipe 연결
-def _build_steampipe_url() -> str:
-    url = os.getenv("STEAMPIPE_DB_URL")
-    if url:
-        return url
-
-    user = os.getenv("STEAMPIPE_DB_USER", "steampipe")
-    password = os.getenv("STEAMPIPE_DB_PASSWORD", "")
-    host = os.getenv("STEAMPIPE_DB_HOST", "localhost")
-    port = os.getenv("STEAMPIPE_DB_PORT", "9193")
-    name = os.getenv("STEAMPIPE_DB_NAME", "steampipe")
-    credentials = f"{user}:{password}" if password else user
-    return f"postgresql://{credentials}@{host}:{port}/{name}"
-
-engine = create_engine(_build_steampipe_url())
+from apps.resource_index import index as resource_index, DETAIL_LOOKUPS, lookup_column
+from utils import steampipe
 
+# Steampipe 연결은 utils/steampipe.py 공용 엔진/풀 사용
 DEFAULT_BOTO_REGION = (
     os.getenv("AWS_REGION")
     or os.getenv("AWS_DEFAULT_REGION")
     or "ap-northeast-2"
 )
 
-def fetch(query: str):
-    df = pd.read_sql(query, engine)
-    return df.to_dict(orient="records")
+def fetch(query: str, params: dict | None = None):
+    return steampipe.query(query, params)
+
+async def afetch(query: str, params: dict | None = None):
+    return await steampipe.aquery(query, params)
+
+def _detail(resource: str, value: str):
+    """
+    스냅샷 인덱스에서 먼저 찾고, 없으면 키 컬럼 조건(바인드 파라미터)으로 Steampipe 조회.
+    키 컬럼 조건은 Steampipe가 key column qual로 받아 목록 전체를 훑지 않고 단건 API로 조회한다.
+    """
+    rows = resource_index.lookup(resource, value)
+    if rows is not None:
+        return rows
+    table = DETAIL_LOOKUPS[resource][0]
+    return fetch(f"select * from {table} where {lookup_column(resource, value)} = :v", {"v": value})
+
+async def _adetail(resource: str, value: str):
+    rows = resource_index.lookup(resource, value)
+    if rows is not None:
+        return rows
+    table = DETAIL_LOOKUPS[resource][0]
+    return await afetch(f"select * from {table} where {lookup_column(resource, value)} = :v", {"v": value})
 
 # ---------- 상세 조회 함수 ----------
 
 def get_s3_bucket_detail(bucket_name: str):
-    return fetch(f"""
-        select *
-        from aws_s3_bucket
-        where name = '{bucket_name}';
-    """)
+    return _detail("s3_buckets", bucket_name)
 
 def get_efs_filesystem_detail(file_system_id: str):
-    return fetch(f"""
-        select *
-        from aws_efs_file_system
-        where file_system_id = '{file_system_id}';
-    """)
+    return _detail("efs_filesystems", file_system_id)
 
 def get_fsx_filesystem_detail(file_system_id: str):
-    return fetch(f"""
-        select *
-        from aws_fsx_file_system
-        where file_system_id = '{file_system_id}';
-    """)
+    return _detail("fsx_filesystems", file_system_id)
 
 def get_rds_instance_detail(db_identifier: str):
-    return fetch(f"""
-        select *
-        from aws_rds_db_instance
-        where db_instance_identifier = '{db_identifier}';
-    """)
+    return _detail("rds_instances", db_identifier)
 
 def get_dynamodb_table_detail(table_name: str):
-    return fetch(f"""
-        select *
-        from aws_dynamodb_table
-        where name = '{table_name}';
-    """)
+    return _detail("dynamodb_tables", table_name)
 
 def get_redshift_cluster_detail(cluster_id: str):
-    return fetch(f"""
-        select *
-        from aws_redshift_cluster
-        where cluster_identifier = '{cluster_id}';
-    """)
+    return _detail("redshift_clusters", cluster_id)
 
 def get_rds_snapshot_detail(snapshot_id: str):
-    return fetch(f"""
-        select *
-        from aws_rds_db_snapshot
-        where db_snapshot_identifier = '{snapshot_id}';
-    """)
+    return _detail("rds_snapshots", snapshot_id)
 
 def get_elasticache_cluster_detail(cluster_id: str):
-    return fetch(f"""
-        select *
-        from aws_elasticache_cluster
-        where cache_cluster_id = '{cluster_id}';
-    """)
+    return _detail("elasticache_clusters", cluster_id)
 
 def get_glacier_vault_detail(vault_name: str):
-    return fetch(f"""
-        select *
-        from aws_glacier_vault
-        where vault_name = '{vault_name}';
-    """)
+    return _detail("glacier_vaults", vault_name)
 
 def get_backup_plan_detail(plan_id: str):
-    return fetch(f"""
-        select *
-        from aws_backup_plan
-        where backup_plan_id = '{plan_id}';
-    """)
+    return _detail("backup_plans", plan_id)
 
 # ---------- boto3 API 호출 상세 ----------
 
 def get_sagemaker_feature_group_detail(feature_group_name: str):
+    import boto3  # 지연 임포트 (기동 시간 단축)
+
     client = boto3.client("sagemaker", region_name=DEFAULT_BOTO_REGION)
     response = client.describe_feature_group(FeatureGroupName=feature_group_name)
     return response
 
 # ---------- Steampipe 기반 기타 ----------
 
+_GLUE_TABLES_SQL = """
+    select
+      name as table_name,
+      storage_descriptor ->> 'Location' as location
+    from aws_glue_catalog_table
+    where database_name = :name;
+"""
+
 def get_glue_database_detail(name: str):
-    db_info = fetch(f"""
-        select *
-        from aws_glue_catalog_database
-        where name = '{name}';
-    """)
-
-    tables = fetch(f"""
-        select
-          name as table_name,
-          storage_descriptor ->> 'Location' as location
-        from aws_glue_catalog_table
-        where database_name = '{name}';
-    """)
+    db_info = _detail("glue_databases", name)
+
+    tables = fetch(_GLUE_TABLES_SQL, {"name": name})
 
     return {
         "database": db_info,
@@ -132,15 +98,59 @@ def get_glue_database_detail(name: str):
     }
 
 def get_kinesis_stream_detail(stream_name: str):
-    return fetch(f"""
-        select *
-        from aws_kinesis_stream
-        where stream_name = '{stream_name}';
-    """)
+    return _detail("kinesis_streams", stream_name)
 
 def get_msk_cluster_detail(cluster_name: str):
-    return fetch(f"""
-        select *
-        from aws_msk_cluster
-        where cluster_name = '{cluster_name}';
-    """)
+    return _detail("msk_clusters", cluster_name)
+
+# ---------- 비동기 버전 (라우터에서 스레드 없이 await) ----------
+
+async def aget_s3_bucket_detail(bucket_name: str):
+    return await _adetail("s3_buckets", bucket_name)
+
+async def aget_efs_filesystem_detail(file_system_id: str):
+    return await _adetail("efs_filesystems", file_system_id)
+
+async def aget_fsx_filesystem_detail(file_system_id: str):
+    return await _adetail("fsx_filesystems", file_system_id)
+
+async def aget_rds_instance_detail(db_identifier: str):
+    return await _adetail("rds_instances", db_identifier)
+
+async def aget_dynamodb_table_detail(table_name: str):
+    return await _adetail("dynamodb_tables", table_name)
+
+async def aget_redshift_cluster_detail(cluster_id: str):
+    return await _adetail("redshift_clusters", cluster_id)
+
+async def aget_rds_snapshot_detail(snapshot_id: str):
+    return await _adetail("rds_snapshots", snapshot_id)
+
+async def aget_elasticache_cluster_detail(cluster_id: str):
+    return await _adetail("elasticache_clusters", cluster_id)
+
+async def aget_glacier_vault_detail(vault_name: str):
+    return await _adetail("glacier_vaults", vault_name)
+
+async def aget_backup_plan_detail(plan_id: str):
+    return await _adetail("backup_plans", plan_id)
+
+async def aget_kinesis_stream_detail(stream_name: str):
+    return await _adetail("kinesis_streams", stream_name)
+
+async def aget_msk_cluster_detail(cluster_name: str):
+    return await _adetail("msk_clusters", cluster_name)
+
+async def aget_glue_database_detail(name: str):
+    db_info, tables = await asyncio.gather(
+        _adetail("glue_databases", name),
+        afetch(_GLUE_TABLES_SQL, {"name": name}),
+    )
+    return {
+        "database": db_info,
+        "tables": tables
+    }
+
+async def aget_sagemaker_feature_group_detail(feature_group_name: str):
+    # boto3는 동기 API이므로 스레드에서 실행
+    return await asyncio.to_thread(get_sagemaker_feature_group_detail, feature_group_name)
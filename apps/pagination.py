@@ -0,0 +1,109 @@
+# apps/pagination.py
+from __future__ import annotations
+
+import base64
+import binascii
+import bisect
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from apps.resource_index import DETAIL_LOOKUPS, row_identity
+from utils import codec
+
+# ------------------------------------------------------------
+# 설정
+# - LIST_PAGE_DEFAULT : cursor만 주고 limit을 생략했을 때 페이지 크기
+# - LIST_PAGE_MAX     : limit 상한
+# ------------------------------------------------------------
+LIST_PAGE_DEFAULT = int(os.getenv("LIST_PAGE_DEFAULT", "200"))
+LIST_PAGE_MAX = int(os.getenv("LIST_PAGE_MAX", "5000"))
+
+
+class InvalidPageCursor(ValueError):
+    pass
+
+
+def encode_cursor(resource: str, key: str) -> str:
+    # 불투명 커서: 리소스 타입 + 마지막으로 내려준 행의 정렬 키
+    raw = codec.dumps({"r": resource, "k": key})
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(resource: str, cursor: str) -> str:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        obj = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidPageCursor("invalid cursor")
+    if not isinstance(obj, dict) or not isinstance(obj.get("k"), str):
+        raise InvalidPageCursor("invalid cursor")
+    if obj.get("r") != resource:
+        raise InvalidPageCursor(f"cursor belongs to {obj.get('r')}, not {resource}")
+    return obj["k"]
+
+
+class _Sorted:
+    __slots__ = ("source", "keys", "rows")
+
+    def __init__(self, source: list, keys: List[str], rows: List[dict]):
+        self.source = source  # 정렬 원본 스냅샷 목록 (동일 객체인지로 최신 여부 판단)
+        self.keys = keys
+        self.rows = rows
+
+
+class PageIndex:
+    """
+    스냅샷 목록을 식별자(ARN, 없으면 리전:키 컬럼) 순으로 정렬해 두고 keyset 페이지를 잘라 준다.
+    - 스냅샷 리스너로 갱신 시점(스레드)에 미리 정렬하므로 페이지 요청은 bisect + 슬라이스만 한다
+    - 커서는 마지막 행의 키라 페이지 사이에 스냅샷이 바뀌어도 중복 없이 그 다음 키부터 이어진다
+      (커서보다 앞쪽에 새로 생긴 항목은 이번 순회에서 빠짐 — /changes로 보완)
+    - 같은 식별자가 여러 행이면 스냅샷 순서대로 "#2", "#3"을 붙여 키를 유일하게 만든다
+    """
+
+    def __init__(self):
+        self._sorted: Dict[str, _Sorted] = {}
+        self._lock = threading.Lock()
+
+    def _build(self, resource: str, data: list) -> _Sorted:
+        seen: Dict[str, int] = {}
+        keyed: List[Tuple[str, dict]] = []
+        for row in data:
+            if not isinstance(row, dict):
+                continue
+            key = row_identity(resource, row)
+            n = seen[key] = seen.get(key, 0) + 1
+            keyed.append((key if n == 1 else f"{key}#{n}", row))
+        keyed.sort(key=lambda kv: kv[0])
+        return _Sorted(data, [k for k, _ in keyed], [r for _, r in keyed])
+
+    def update(self, resource: str, data: Any):
+        """스냅샷 리스너 (목록형 리소스만)"""
+        if resource not in DETAIL_LOOKUPS or not isinstance(data, list):
+            return
+        built = self._build(resource, data)
+        with self._lock:
+            self._sorted[resource] = built
+
+    def _sorted_for(self, resource: str, data: list) -> _Sorted:
+        current = self._sorted.get(resource)
+        if current is not None and current.source is data:
+            return current
+        # 리스너보다 먼저 요청이 온 경우 (혹은 리스너 실패) 직접 정렬
+        built = self._build(resource, data)
+        with self._lock:
+            self._sorted[resource] = built
+        return built
+
+    def page(self, resource: str, data: list, cursor: Optional[str], limit: int) -> Tuple[List[dict], Optional[str], int]:
+        """(행 목록, 다음 커서 또는 None, 전체 행 수)"""
+        s = self._sorted_for(resource, data)
+        start = bisect.bisect_right(s.keys, decode_cursor(resource, cursor)) if cursor else 0
+        end = start + limit
+        rows = s.rows[start:end]
+        next_cursor = encode_cursor(resource, s.keys[end - 1]) if end < len(s.keys) else None
+        return rows, next_cursor, len(s.keys)
+
+
+page_index = PageIndex()
@@ -0,0 +1,127 @@
+# apps/resource_index.py
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# ------------------------------------------------------------
+# Logging
+# ------------------------------------------------------------
+logger = logging.getLogger("resource_index")
+
+# ------------------------------------------------------------
+# 설정
+# - RESOURCE_INDEX_ENABLED     : 상세 조회를 스냅샷 인덱스에서 먼저 찾을지 여부
+# - RESOURCE_INDEX_MAX_AGE_SEC : 이보다 오래된 인덱스는 쓰지 않고 Steampipe로 조회
+# ------------------------------------------------------------
+INDEX_ENABLED = os.getenv("RESOURCE_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+INDEX_MAX_AGE_SEC = int(os.getenv("RESOURCE_INDEX_MAX_AGE_SEC", "900"))
+
+# 리소스 키 -> (Steampipe 테이블, 상세 조회 키 컬럼, ARN 컬럼)
+DETAIL_LOOKUPS: Dict[str, tuple[str, str, Optional[str]]] = {
+    "s3_buckets": ("aws_s3_bucket", "name", "arn"),
+    "ebs_volumes": ("aws_ebs_volume", "volume_id", "arn"),
+    "efs_filesystems": ("aws_efs_file_system", "file_system_id", "arn"),
+    "fsx_filesystems": ("aws_fsx_file_system", "file_system_id", "arn"),
+    "rds_instances": ("aws_rds_db_instance", "db_instance_identifier", "arn"),
+    "dynamodb_tables": ("aws_dynamodb_table", "name", "arn"),
+    "redshift_clusters": ("aws_redshift_cluster", "cluster_identifier", "arn"),
+    "rds_snapshots": ("aws_rds_db_snapshot", "db_snapshot_identifier", "arn"),
+    "elasticache_clusters": ("aws_elasticache_cluster", "cache_cluster_id", "arn"),
+    "glacier_vaults": ("aws_glacier_vault", "vault_name", "vault_arn"),
+    "backup_plans": ("aws_backup_plan", "backup_plan_id", "arn"),
+    "glue_databases": ("aws_glue_catalog_database", "name", None),
+    "kinesis_streams": ("aws_kinesis_stream", "stream_name", "stream_arn"),
+    "msk_clusters": ("aws_msk_cluster", "cluster_name", "arn"),
+}
+
+
+def row_identity(resource: str, row: dict) -> str:
+    """행 식별자: ARN 컬럼, 없으면 상세 조회 키 컬럼(+ 리전), 둘 다 없으면 첫 컬럼 값"""
+    _, key_col, arn_col = DETAIL_LOOKUPS.get(resource, (None, None, None))
+    if arn_col and row.get(arn_col):
+        return str(row[arn_col])
+    if key_col and row.get(key_col) is not None:
+        return f"{row['region']}:{row[key_col]}" if row.get("region") else str(row[key_col])
+    return str(next(iter(row.values()), ""))
+
+
+def lookup_column(resource: str, value: str) -> str:
+    """식별자 값이 ARN이면 ARN 컬럼, 아니면 상세 조회 키 컬럼"""
+    _, key_col, arn_col = DETAIL_LOOKUPS[resource]
+    return arn_col if arn_col and value.startswith("arn:") else key_col
+
+
+class _Index:
+    __slots__ = ("by_column", "built_at", "rows")
+
+    def __init__(self, by_column: Dict[str, Dict[str, List[dict]]], rows: int):
+        self.by_column = by_column
+        self.built_at = time.time()
+        self.rows = rows
+
+
+class ResourceIndex:
+    """
+    (리소스 타입, 식별자) -> 행 목록 인메모리 인덱스.
+    - 스냅샷 수집기가 새 목록을 가져올 때마다 리소스 단위로 통째로 다시 만들어 교체 (읽기 측 락 불필요)
+    - 키 컬럼과 ARN 컬럼 두 가지로 찾을 수 있음
+    - 같은 이름이 여러 리전에 있을 수 있으므로 값은 행 목록 (Steampipe `where key = ...` 결과와 같은 모양)
+    """
+
+    def __init__(self, lookups: Dict[str, tuple[str, str, Optional[str]]]):
+        self.lookups = lookups
+        self._indexes: Dict[str, _Index] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, resource: str, rows: Any):
+        if resource not in self.lookups or not isinstance(rows, list):
+            return
+        _, key_col, arn_col = self.lookups[resource]
+        by_column: Dict[str, Dict[str, List[dict]]] = {key_col: {}}
+        if arn_col:
+            by_column[arn_col] = {}
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            for col, index in by_column.items():
+                value = row.get(col)
+                if value is not None:
+                    index.setdefault(str(value), []).append(row)
+        self._indexes[resource] = _Index(by_column, len(rows))
+
+    def lookup(self, resource: str, value: str) -> Optional[List[dict]]:
+        """인덱스에 있으면 행 목록, 없거나 오래됐으면 None (호출 측이 Steampipe로 조회)"""
+        index = self._indexes.get(resource) if INDEX_ENABLED else None
+        rows = None
+        if index is not None and time.time() - index.built_at <= INDEX_MAX_AGE_SEC:
+            rows = index.by_column.get(lookup_column(resource, value), {}).get(value)
+        with self._lock:
+            if rows is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return rows
+
+    def clear(self):
+        self._indexes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "enabled": INDEX_ENABLED,
+            "hits": self.hits,
+            "misses": self.misses,
+            "resources": {
+                name: {"rows": idx.rows, "age_sec": round(now - idx.built_at, 1)}
+                for name, idx in list(self._indexes.items())
+            },
+        }
+
+
+index = ResourceIndex(DETAIL_LOOKUPS)
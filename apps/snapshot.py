@@ -0,0 +1,269 @@
+# apps/snapshot.py
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+import apps.collector as collector
+from apps.change_log import change_log
+from apps.pagination import page_index
+from apps.resource_index import index as resource_index
+from utils.metrics import SNAPSHOT_REFRESH_SECONDS
+from utils.timing import record
+
+# ------------------------------------------------------------
+# Logging
+# ------------------------------------------------------------
+logger = logging.getLogger("snapshot")
+
+# ------------------------------------------------------------
+# 설정
+# - SNAPSHOT_REFRESH_ENABLED : 백그라운드 주기 갱신 on/off (off여도 요청 시 stale-while-revalidate로 갱신)
+# - SNAPSHOT_REFRESH_SEC     : 기본 갱신 주기(초)
+# - SNAPSHOT_REFRESH_INTERVALS : 리소스별 주기 "s3_buckets=300,rds_snapshots=1800"
+# - SNAPSHOT_RETRY_SEC       : 실패한 수집기의 재시도 간격(초)
+# ------------------------------------------------------------
+REFRESH_ENABLED = os.getenv("SNAPSHOT_REFRESH_ENABLED", "true").lower() in ("1", "true", "yes")
+DEFAULT_INTERVAL_SEC = int(os.getenv("SNAPSHOT_REFRESH_SEC", "600"))
+RETRY_SEC = int(os.getenv("SNAPSHOT_RETRY_SEC", "60"))
+
+def _parse_intervals(raw: str) -> Dict[str, int]:
+    intervals: Dict[str, int] = {}
+    for part in raw.split(","):
+        if "=" not in part:
+            continue
+        name, _, sec = part.partition("=")
+        try:
+            intervals[name.strip()] = int(sec.strip())
+        except ValueError:
+            logger.warning(f"Invalid snapshot interval ignored: {part.strip()}")
+    return intervals
+
+# /all-resources 응답 키 -> 수집 함수 (응답 키 순서 유지, 비동기 버전 사용)
+# 목록 수집기는 raise_errors=True로 호출: 권한/연결/타임아웃 오류가 빈 목록으로 저장되지 않고
+# 갱신 실패(last_error)로 기록되어 이전 스냅샷이 유지된다
+def _list_collector(resource: str) -> Callable[[], Any]:
+    return partial(collector.alist, resource, raise_errors=True)
+
+
+COLLECTORS: Dict[str, Callable[[], Any]] = {
+    "s3_buckets": _list_collector("s3_buckets"),
+    "ebs_volumes": _list_collector("ebs_volumes"),
+    "efs_filesystems": _list_collector("efs_filesystems"),
+    "fsx_filesystems": _list_collector("fsx_filesystems"),
+    "rds_instances": _list_collector("rds_instances"),
+    "rds_snapshots": _list_collector("rds_snapshots"),
+    "dynamodb_tables": _list_collector("dynamodb_tables"),
+    "redshift_clusters": _list_collector("redshift_clusters"),
+    "elasticache_clusters": _list_collector("elasticache_clusters"),
+    "glacier_vaults": _list_collector("glacier_vaults"),
+    "backup_plans": _list_collector("backup_plans"),
+    "feature_groups": collector.aget_sagemaker_feature_group,
+    "glue_databases": _list_collector("glue_databases"),
+    "kinesis_streams": _list_collector("kinesis_streams"),
+    "msk_clusters": _list_collector("msk_clusters"),
+}
+
+
+class _Entry:
+    __slots__ = ("data", "updated_at", "last_attempt", "last_error", "last_duration", "inflight")
+
+    def __init__(self):
+        self.data: Any = None
+        self.updated_at: Optional[float] = None   # 마지막 성공 시각
+        self.last_attempt: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_duration: Optional[float] = None
+        self.inflight: Optional[asyncio.Task] = None
+
+
+class SnapshotStore:
+    """
+    수집기별 최신 성공 스냅샷을 메모리에 보관.
+    - 수집기마다 독립 주기로 백그라운드 갱신
+    - 실패 시 이전 스냅샷 유지 (다른 수집기 데이터에 영향 없음)
+    - 요청은 항상 스냅샷으로 응답, 주기가 지난 항목은 백그라운드 재검증(stale-while-revalidate)
+    """
+
+    def __init__(self, collectors: Dict[str, Callable[[], Any]], intervals: Optional[Dict[str, int]] = None):
+        self.collectors = collectors
+        self.intervals = {name: DEFAULT_INTERVAL_SEC for name in collectors}
+        self.intervals.update({k: v for k, v in (intervals or {}).items() if k in collectors})
+        self._entries: Dict[str, _Entry] = {name: _Entry() for name in collectors}
+        self._tasks: list[asyncio.Task] = []
+        self.version = 0  # 어떤 수집기든 새 데이터로 갱신될 때마다 증가
+        # 갱신 성공(부분 갱신 포함) 후 (이름, 새 데이터)로 호출되는 리스너 (스레드에서 실행되므로 이벤트 루프를 막지 않음)
+        # 실패한 갱신은 호출하지 않으므로 변경 로그에 장애로 인한 removed/added가 생기지 않는다
+        self.listeners: list[Callable[[str, Any], None]] = []
+
+    def _notify(self, name: str, data: Any):
+        for listener in self.listeners:
+            try:
+                listener(name, data)
+            except Exception as e:
+                logger.warning(f"Snapshot listener failed for {name}: {e}")
+
+    async def _collect(self, name: str) -> Any:
+        fn = self.collectors[name]
+        # 비동기 수집기(asyncpg)는 스레드 없이 await, 동기 수집기는 스레드에서 실행
+        return await fn() if inspect.iscoroutinefunction(fn) else await asyncio.to_thread(fn)
+
+    # ── 갱신 ────────────────────────────────────────────────
+    async def _run(self, name: str) -> bool:
+        entry = self._entries[name]
+        started = time.time()
+        entry.last_attempt = started
+        partial = None
+        try:
+            try:
+                data = await self._collect(name)
+            except collector.PartialFetchError as e:
+                # 실패한 리전은 이전 스냅샷 행을 유지 (타임아웃 한 번에 그 리전 리소스가 "삭제"되지 않도록)
+                data = self._merge_partial(entry.data, e)
+                partial = str(e)
+        except Exception as e:
+            entry.last_error = str(e).splitlines()[0] if str(e) else e.__class__.__name__
+            logger.warning(f"Snapshot refresh failed for {name}: {entry.last_error}")
+            SNAPSHOT_REFRESH_SECONDS.observe(time.time() - started, name, "error")
+            return False
+        finally:
+            entry.last_duration = time.time() - started
+            # 요청이 트리거한 갱신이면 그 요청의 Server-Timing에 수집기별 시간으로 남는다
+            record(f"collect.{name}", entry.last_duration)
+        SNAPSHOT_REFRESH_SECONDS.observe(entry.last_duration, name, "partial" if partial else "ok")
+        if partial:
+            logger.warning(f"Snapshot refresh partial for {partial}")
+        entry.data = data
+        entry.updated_at = time.time()
+        entry.last_error = partial  # 부분 갱신은 재시도 간격 뒤 다시 시도
+        self.version += 1
+        # 리스너(변경 로그/인덱스)는 데이터 교체 후에 호출: /all-resources가 먼저 읽은 X-Change-Cursor가
+        # 응답 데이터에 아직 반영되지 않은 변경 이벤트를 포함하는 일이 없도록 (반대 순서는 재적용이라 무해)
+        if self.listeners:
+            await asyncio.to_thread(self._notify, name, data)
+        return partial is None
+
+    @staticmethod
+    def _merge_partial(previous: Any, e: "collector.PartialFetchError") -> list:
+        failed = set(e.failed_regions)
+        kept = [row for row in previous or [] if isinstance(row, dict) and row.get("region") in failed]
+        return collector.merge_rows(e.rows, kept)
+
+    async def refresh(self, name: str) -> bool:
+        """동일 수집기에 대한 동시 갱신은 하나의 실행을 공유"""
+        entry = self._entries[name]
+        if entry.inflight is None or entry.inflight.done():
+            entry.inflight = asyncio.create_task(self._run(name))
+        return await asyncio.shield(entry.inflight)
+
+    async def refresh_all(self):
+        await asyncio.gather(*(self.refresh(name) for name in self.collectors))
+
+    def _retry_pending(self, name: str, now: float) -> bool:
+        """마지막 시도가 실패했고 재시도 간격이 아직 지나지 않았는지"""
+        entry = self._entries[name]
+        return (entry.last_error is not None and entry.last_attempt is not None
+                and now - entry.last_attempt < min(RETRY_SEC, self.intervals[name]))
+
+    def _is_stale(self, name: str, now: float) -> bool:
+        entry = self._entries[name]
+        if entry.last_error is not None:
+            # 실패/부분 갱신은 주기와 상관없이 재시도 간격마다
+            return not self._retry_pending(name, now)
+        return entry.updated_at is None or now - entry.updated_at >= self.intervals[name]
+
+    def _should_wait(self, name: str) -> bool:
+        # 한 번도 성공하지 못한 수집기는 첫 시도(진행 중이면 그 결과)만 기다린다.
+        # 실패한 뒤에는 요청을 붙잡지 않고 기본값(빈 목록)으로 응답, 재시도는 RETRY_SEC 뒤 백그라운드에서.
+        entry = self._entries[name]
+        return entry.updated_at is None and entry.last_error is None
+
+    def _revalidate(self, name: str, now: float):
+        # 백그라운드 스케줄러가 꺼져 있으면 요청이 재검증을 대신 트리거
+        entry = self._entries[name]
+        if not self._tasks and self._is_stale(name, now) and (entry.inflight is None or entry.inflight.done()):
+            entry.inflight = asyncio.create_task(self._run(name))
+
+    # ── 조회 ────────────────────────────────────────────────
+    async def get(self, name: str) -> tuple[Any, float]:
+        """
+        수집기 하나의 (데이터, 나이[초]).
+        첫 시도면 갱신을 기다리고, 실패했으면(이후 요청 포함, 재시도 성공 전까지) 데이터는 None.
+        """
+        entry = self._entries[name]
+        if self._should_wait(name):
+            await self.refresh(name)
+        now = time.time()
+        self._revalidate(name, now)
+        return entry.data, (now - entry.updated_at if entry.updated_at is not None else 0.0)
+
+    async def get_all(self) -> tuple[Dict[str, Any], float]:
+        """
+        (데이터, 가장 오래된 스냅샷의 나이[초]) 반환.
+        한 번도 시도하지 않은 수집기만 기다리고, 나머지는 stale이거나 실패 중이어도 즉시 응답.
+        """
+        cold = [name for name in self._entries if self._should_wait(name)]
+        if cold:
+            await asyncio.gather(*(self.refresh(name) for name in cold))
+
+        now = time.time()
+        for name in self.collectors:
+            self._revalidate(name, now)
+
+        data = {}
+        age = 0.0
+        for name, entry in self._entries.items():
+            data[name] = entry.data if entry.data is not None else ([] if name != "feature_groups" else {})
+            if entry.updated_at is not None:
+                age = max(age, now - entry.updated_at)
+        return data, age
+
+    def status(self) -> Dict[str, Any]:
+        now = time.time()
+        out = {}
+        for name, entry in self._entries.items():
+            out[name] = {
+                "loaded": entry.updated_at is not None,
+                "age_sec": round(now - entry.updated_at, 1) if entry.updated_at else None,
+                "interval_sec": self.intervals[name],
+                "refreshing": bool(entry.inflight and not entry.inflight.done()),
+                "last_duration_ms": round(entry.last_duration * 1000) if entry.last_duration is not None else None,
+                "last_error": entry.last_error,
+            }
+        return out
+
+    # ── 백그라운드 스케줄러 (FastAPI lifespan에서 시작/종료) ─────────
+    async def _loop(self, name: str):
+        while True:
+            ok = await self.refresh(name)
+            await asyncio.sleep(self.intervals[name] if ok else min(RETRY_SEC, self.intervals[name]))
+
+    def start(self):
+        if not REFRESH_ENABLED or self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._loop(name), name=f"snapshot:{name}") for name in self.collectors]
+        logger.info(f"Snapshot refresher started for {len(self._tasks)} collectors")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+store = SnapshotStore(COLLECTORS, _parse_intervals(os.getenv("SNAPSHOT_REFRESH_INTERVALS", "")))
+
+# 전체 컬럼(select *)으로 수집할 때만 상세 조회 인덱스로 쓸 수 있다
+if collector.DEFAULT_PROFILE == "full":
+    store.listeners.append(resource_index.update)
+
+# 스냅샷 간 변경 추적 (/api/changes)
+store.listeners.append(change_log.update)
+
+# 목록 라우트 keyset 페이지네이션용 정렬 (?limit=&cursor=)
+store.listeners.append(page_index.update)
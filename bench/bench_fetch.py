@@ -0,0 +1,148 @@
+# bench/bench_fetch.py
+"""
+Steampipe 조회(utils/steampipe.query) 행 디코딩 경로 벤치마크 (Steampipe 불필요).
+
+합성 wide 결과셋(JSONB 정책/태그/라이프사이클 컬럼 포함)을 만들어
+- before: pandas DataFrame 왕복 + replace/where + to_dict + 재귀 _sanitize
+- after : fetchmany 배치 + json_safe 단일 패스
+의 처리 시간과 피크 메모리(tracemalloc)를 비교한다.
+
+    python -m bench.bench_fetch --rows 5000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import steampipe  # noqa: E402
+
+
+class _FakeResult:
+    """SQLAlchemy CursorResult 중 fetch 경로가 쓰는 부분만 흉내낸다."""
+
+    def __init__(self, columns, rows):
+        self._columns = columns
+        self._rows = rows
+        self._pos = 0
+
+    def keys(self):
+        return self._columns
+
+    def fetchmany(self, size):
+        chunk = self._rows[self._pos:self._pos + size]
+        self._pos += len(chunk)
+        return chunk
+
+    def fetchall(self):
+        return self.fetchmany(len(self._rows))
+
+
+def make_rows(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    columns = [
+        "name", "arn", "region", "creation_date", "versioning_enabled", "size_gb",
+        "cost", "score", "policy", "tags", "lifecycle_rules", "acl", "replication",
+    ]
+    rows = []
+    for i in range(n):
+        policy = {
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Sid": f"s{j}",
+                    "Effect": "Allow",
+                    "Principal": {"AWS": f"arn:aws:iam::{rnd.randint(10**11, 10**12)}:root"},
+                    "Action": ["s3:GetObject", "s3:PutObject"],
+                    "Resource": f"arn:aws:s3:::bucket-{i}/*",
+                }
+                for j in range(8)
+            ],
+        }
+        rows.append((
+            f"bucket-{i:06d}",
+            f"arn:aws:s3:::bucket-{i:06d}",
+            "ap-northeast-2",
+            datetime(2023, 1, 1, tzinfo=timezone.utc),
+            bool(i % 2),
+            None if i % 7 == 0 else rnd.randint(1, 4096),
+            Decimal("12.50"),
+            float("nan") if i % 11 == 0 else rnd.random(),
+            policy,
+            {f"tag{j}": f"value-{j}" for j in range(20)},
+            [{"ID": f"rule{j}", "Status": "Enabled", "Expiration": {"Days": 30 + j}} for j in range(5)],
+            {"Grants": [{"Permission": "FULL_CONTROL"}], "Owner": {"ID": "x" * 64}},
+            None,
+        ))
+    return columns, rows
+
+
+def run_before(columns, rows):
+    import numpy as np
+    import pandas as pd
+
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    df = df.replace({np.nan: None, np.inf: None, -np.inf: None})
+    df = df.where(pd.notnull(df), None)
+    data = df.to_dict(orient="records")
+
+    def _sanitize(val):
+        if isinstance(val, float):
+            if math.isnan(val) or math.isinf(val):
+                return None
+            return val
+        if isinstance(val, list):
+            return [_sanitize(v) for v in val]
+        if isinstance(val, dict):
+            return {k: _sanitize(v) for k, v in val.items()}
+        return val
+
+    return [_sanitize(row) for row in data]
+
+
+def run_after(columns, rows):
+    return list(steampipe.iter_rows(_FakeResult(columns, rows)))
+
+
+def measure(fn, columns, rows, repeat: int):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(columns, rows)
+        times.append(time.perf_counter() - t0)
+    # tracemalloc은 실행 속도를 크게 떨어뜨리므로 메모리는 별도 1회 측정
+    tracemalloc.start()
+    fn(columns, rows)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    times.sort()
+    return {"best_ms": round(times[0] * 1000, 2), "median_ms": round(times[len(times) // 2] * 1000, 2), "peak_kb": peak // 1024}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    columns, rows = make_rows(args.rows)
+    report = {"rows": args.rows, "columns": len(columns)}
+    try:
+        report["before_pandas"] = measure(run_before, columns, rows, args.repeat)
+    except ImportError:
+        report["before_pandas"] = "pandas/numpy not installed"
+    report["after_streaming"] = measure(run_after, columns, rows, args.repeat)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
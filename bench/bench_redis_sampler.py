@@ -0,0 +1,136 @@
+# bench/bench_redis_sampler.py
+"""
+explorer Redis 샘플링 왕복(RTT) 벤치마크 (로컬 redis-server 필요).
+
+키마다 TYPE/TTL/MEMORY USAGE + 값 조회를 따로 보내던 방식과
+SCAN 배치당 파이프라인 2회로 묶는 현재 방식(iter_redis_data)을 비교한다.
+로컬 서버는 RTT가 거의 0이므로 --latency-ms로 왕복마다 지연을 더해 원격 ElastiCache를 흉내낸다.
+
+    redis-server --port 6379 &
+    python -m bench.bench_redis_sampler --keys 500 --latency-ms 1
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis  # noqa: E402
+from redis.connection import Connection  # noqa: E402
+
+from apps import explorer  # noqa: E402
+
+PREFIX = "bench:"
+
+
+class _RoundTrips:
+    """Connection.send_packed_command 호출 = 왕복 1회로 세고, 필요하면 지연을 더한다"""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000.0
+        self.count = 0
+        self._orig = Connection.send_packed_command
+
+    def __enter__(self):
+        rt = self
+
+        def send(conn, command, check_health=True):
+            rt.count += 1
+            if rt.latency:
+                time.sleep(rt.latency)
+            return rt._orig(conn, command, check_health)
+
+        Connection.send_packed_command = send
+        return self
+
+    def __exit__(self, *exc):
+        Connection.send_packed_command = self._orig
+
+
+def _seed(r, n: int):
+    pipe = r.pipeline(transaction=False)
+    for i in range(n):
+        k = f"{PREFIX}{i:05d}"
+        kind = i % 5
+        if kind == 0:
+            pipe.set(k, json.dumps({"id": i, "email": f"user{i}@example.com"}))
+        elif kind == 1:
+            pipe.rpush(k, *[f"item-{j}" for j in range(20)])
+        elif kind == 2:
+            pipe.sadd(k, *[f"member-{j}" for j in range(20)])
+        elif kind == 3:
+            pipe.zadd(k, {f"z-{j}": j for j in range(20)})
+        else:
+            pipe.hset(k, mapping={f"f{j}": j for j in range(20)})
+        if i % 3 == 0:
+            pipe.expire(k, 3600)
+    pipe.execute()
+
+
+def _sample_per_key(r, pattern: str, limit: int, per_collection_limit: int) -> int:
+    """예전 방식: 키마다 명령을 하나씩 보낸다 (비교 기준)"""
+    n = 0
+    for k in r.scan_iter(match=pattern, count=200):
+        if n >= limit:
+            break
+        ktype = r.type(k).decode()
+        r.ttl(k)
+        try:
+            r.memory_usage(k)
+        except redis.ResponseError:
+            pass
+        explorer._queue_value_reads(r, k, ktype, per_collection_limit)
+        n += 1
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=6379)
+    ap.add_argument("--db", type=int, default=15)
+    ap.add_argument("--keys", type=int, default=500)
+    ap.add_argument("--latency-ms", type=float, default=1.0)
+    ap.add_argument("--per-collection-limit", type=int, default=50)
+    args = ap.parse_args()
+
+    r = redis.Redis(host=args.host, port=args.port, db=args.db)
+    r.delete(*(r.keys(PREFIX + "*") or [PREFIX]))
+    _seed(r, args.keys)
+    pattern = PREFIX + "*"
+
+    report = {"keys": args.keys, "latency_ms": args.latency_ms, "runs": []}
+    try:
+        with _RoundTrips(args.latency_ms) as rt:
+            t0 = time.perf_counter()
+            n = _sample_per_key(r, pattern, args.keys, args.per_collection_limit)
+            report["runs"].append({
+                "mode": "per_key",
+                "keys": n,
+                "round_trips": rt.count,
+                "seconds": round(time.perf_counter() - t0, 3),
+            })
+
+        with _RoundTrips(args.latency_ms) as rt:
+            t0 = time.perf_counter()
+            out = list(explorer.iter_redis_data(args.host, args.port, None, args.db, pattern,
+                                                args.keys, args.per_collection_limit))
+            report["runs"].append({
+                "mode": "pipelined",
+                "keys": len(out),
+                "round_trips": rt.count,
+                "seconds": round(time.perf_counter() - t0, 3),
+                "errors": sum(1 for o in out if "error" in o),
+            })
+    finally:
+        r.delete(*(r.keys(PREFIX + "*") or [PREFIX]))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# bench/bench_startup.py
+"""
+앱 기동 시간 벤치마크.
+
+1) `import main` 소요 시간 (별도 프로세스에서 여러 번, 무거운 모듈이 import 시점에 로드되는지도 확인)
+2) uvicorn 기동 후 /health가 200을 줄 때까지 걸린 시간
+3) /ready가 200을 줄 때까지 걸린 시간 (Steampipe가 없으면 --ready-timeout 동안 503 → null)
+
+기본값은 Steampipe가 아직 안 떠 있는 상황(연결 불가 포트)을 흉내낸다.
+실제 Steampipe로 재려면 --steampipe-port 9193 (필요하면 STEAMPIPE_DB_* 환경변수도).
+
+    python -m bench.bench_startup --runs 5
+    python -m bench.bench_startup --steampipe-port 9193 --ready-timeout 30
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import 시점에 로드되면 안 되는(첫 사용 시 로드) 무거운 모듈
+HEAVY_MODULES = ["boto3", "botocore", "asyncpg", "redis", "sqlalchemy", "psycopg2", "pandas", "numpy", "kafka"]
+# 이 중 하나라도 import 시점에 로드되면 벤치마크를 실패로 끝낸다
+MUST_STAY_LAZY = ["botocore"]
+
+_IMPORT_PROBE = (
+    "import json, sys, time; t0 = time.perf_counter(); import main; "
+    "print(json.dumps({'seconds': time.perf_counter() - t0, "
+    f"'heavy_loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))"
+)
+
+
+def _env(args) -> dict:
+    env = dict(os.environ)
+    env.pop("ALLOWED_REGIONS", None)  # 리전 조회 경로까지 포함해 잰다
+    env["STEAMPIPE_DB_HOST"] = args.steampipe_host
+    env["STEAMPIPE_DB_PORT"] = str(args.steampipe_port)
+    env["SNAPSHOT_REFRESH_ENABLED"] = "false"
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _status(url: str) -> int | None:
+    try:
+        with urllib.request.urlopen(url, timeout=2) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except Exception:
+        return None
+
+
+def _wait_for(url: str, started: float, timeout: float) -> float | None:
+    while time.perf_counter() - started < timeout:
+        if _status(url) == 200:
+            return time.perf_counter() - started
+        time.sleep(0.02)
+    return None
+
+
+def measure_import(args) -> dict:
+    samples, heavy = [], []
+    for _ in range(args.runs):
+        out = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], cwd=ROOT, env=_env(args),
+                             capture_output=True, text=True, timeout=120)
+        if out.returncode != 0:
+            raise RuntimeError(out.stderr)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        heavy = result["heavy_loaded"]
+    return {
+        "runs": args.runs,
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+        "heavy_loaded_at_import": heavy,
+    }
+
+
+def measure_server(args) -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=_env(args), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        health = _wait_for(f"{base}/health", started, 60)
+        ready = _wait_for(f"{base}/ready", started, args.ready_timeout) if health is not None else None
+        return {
+            "health_ms": round(health * 1000, 1) if health is not None else None,
+            "ready_ms": round(ready * 1000, 1) if ready is not None else None,
+            "ready_status": _status(f"{base}/ready"),
+        }
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--steampipe-host", default="127.0.0.1")
+    ap.add_argument("--steampipe-port", type=int, default=1, help="기본값 1: 연결 불가(Steampipe 미기동)")
+    ap.add_argument("--ready-timeout", type=float, default=5.0)
+    args = ap.parse_args()
+
+    report = {
+        "steampipe": f"{args.steampipe_host}:{args.steampipe_port}",
+        "import": measure_import(args),
+        "server": measure_server(args),
+    }
+    print(json.dumps(report, indent=2))
+
+    eager = [m for m in MUST_STAY_LAZY if m in report["import"]["heavy_loaded_at_import"]]
+    assert not eager, f"loaded at `import main`: {', '.join(eager)}"
+
+
+if __name__ == "__main__":
+    main()
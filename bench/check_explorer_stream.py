@@ -0,0 +1,108 @@
+# bench/check_explorer_stream.py
+"""
+Explorer NDJSON 스트리밍(?stream=1)과 일반 JSON 응답이 같은 값을 내보내는지 확인
+(실제 DB 없이 RDS 샘플러를 psycopg2가 돌려주는 타입의 행으로 바꿔 TestClient로 실행).
+
+- datetime(naive/aware), date, time, Decimal, bytes, UUID, 중첩 dict/list, None
+- 스트리밍 각 줄 == JSON 응답의 같은 행
+
+    python -m bench.check_explorer_stream
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import apps.explorer as explorer  # noqa: E402
+from routers.explorer_router import router  # noqa: E402
+
+ROWS = [
+    {
+        "id": 1,
+        "created_at": datetime(2024, 5, 1, 12, 30, 15, 123456),
+        "updated_at": datetime(2024, 5, 1, 3, 0, tzinfo=timezone(timedelta(hours=9))),
+        "birth": date(1990, 1, 2),
+        "opens": time(9, 30),
+        "balance": Decimal("1234.50"),
+        "ratio": Decimal("0.125"),
+        "count": Decimal("42"),
+        "raw": b"card-4111",
+        "uid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "meta": {"tags": ["pii", Decimal("1.5")], "seen": datetime(2024, 1, 1)},
+        "note": None,
+    },
+    {
+        "id": 2,
+        "created_at": datetime(2024, 5, 2),
+        "updated_at": None,
+        "birth": None,
+        "opens": None,
+        "balance": Decimal("-0.01"),
+        "ratio": Decimal("1E+2"),
+        "count": Decimal("0"),
+        "raw": b"",
+        "uid": None,
+        "meta": {},
+        "note": "한글",
+    },
+]
+
+
+def _get_rows(*_):
+    return {"table": "customers", "rows": [dict(r) for r in ROWS]}
+
+
+def _iter_rows(*_):
+    for row in ROWS:
+        yield dict(row)
+
+
+def check_stream_matches_json():
+    orig = explorer.get_rds_data, explorer.iter_rds_data
+    explorer.get_rds_data, explorer.iter_rds_data = _get_rows, _iter_rows
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    params = {"endpoint": "db.local", "password": "x", "table_name": "customers"}
+    try:
+        with TestClient(app) as client:
+            plain = client.get("/api/explorer/rds/db1", params=params)
+            streamed = client.get("/api/explorer/rds/db1", params={**params, "stream": "true"})
+    finally:
+        explorer.get_rds_data, explorer.iter_rds_data = orig
+
+    assert plain.status_code == 200 and streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    json_rows = plain.json()["rows"]
+    stream_rows = [json.loads(line) for line in streamed.text.splitlines() if line]
+    assert len(stream_rows) == len(json_rows) == len(ROWS)
+    for s, j in zip(stream_rows, json_rows):
+        assert s == j, f"stream {s} != json {j}"
+    # 대표 값 형태 (datetime은 ISO 'T' 구분자, bytes는 문자열)
+    assert stream_rows[0]["created_at"] == "2024-05-01T12:30:15.123456"
+    assert stream_rows[0]["raw"] == "card-4111"
+
+
+CHECKS = [
+    check_stream_matches_json,
+]
+
+
+def main():
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    for check in CHECKS:
+        check()
+        print(f"ok  {check.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# bench/check_http_headers.py
+"""
+캐시 경로(_run_with_cache_and_etag) 응답 헤더 확인 (Steampipe/AWS 없이 TestClient로 실행).
+
+- MISS / HIT / gzip HIT 모두 Cache-Control, Vary, ETag가 정확히 한 번씩 나가는지
+- 핸들러가 주입된 response에 붙인 다른 헤더(Set-Cookie 여러 개 포함)가 유지되는지
+- If-None-Match 일치 시 304에도 ETag가 한 번만 붙는지
+
+    python -m bench.check_http_headers
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request, Response  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import routers.repository as repository  # noqa: E402
+import routers.resources as resources  # noqa: E402
+from utils.session_cache import cache_clear  # noqa: E402
+
+# gzip 저장 임계값(CACHE_COMPRESS_MIN_BYTES)을 넘는 크기
+ROWS = [{"id": i, "name": f"bucket-{i}", "tags": {"env": "bench"}} for i in range(200)]
+
+
+async def _rows():
+    return ROWS
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/resources")
+    async def via_resources(request: Request, response: Response):
+        response.set_cookie("a", "1")
+        response.set_cookie("b", "2")
+        return await resources._run_with_cache_and_etag(request, response, _rows, ttl_sec=60)
+
+    @app.get("/repository")
+    async def via_repository(request: Request, response: Response):
+        return await repository._run_with_cache_and_etag(request, response, _rows, ttl_sec=60)
+
+    return app
+
+
+def _single(r, name: str) -> str:
+    values = r.headers.get_list(name)
+    assert len(values) == 1, f"{r.request.url.path} [{r.headers.get('X-Cache')}] {name}: {values}"
+    return values[0]
+
+
+def check_cache_headers(client: TestClient, path: str):
+    cache_clear()
+    plain = {"Accept-Encoding": "identity"}
+    miss = client.get(path, headers=plain)
+    hit = client.get(path, headers=plain)
+    gz = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert [r.headers["X-Cache"] for r in (miss, hit, gz)] == ["MISS", "HIT", "HIT"]
+
+    for r in (miss, hit, gz):
+        assert r.status_code == 200 and r.json() == ROWS
+        assert _single(r, "Cache-Control") == "private, must-revalidate"
+        assert _single(r, "Vary") == "Accept-Encoding"
+        _single(r, "ETag")
+        _single(r, "X-Cache")
+    assert _single(gz, "Content-Encoding") == "gzip"
+    assert "content-encoding" not in hit.headers
+
+    etag = miss.headers["ETag"]
+    assert hit.headers["ETag"] == etag
+    not_modified = client.get(path, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert _single(not_modified, "ETag") == etag
+    return miss, hit
+
+
+def check_resources():
+    with TestClient(_app()) as client:
+        miss, hit = check_cache_headers(client, "/resources")
+    # 주입된 response의 Set-Cookie는 MISS 응답에 그대로 (중복 키 포함)
+    assert sorted(c.split(";")[0] for c in miss.headers.get_list("set-cookie")) == ["a=1", "b=2"]
+
+
+def check_repository():
+    with TestClient(_app()) as client:
+        check_cache_headers(client, "/repository")
+
+
+CHECKS = [
+    check_resources,
+    check_repository,
+]
+
+
+def main():
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    for check in CHECKS:
+        check()
+        print(f"ok  {check.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# bench/check_kafka_tail.py
+"""
+MSK tail 샘플링(_sample_topic_tail) 동작 확인 (Kafka 브로커 없이 가짜 컨슈머로 실행).
+
+- 빈 토픽 / 없는 토픽
+- 짧은 파티션: 시작 위치가 beginning offset 아래로 내려가지 않는지
+- 여러 파티션: 파티션마다 end - ceil(limit / 비어 있지 않은 파티션 수)로 seek 하는지, 타임스탬프 순 병합
+- 조회 중 새로 들어온 메시지(end offset 이후)는 제외하고 end offset에서 멈추는지
+- 컴팩션으로 비어 있는 오프셋이 있어도 position 기준으로 끝나는지
+- kafka_pool(consumer_factory 주입) → get_msk_records 경로
+
+    python -m bench.check_kafka_tail
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps import explorer  # noqa: E402
+from utils.kafka_pool import KafkaConsumerPool  # noqa: E402
+
+Message = namedtuple("Message", ["topic", "partition", "offset", "timestamp", "key", "value"])
+
+
+def _tp_key(tp):
+    return (tp.topic, tp.partition)
+
+
+class FakeConsumer:
+    """
+    kafka.KafkaConsumer 중 _sample_topic_tail이 쓰는 부분만 흉내낸다.
+    logs: {topic: {partition: [(offset, timestamp), ...]}} (오프셋은 증가 순, 빠진 번호는 컴팩션된 것)
+    """
+
+    def __init__(self, logs, begin=None, batch=3):
+        self.logs = logs
+        self.begin = begin or {}
+        self.batch = batch
+        self.assigned = []
+        self.seeks = {}
+        self._pos = {}
+
+    def _log(self, tp):
+        return self.logs.get(tp.topic, {}).get(tp.partition, [])
+
+    def partitions_for_topic(self, topic):
+        parts = self.logs.get(topic)
+        return set(parts) if parts is not None else None
+
+    def end_offsets(self, tps):
+        return {tp: (self._log(tp)[-1][0] + 1 if self._log(tp) else self.begin.get(_tp_key(tp), 0)) for tp in tps}
+
+    def beginning_offsets(self, tps):
+        return {tp: self.begin.get(_tp_key(tp), self._log(tp)[0][0] if self._log(tp) else 0) for tp in tps}
+
+    def assign(self, tps):
+        self.assigned = list(tps)
+
+    def seek(self, tp, offset):
+        self.seeks[_tp_key(tp)] = offset
+        self._pos[_tp_key(tp)] = offset
+
+    def position(self, tp):
+        return self._pos[_tp_key(tp)]
+
+    def poll(self, timeout_ms=0):
+        out = {}
+        for tp in self.assigned:
+            pos = self._pos[_tp_key(tp)]
+            msgs = [Message(tp.topic, tp.partition, off, ts, None, f'{{"p": {tp.partition}, "o": {off}}}'.encode())
+                    for off, ts in self._log(tp) if off >= pos][:self.batch]
+            if msgs:
+                out[tp] = msgs
+                self._pos[_tp_key(tp)] = msgs[-1].offset + 1
+            else:
+                # 컴팩션으로 비어 있는 구간은 건너뛴다 (로그 끝 이후로는 진행하지 않음)
+                log = self._log(tp)
+                if log and pos <= log[-1][0]:
+                    self._pos[_tp_key(tp)] = log[-1][0] + 1
+        return out
+
+    def topics(self):
+        return set(self.logs)
+
+    def close(self):
+        pass
+
+
+def _log(offsets, ts0, step=10):
+    return [(o, ts0 + i * step) for i, o in enumerate(offsets)]
+
+
+def check_missing_and_empty():
+    c = FakeConsumer({"empty": {0: [], 1: []}})
+    assert explorer._sample_topic_tail(c, "nope", 10, 1.0) is None
+    assert explorer._sample_topic_tail(c, "empty", 10, 1.0) == []
+    assert c.assigned == [] and c.seeks == {}, "빈 토픽은 assign/seek 하지 않아야 함"
+
+    # 보존 기간으로 전부 삭제된 파티션 (begin == end > 0)
+    c = FakeConsumer({"expired": {0: []}}, begin={("expired", 0): 42})
+    assert explorer._sample_topic_tail(c, "expired", 5, 1.0) == []
+
+
+def check_short_partition_clamps_to_beginning():
+    # limit 8, 파티션 2개 → 파티션당 4건. p0은 2건뿐이고 begin=100이므로 seek는 100
+    c = FakeConsumer({"t": {0: _log([100, 101], 1000), 1: _log(range(0, 10), 2000)}})
+    records = explorer._sample_topic_tail(c, "t", 8, 1.0)
+    assert c.seeks == {("t", 0): 100, ("t", 1): 6}, c.seeks
+    assert [(r["partition"], r["offset"]) for r in records] == [(0, 100), (0, 101), (1, 6), (1, 7), (1, 8), (1, 9)]
+
+
+def check_multi_partition_seek_and_merge():
+    # limit 10, 데이터가 있는 파티션 3개 → ceil(10/3) = 4건씩 (빈 파티션 3은 나눗셈·assign 모두에서 빠짐)
+    logs = {"t": {
+        0: _log(range(0, 50), 1000, step=7),
+        1: _log(range(0, 20), 1001, step=13),
+        2: _log(range(0, 9), 1002, step=29),
+        3: [],
+    }}
+    c = FakeConsumer(logs)
+    records = explorer._sample_topic_tail(c, "t", 10, 1.0)
+    assert c.seeks == {("t", 0): 46, ("t", 1): 16, ("t", 2): 5}, c.seeks
+    assert sorted(tp.partition for tp in c.assigned) == [0, 1, 2]
+    assert len(records) == 10
+    stamps = [(r["timestamp"], r["partition"], r["offset"]) for r in records]
+    assert stamps == sorted(stamps), "타임스탬프 순 병합"
+    # 12건(4 x 3) 중 타임스탬프가 가장 이른 2건이 잘린다
+    every = sorted((ts, p, o) for p, log in logs["t"].items() for o, ts in log[-4:])
+    assert stamps == every[-10:]
+    assert records[0]["value"] == {"p": records[0]["partition"], "o": records[0]["offset"]}
+
+
+def check_stops_at_end_offset():
+    logs = {"t": {0: _log(range(0, 10), 1000)}}
+    c = FakeConsumer(logs, batch=2)
+    end_offsets = c.end_offsets
+
+    def end_then_produce(tps):
+        # end offset을 잰 직후 새 메시지가 들어온 상황
+        snapshot = end_offsets(tps)
+        logs["t"][0].extend(_log(range(10, 15), 5000))
+        return snapshot
+
+    c.end_offsets = end_then_produce
+    started = time.monotonic()
+    records = explorer._sample_topic_tail(c, "t", 4, 5.0)
+    assert time.monotonic() - started < 1.0, "end offset에 닿으면 타임아웃까지 기다리지 않아야 함"
+    assert [r["offset"] for r in records] == [6, 7, 8, 9], records
+
+
+def check_compacted_gaps():
+    # 오프셋 6, 8이 컴팩션으로 사라짐: 범위 [6, 10)에서 7, 9만 나오고 position으로 종료
+    c = FakeConsumer({"t": {0: [(o, 1000 + o) for o in (0, 1, 2, 3, 4, 5, 7, 9)]}})
+    started = time.monotonic()
+    records = explorer._sample_topic_tail(c, "t", 4, 5.0)
+    assert time.monotonic() - started < 1.0
+    assert [r["offset"] for r in records] == [7, 9], records
+
+
+def check_pool_path():
+    made = []
+
+    def factory(servers, **_):
+        made.append(servers)
+        return FakeConsumer({"t": {0: _log(range(0, 5), 1000)}})
+
+    arn = "arn:aws:kafka:ap-northeast-2:000000000000:cluster/bench/1"
+    original_pool = explorer.kafka_pool
+    explorer._msk_bootstrap_cache[arn] = ("b-1:9092", time.monotonic() + 60)
+    explorer.kafka_pool = KafkaConsumerPool(consumer_factory=factory)
+    try:
+        assert explorer.get_msk_records(arn, None)["topics"] == ["t"]
+        out = explorer.get_msk_records(arn, "t", limit=3, timeout_sec=1.0)
+        assert [r["offset"] for r in out["records"]] == [2, 3, 4], out
+        assert "error" in explorer.get_msk_records(arn, "missing", limit=3, timeout_sec=1.0)
+        assert made == ["b-1:9092"], "같은 bootstrap 서버는 컨슈머 하나를 재사용"
+    finally:
+        explorer.kafka_pool = original_pool
+        explorer._msk_bootstrap_cache.pop(arn, None)
+
+
+CHECKS = [
+    check_missing_and_empty,
+    check_short_partition_clamps_to_beginning,
+    check_multi_partition_seek_and_merge,
+    check_stops_at_end_offset,
+    check_compacted_gaps,
+    check_pool_path,
+]
+
+
+def main():
+    for check in CHECKS:
+        check()
+        print(f"ok  {check.__name__}")
+
+
+if __name__ == "__main__":
+    main()
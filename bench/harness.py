@@ -0,0 +1,99 @@
+# bench/harness.py
+"""
+벤치마크 공용 측정 도구.
+
+- measure(): 워밍업 후 반복 실행해 p50/p99/평균 지연(ms)과 처리량(초당 items)을 계산
+- rss_mb()/peak_rss_mb(): 현재/최대 RSS (여러 번 실행한 결과를 JSON으로 비교할 수 있도록 MB 단위)
+"""
+from __future__ import annotations
+
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """최근접 순위(nearest-rank) 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트
+    return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def measure(
+    fn: Callable[[], Any],
+    iterations: int,
+    warmup: int = 1,
+    items: int = 1,
+    setup: Optional[Callable[[], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    fn을 warmup회 실행한 뒤 iterations회 측정.
+    setup은 매 반복 전에 실행되며 측정 시간에 포함되지 않는다 (콜드 경로 재현용).
+    items는 1회 실행이 처리하는 단위 수 (처리량 = items * 반복 / 측정 시간 합).
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    rss_before = rss_mb()
+    samples: list[float] = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+
+    samples.sort()
+    total = sum(samples)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "mean_ms": round(total / len(samples) * 1000, 3),
+        "min_ms": round(samples[0] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+        "throughput_per_sec": round(items * iterations / total, 1) if total > 0 else None,
+        "items_per_iteration": items,
+        "rss_delta_mb": round(rss_mb() - rss_before, 1),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """결과 비교용 실행 환경 정보"""
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        rev = None
+    return {
+        "git_rev": rev,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
@@ -0,0 +1,330 @@
+# bench/run_suite.py
+"""
+로컬 대역(합성 Steampipe 스키마 Postgres, moto, redis-server)으로 돌리는 재현 가능한 벤치마크 묶음.
+
+시나리오 (각각 p50/p99/평균 지연, 처리량, RSS 증가량)
+- fetch               : collector.fetch (S3 버킷 전체 컬럼, 동기 Steampipe 경로)
+- sanitize            : routers.resources._sanitize_value (fetch 결과 rows)
+- etag                : etag_utils.compute_obj_etag (fetch 결과 rows)
+- ttl_cache           : session_cache._TTLCache set/get 2만 회
+- cold_all_resources  : 빈 스냅샷/캐시에서 GET /api/all-resources
+- warm_hit            : GET /api/s3-buckets 캐시 HIT
+- revalidate_304      : If-None-Match로 GET /api/s3-buckets → 304
+- list_page           : GET /api/ebs-volumes?limit=100 스냅샷 keyset 페이지 (첫 페이지 + 다음 커서)
+- s3_sample_1k        : GET /api/explorer/s3/{bucket} 객체 1000개 샘플링 (moto)
+- glue_sample         : GET /api/explorer/glue/{db} 테이블 8개 x S3 객체 50개 샘플링 (moto)
+- kinesis_sample      : GET /api/explorer/kinesis/{stream} 샤드 4개에서 TRIM_HORIZON 100건 (moto)
+- dynamodb_scan       : GET /api/explorer/dynamodb/{table} 아이템 200개 스캔 페이지 (moto)
+- redis_sample_500    : GET /api/explorer/elasticache/redis 키 500개 샘플링 (--redis-url 필요)
+
+준비: bench/requirements.txt 설치 + 빈 Postgres 하나 (스키마/데이터는 이 스크립트가 bench/schema.sql로 채움)
+
+    pip install -r bench/requirements.txt
+    docker run -d -p 5432:5432 -e POSTGRES_HOST_AUTH_METHOD=trust postgres:16
+    redis-server --port 6379 &
+    python -m bench.run_suite --pg-url postgresql://postgres@localhost:5432/postgres \\
+        --redis-url redis://localhost:6379/15 --output bench-results.json
+
+결과 JSON은 environment.git_rev와 함께 저장되므로 변경 전/후 파일을 나란히 비교하면 된다.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.harness import ROOT, environment, measure, peak_rss_mb  # noqa: E402
+
+SCENARIOS = [
+    "fetch", "sanitize", "etag", "ttl_cache",
+    "cold_all_resources", "warm_hit", "revalidate_304", "list_page",
+    "s3_sample_1k", "glue_sample", "kinesis_sample", "dynamodb_scan", "redis_sample_500",
+]
+
+
+def _configure_env(args):
+    """앱 모듈을 import하기 전에 설정 (Steampipe 대신 합성 스키마 Postgres, AWS는 moto)"""
+    os.environ["STEAMPIPE_DB_URL"] = args.pg_url
+    os.environ["SNAPSHOT_REFRESH_ENABLED"] = "false"
+    os.environ.pop("ALLOWED_REGIONS", None)  # aws_region 합성 테이블에서 로딩
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-2")
+    os.environ["AWS_REGION"] = os.environ["AWS_DEFAULT_REGION"]
+
+
+def _load_schema(pg_url: str, rows: int):
+    import psycopg2
+
+    conn = psycopg2.connect(pg_url)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur, open(os.path.join(ROOT, "bench", "schema.sql")) as f:
+            cur.execute(f.read())
+            cur.execute("select bench_seed(%s)", (rows,))
+    finally:
+        conn.close()
+
+
+class Suite:
+    def __init__(self, args, client):
+        self.args = args
+        self.client = client
+        self._rows = None
+
+    def _s3_rows(self):
+        if self._rows is None:
+            from apps import collector
+
+            self._rows = collector.fetch(collector.list_query("s3_buckets"))
+        return self._rows
+
+    # ── 함수 단위 ────────────────────────────────────────────
+    def fetch(self):
+        from apps import collector
+
+        sql = collector.list_query("s3_buckets")
+        return measure(lambda: collector.fetch(sql), self.args.iterations, items=self.args.rows)
+
+    def sanitize(self):
+        from routers.resources import _sanitize_value
+
+        rows = self._s3_rows()
+        return measure(lambda: _sanitize_value(rows), self.args.iterations, items=len(rows))
+
+    def etag(self):
+        from utils.etag_utils import compute_obj_etag
+
+        rows = self._s3_rows()
+        return measure(lambda: compute_obj_etag(rows), self.args.iterations, items=len(rows))
+
+    def ttl_cache(self):
+        from utils.session_cache import _TTLCache
+
+        cache = _TTLCache(ttl=600, max_items=1000)
+        keys = [f"RESP:{i:05d}" for i in range(2000)]
+        blob = b"x" * 2048
+        ops = 10000
+
+        def run():
+            for i in range(ops):
+                key = keys[i % len(keys)]
+                cache.set(key, blob, size=len(blob))
+                cache.get(keys[(i * 7) % len(keys)])
+
+        return measure(run, self.args.iterations, items=ops * 2)
+
+    # ── HTTP (TestClient, 앱 전체 경로) ──────────────────────────
+    def _get(self, path: str, expect: int = 200, **kwargs):
+        r = self.client.get(path, **kwargs)
+        if r.status_code != expect:
+            raise RuntimeError(f"GET {path} -> {r.status_code}: {r.text[:200]}")
+        return r
+
+    def cold_all_resources(self):
+        import apps.snapshot as snapshot
+        import routers.resources as resources
+        from utils.session_cache import cache_clear
+
+        def reset():
+            old = snapshot.store
+            fresh = snapshot.SnapshotStore(old.collectors, old.intervals)
+            fresh.listeners = list(old.listeners)
+            snapshot.store = fresh
+            resources._all_resources_blob.update(version=None, blob=None)
+            cache_clear()
+
+        return measure(lambda: self._get("/api/all-resources"), self.args.iterations, setup=reset)
+
+    def warm_hit(self):
+        self._get("/api/s3-buckets")
+
+        def run():
+            r = self._get("/api/s3-buckets")
+            if r.headers.get("X-Cache") != "HIT":
+                raise RuntimeError(f"expected cache HIT, got {r.headers.get('X-Cache')}")
+
+        return measure(run, self.args.iterations)
+
+    def revalidate_304(self):
+        etag = self._get("/api/s3-buckets").headers["ETag"]
+        return measure(lambda: self._get("/api/s3-buckets", expect=304, headers={"If-None-Match": etag}),
+                       self.args.iterations)
+
+    def list_page(self):
+        def run():
+            page = self._get("/api/ebs-volumes", params={"limit": 100}).json()
+            if page["next_cursor"]:
+                self._get("/api/ebs-volumes", params={"limit": 100, "cursor": page["next_cursor"]})
+
+        return measure(run, self.args.iterations, items=2)
+
+    def s3_sample_1k(self):
+        from apps import explorer
+        from bench.bench_s3_explorer import BUCKET, PREFIX, _add_latency, _seed
+
+        n = self.args.s3_objects
+        _seed(n)
+        _add_latency(explorer._get_s3_client(), self.args.s3_latency_ms)
+        path = f"/api/explorer/s3/{BUCKET}"
+        params = {"prefix": PREFIX, "max_keys": n}
+        return measure(lambda: self._get(path, params=params), max(1, self.args.iterations // 4), items=n)
+
+    def _aws(self, service: str):
+        import boto3
+
+        return boto3.client(service, region_name=os.environ["AWS_DEFAULT_REGION"])
+
+    def glue_sample(self):
+        region = os.environ["AWS_DEFAULT_REGION"]
+        bucket, db = "bench-glue", "bench_db"
+        tables, per_table = self.args.glue_tables, self.args.glue_objects
+        s3, glue = self._aws("s3"), self._aws("glue")
+        s3.create_bucket(Bucket=bucket, CreateBucketConfiguration={"LocationConstraint": region})
+        glue.create_database(DatabaseInput={"Name": db})
+        for t in range(tables):
+            prefix = f"table_{t:02d}/"
+            for i in range(per_table):
+                body = json.dumps({"id": i, "email": f"user{i}@example.com", "payload": "x" * 256})
+                s3.put_object(Bucket=bucket, Key=f"{prefix}{i:05d}.json", Body=body.encode())
+            glue.create_table(DatabaseName=db, TableInput={
+                "Name": f"table_{t:02d}",
+                "StorageDescriptor": {"Location": f"s3://{bucket}/{prefix}"},
+            })
+
+        def run():
+            tables_out = self._get(f"/api/explorer/glue/{db}", params={"max_keys": per_table}).json()
+            if len(tables_out) != tables or any("error" in t for t in tables_out):
+                raise RuntimeError(f"unexpected glue result: {str(tables_out)[:200]}")
+
+        return measure(run, max(1, self.args.iterations // 4), items=tables * per_table)
+
+    def kinesis_sample(self):
+        stream, shards, n = "bench-stream", self.args.kinesis_shards, self.args.kinesis_records
+        kinesis = self._aws("kinesis")
+        kinesis.create_stream(StreamName=stream, ShardCount=shards)
+        # 파티션 키를 고르게 나눠 모든 샤드에 레코드가 들어가게 한다
+        for start in range(0, n, 500):
+            kinesis.put_records(StreamName=stream, Records=[
+                {"Data": json.dumps({"id": i, "email": f"user{i}@example.com"}).encode(), "PartitionKey": f"pk-{i}"}
+                for i in range(start, min(start + 500, n))
+            ])
+        params = {"limit": 100, "iterator_type": "TRIM_HORIZON"}
+
+        def run():
+            out = self._get(f"/api/explorer/kinesis/{stream}", params=params).json()
+            if len(out.get("records", [])) != min(100, n):
+                raise RuntimeError(f"unexpected kinesis result: {str(out)[:200]}")
+
+        return measure(run, self.args.iterations, items=min(100, n))
+
+    def dynamodb_scan(self):
+        table, n = "bench-table", self.args.dynamodb_items
+        ddb = self._aws("dynamodb")
+        ddb.create_table(
+            TableName=table, BillingMode="PAY_PER_REQUEST",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+        )
+        for start in range(0, n, 25):
+            ddb.batch_write_item(RequestItems={table: [
+                {"PutRequest": {"Item": {"id": {"S": f"{i:06d}"}, "email": {"S": f"user{i}@example.com"},
+                                         "tags": {"SS": ["pii", "bench"]}, "score": {"N": str(i)}}}}
+                for i in range(start, min(start + 25, n))
+            ]})
+        limit = min(200, n)
+
+        def run():
+            out = self._get(f"/api/explorer/dynamodb/{table}", params={"limit": limit}).json()
+            if out["count"] != limit:
+                raise RuntimeError(f"unexpected dynamodb result: {str(out)[:200]}")
+
+        return measure(run, self.args.iterations, items=limit)
+
+    def redis_sample_500(self):
+        if not self.args.redis_url:
+            return {"skipped": "--redis-url not given"}
+        import redis
+        from bench.bench_redis_sampler import PREFIX, _seed
+
+        r = redis.Redis.from_url(self.args.redis_url)
+        try:
+            r.ping()
+        except redis.RedisError as e:
+            return {"skipped": f"redis unreachable: {e}"}
+        n = self.args.redis_keys
+        kw = r.connection_pool.connection_kwargs
+        _seed(r, n)
+        params = {"host": kw.get("host", "localhost"), "port": kw.get("port", 6379), "db": kw.get("db", 0),
+                  "pattern": PREFIX + "*", "limit": n}
+        try:
+            return measure(lambda: self._get("/api/explorer/elasticache/redis", params=params),
+                           self.args.iterations, items=n)
+        finally:
+            r.delete(*(r.keys(PREFIX + "*") or [PREFIX]))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pg-url", default=os.getenv("BENCH_PG_URL"), help="합성 스키마를 올릴 Postgres (기존 aws_* 테이블은 덮어씀)")
+    ap.add_argument("--redis-url", default=os.getenv("BENCH_REDIS_URL"))
+    ap.add_argument("--rows", type=int, default=2000, help="테이블당 합성 행 수")
+    ap.add_argument("--iterations", type=int, default=20)
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--s3-objects", type=int, default=1000)
+    ap.add_argument("--s3-latency-ms", type=float, default=0.0, help="GetObject마다 더할 RTT (원격 S3 흉내)")
+    ap.add_argument("--glue-tables", type=int, default=8)
+    ap.add_argument("--glue-objects", type=int, default=50, help="Glue 테이블당 S3 객체 수")
+    ap.add_argument("--kinesis-shards", type=int, default=4)
+    ap.add_argument("--kinesis-records", type=int, default=400)
+    ap.add_argument("--dynamodb-items", type=int, default=1000)
+    ap.add_argument("--redis-keys", type=int, default=500)
+    ap.add_argument("--output", help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+    if not args.pg_url:
+        ap.error("--pg-url (또는 BENCH_PG_URL) 필요")
+
+    selected = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        ap.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    _configure_env(args)
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # 요청마다 찍히는 INFO 로그가 측정을 흐리지 않도록
+    _load_schema(args.pg_url, args.rows)
+
+    from fastapi.testclient import TestClient
+    from moto import mock_aws
+
+    import main as app_main
+
+    report: Dict[str, Any] = {
+        "environment": environment(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("pg_url", "redis_url", "output")},
+        "scenarios": {},
+    }
+    with mock_aws(), TestClient(app_main.app) as client:
+        suite = Suite(args, client)
+        for name in selected:
+            run: Callable[[], Dict[str, Any]] = getattr(suite, name)
+            try:
+                report["scenarios"][name] = run()
+            except Exception as e:
+                report["scenarios"][name] = {"error": f"{e.__class__.__name__}: {e}"}
+            print(f"{name}: {json.dumps(report['scenarios'][name])}", file=sys.stderr)
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    out = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(out + "\n")
+    print(out)
+
+
+if __name__ == "__main__":
+    main()
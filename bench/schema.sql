@@ -0,0 +1,349 @@
+-- bench/schema.sql
+-- Steampipe aws 플러그인 테이블을 흉내낸 합성 스키마 (벤치마크/로컬 재현용).
+-- 컬럼은 collector의 summary 프로필 컬럼 + Steampipe 공통 컬럼(account_id, partition, title, akas, tags).
+-- 데이터는 bench_seed(n)으로 채운다: 모든 aws_* 테이블에 n행을 컬럼 타입에 맞춰 생성.
+--
+--   psql "$STEAMPIPE_DB_URL" -f bench/schema.sql -c "select bench_seed(2000)"
+--   (bench.run_suite는 이 파일을 직접 적용한다)
+
+drop table if exists aws_region;
+create table aws_region (
+    region        text,
+    opt_in_status text,
+    account_id    text,
+    partition     text
+);
+
+insert into aws_region values
+    ('us-east-1', 'opt-in-not-required', '123456789012', 'aws'),
+    ('ap-northeast-2', 'opt-in-not-required', '123456789012', 'aws'),
+    ('eu-west-1', 'opt-in-not-required', '123456789012', 'aws'),
+    ('me-south-1', 'not-opted-in', '123456789012', 'aws');
+
+drop table if exists aws_glue_catalog_table;
+create table aws_glue_catalog_table (
+    name               text,
+    database_name      text,
+    region             text,
+    storage_descriptor jsonb,
+    account_id         text
+);
+
+drop table if exists aws_s3_bucket;
+create table aws_s3_bucket (
+    name                                 text,
+    arn                                  text,
+    region                               text,
+    account_id                           text,
+    creation_date                        timestamptz,
+    partition                            text,
+    title                                text,
+    akas                                 jsonb,
+    tags                                 jsonb,
+    versioning_enabled                   boolean,
+    policy                               jsonb,
+    lifecycle_rules                      jsonb,
+    server_side_encryption_configuration jsonb
+);
+
+drop table if exists aws_ebs_volume;
+create table aws_ebs_volume (
+    volume_id         text,
+    arn               text,
+    volume_type       text,
+    size              bigint,
+    state             text,
+    encrypted         boolean,
+    kms_key_id        text,
+    availability_zone text,
+    region            text,
+    create_time       timestamptz,
+    tags              jsonb,
+    account_id        text,
+    partition         text,
+    title             text,
+    akas              jsonb
+);
+
+drop table if exists aws_efs_file_system;
+create table aws_efs_file_system (
+    file_system_id   text,
+    name             text,
+    arn              text,
+    life_cycle_state text,
+    performance_mode text,
+    encrypted        boolean,
+    kms_key_id       text,
+    size_in_bytes    bigint,
+    region           text,
+    creation_time    timestamptz,
+    account_id       text,
+    partition        text,
+    title            text,
+    akas             jsonb,
+    tags             jsonb
+);
+
+drop table if exists aws_fsx_file_system;
+create table aws_fsx_file_system (
+    file_system_id   text,
+    arn              text,
+    file_system_type text,
+    lifecycle        text,
+    storage_type     text,
+    storage_capacity bigint,
+    kms_key_id       text,
+    dns_name         text,
+    region           text,
+    creation_time    timestamptz,
+    account_id       text,
+    partition        text,
+    title            text,
+    akas             jsonb,
+    tags             jsonb
+);
+
+drop table if exists aws_rds_db_instance;
+create table aws_rds_db_instance (
+    db_instance_identifier text,
+    arn                    text,
+    engine                 text,
+    engine_version         text,
+    class                  text,
+    status                 text,
+    allocated_storage      bigint,
+    storage_encrypted      boolean,
+    publicly_accessible    boolean,
+    endpoint_address       text,
+    endpoint_port          bigint,
+    region                 text,
+    create_time            timestamptz,
+    account_id             text,
+    partition              text,
+    title                  text,
+    akas                   jsonb,
+    tags                   jsonb
+);
+
+drop table if exists aws_dynamodb_table;
+create table aws_dynamodb_table (
+    name               text,
+    arn                text,
+    table_status       text,
+    billing_mode       text,
+    item_count         bigint,
+    table_size_bytes   bigint,
+    region             text,
+    creation_date_time timestamptz,
+    account_id         text,
+    partition          text,
+    title              text,
+    akas               jsonb,
+    tags               jsonb
+);
+
+drop table if exists aws_redshift_cluster;
+create table aws_redshift_cluster (
+    cluster_identifier  text,
+    arn                 text,
+    cluster_status      text,
+    node_type           text,
+    number_of_nodes     bigint,
+    db_name             text,
+    encrypted           boolean,
+    publicly_accessible boolean,
+    endpoint            jsonb,
+    region              text,
+    cluster_create_time timestamptz,
+    account_id          text,
+    partition           text,
+    title               text,
+    akas                jsonb,
+    tags                jsonb
+);
+
+drop table if exists aws_rds_db_snapshot;
+create table aws_rds_db_snapshot (
+    db_snapshot_identifier text,
+    arn                    text,
+    db_instance_identifier text,
+    engine                 text,
+    status                 text,
+    type                   text,
+    allocated_storage      bigint,
+    encrypted              boolean,
+    kms_key_id             text,
+    region                 text,
+    create_time            timestamptz,
+    account_id             text,
+    partition              text,
+    title                  text,
+    akas                   jsonb,
+    tags                   jsonb
+);
+
+drop table if exists aws_elasticache_cluster;
+create table aws_elasticache_cluster (
+    cache_cluster_id           text,
+    arn                        text,
+    engine                     text,
+    engine_version             text,
+    cache_node_type            text,
+    cache_cluster_status       text,
+    num_cache_nodes            bigint,
+    at_rest_encryption_enabled boolean,
+    transit_encryption_enabled boolean,
+    region                     text,
+    cache_cluster_create_time  timestamptz,
+    account_id                 text,
+    partition                  text,
+    title                      text,
+    akas                       jsonb,
+    tags                       jsonb
+);
+
+drop table if exists aws_glacier_vault;
+create table aws_glacier_vault (
+    vault_name          text,
+    vault_arn           text,
+    number_of_archives  bigint,
+    size_in_bytes       bigint,
+    region              text,
+    creation_date       timestamptz,
+    last_inventory_date timestamptz,
+    account_id          text,
+    partition           text,
+    title               text,
+    akas                jsonb,
+    tags                jsonb
+);
+
+drop table if exists aws_backup_plan;
+create table aws_backup_plan (
+    name                text,
+    arn                 text,
+    backup_plan_id      text,
+    region              text,
+    creation_date       timestamptz,
+    last_execution_date timestamptz,
+    account_id          text,
+    partition           text,
+    title               text,
+    akas                jsonb,
+    tags                jsonb
+);
+
+drop table if exists aws_glue_catalog_database;
+create table aws_glue_catalog_database (
+    name         text,
+    catalog_id   text,
+    description  text,
+    location_uri text,
+    region       text,
+    create_time  timestamptz,
+    account_id   text,
+    partition    text,
+    title        text,
+    akas         jsonb,
+    tags         jsonb
+);
+
+drop table if exists aws_kinesis_stream;
+create table aws_kinesis_stream (
+    stream_name               text,
+    stream_arn                text,
+    stream_status             text,
+    encryption_type           text,
+    key_id                    text,
+    retention_period_hours    bigint,
+    open_shard_count          bigint,
+    region                    text,
+    stream_creation_timestamp timestamptz,
+    account_id                text,
+    partition                 text,
+    title                     text,
+    akas                      jsonb,
+    tags                      jsonb
+);
+
+drop table if exists aws_msk_cluster;
+create table aws_msk_cluster (
+    cluster_name    text,
+    arn             text,
+    state           text,
+    cluster_type    text,
+    current_version text,
+    region          text,
+    creation_time   timestamptz,
+    account_id      text,
+    partition       text,
+    title           text,
+    akas            jsonb,
+    tags            jsonb
+);
+
+-- 모든 aws_* 리소스 테이블에 n행 생성 (기존 행은 지움).
+-- - 식별자/텍스트 컬럼: '<컬럼>-00001' 형태로 행마다 고유
+-- - *arn 컬럼: ARN 형식, region: opt-in 리전 3개에 고르게 분배, availability_zone: 리전 + 'a'
+-- - 태그/정책 등 jsonb: 실제 응답과 비슷한 크기의 중첩 객체
+create or replace function bench_seed(n integer) returns void language plpgsql as $$
+declare
+    t record;
+    c record;
+    exprs text[];
+    expr text;
+    regions constant text := 'array[''us-east-1'', ''ap-northeast-2'', ''eu-west-1'']';
+    region_expr text := format('(%s)[i %% 3 + 1]', regions);
+begin
+    for t in
+        select table_name from information_schema.tables
+        where table_schema = 'public' and table_name like 'aws\_%' and table_name not in ('aws_region', 'aws_glue_catalog_table')
+    loop
+        exprs := array[]::text[];
+        for c in
+            select column_name, data_type from information_schema.columns
+            where table_schema = 'public' and table_name = t.table_name
+            order by ordinal_position
+        loop
+            if c.column_name = 'region' then
+                expr := region_expr;
+            elsif c.column_name = 'availability_zone' then
+                expr := region_expr || ' || ''a''';
+            elsif c.column_name like '%arn' then
+                expr := format('''arn:aws:%s:'' || %s || '':123456789012:%s/'' || lpad(i::text, 6, ''0'')',
+                               replace(t.table_name, 'aws_', ''), region_expr, t.table_name);
+            elsif c.column_name = 'account_id' then
+                expr := '''123456789012''';
+            elsif c.column_name = 'partition' then
+                expr := '''aws''';
+            elsif c.column_name = 'akas' then
+                expr := format('jsonb_build_array(''arn:aws:%s:::'' || i)', t.table_name);
+            elsif c.column_name = 'tags' then
+                expr := 'jsonb_build_object(''Name'', ''res-'' || i, ''Owner'', ''team-'' || (i % 7), ''Environment'', (array[''prod'', ''dev'', ''stage''])[i % 3 + 1], ''DataClass'', (array[''pii'', ''internal'', ''public''])[i % 3 + 1])';
+            elsif c.column_name = 'endpoint' then
+                expr := 'jsonb_build_object(''Address'', ''cluster-'' || i || ''.example.internal'', ''Port'', 5439)';
+            elsif c.data_type = 'jsonb' then
+                expr := 'jsonb_build_object(''Version'', ''2012-10-17'', ''Statement'', jsonb_build_array(jsonb_build_object(''Sid'', ''s'' || i, ''Effect'', ''Allow'', ''Principal'', jsonb_build_object(''AWS'', ''arn:aws:iam::123456789012:root''), ''Action'', jsonb_build_array(''s3:GetObject'', ''s3:PutObject''), ''Resource'', ''arn:aws:s3:::bucket-'' || i || ''/*'')))';
+            elsif c.data_type = 'timestamp with time zone' then
+                expr := 'timestamptz ''2024-01-01 00:00:00+00'' + i * interval ''7 minutes''';
+            elsif c.data_type = 'bigint' then
+                expr := '(i * 1024)::bigint';
+            elsif c.data_type = 'boolean' then
+                expr := '(i % 2 = 0)';
+            else
+                expr := format('''%s-'' || lpad(i::text, 6, ''0'')', c.column_name);
+            end if;
+            exprs := exprs || expr;
+        end loop;
+        execute format('truncate %I', t.table_name);
+        execute format('insert into %I select %s from generate_series(1, %s) as g(i)',
+                       t.table_name, array_to_string(exprs, ', '), n);
+    end loop;
+
+    truncate aws_glue_catalog_table;
+    insert into aws_glue_catalog_table
+    select 'table-' || lpad((i % 20)::text, 3, '0'), 'name-' || lpad((i / 20 + 1)::text, 6, '0'), 'us-east-1',
+           jsonb_build_object('Location', 's3://bench-datalake/tables/' || i || '/'), '123456789012'
+    from generate_series(0, least(n, 200) * 20 - 1) as g(i);
+end;
+$$;
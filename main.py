@@ -1,11 +1,36 @@
 # main.py
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from routers import resources, repository, explorer_router
+import asyncio
+import apps.collector as collector
+import apps.explorer as explorer
+import apps.snapshot as snapshot
+from apps.change_log import change_log
+from utils import metrics, steampipe, timing
+from utils.kafka_pool import kafka_pool
+from utils.pg_pool import pg_pool
+from utils.session_cache import cache_stats
 import os
 from typing import List
 
-app = FastAPI(title="AWS Resource Collector API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # /all-resources 스냅샷 백그라운드 갱신 시작/종료
+    snapshot.store.start()
+    try:
+        yield
+    finally:
+        await snapshot.store.stop()
+        await steampipe.aclose()
+        # Explorer가 빌려 쓰던 사용자 DB 커넥션·Kafka 컨슈머 정리 (리로드 시 누수 방지)
+        await asyncio.to_thread(pg_pool.close_all)
+        await asyncio.to_thread(kafka_pool.close_all)
+
+app = FastAPI(title="AWS Resource Collector API", lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(timing.TimingMiddleware)
 
 # ── CORS 설정 ────────────────────────────────────────────────────────────────
 def _parse_origins(raw: str) -> List[str]:
@@ -53,3 +78,76 @@ app.include_router(explorer_router.router, prefix="/api", tags=["Repository Expl
 @app.get("/health", tags=["Health"])
 async def health():
     return {"status": "ok", "message": "Service is healthy"}
+
+READY_TIMEOUT_SEC = float(os.getenv("READY_TIMEOUT_SEC", "2"))
+
+@app.get("/ready", tags=["Health"])
+async def ready(response: Response):
+    # /health는 프로세스 생존만, /ready는 Steampipe 응답 + 리전 목록 로딩까지 확인 (미준비 시 503)
+    try:
+        await steampipe.aping(READY_TIMEOUT_SEC)
+        steampipe_status = "ok"
+    except Exception as e:
+        steampipe_status = f"error: {str(e).splitlines()[0] if str(e) else e.__class__.__name__}"
+
+    if steampipe_status == "ok":
+        if collector.region_provider.source == "fallback":
+            collector.region_provider.invalidate()  # Steampipe가 이제 떴으면 재시도 간격을 기다리지 않는다
+        await collector.region_provider.aget()
+
+    is_ready = steampipe_status == "ok" and collector.region_provider.ready
+    response.status_code = 200 if is_ready else 503
+    return {
+        "status": "ready" if is_ready else "starting",
+        "steampipe": steampipe_status,
+        "regions": collector.region_provider.status(),
+    }
+
+# ── /metrics: 스크레이프 시점에 읽는 풀/캐시/스냅샷 상태 ─────────────────────
+def _runtime_samples():
+    pool = steampipe.pool_stats()
+    yield ("steampipe_pool_connections", "gauge", "Steampipe 동기 풀 커넥션 수",
+           [({"state": "checked_out"}, pool.get("checked_out")), ({"state": "checked_in"}, pool.get("checked_in")),
+            ({"state": "overflow"}, pool.get("overflow"))])
+    yield ("steampipe_pool_checkouts_total", "counter", "Steampipe 풀 체크아웃 수", [({}, pool["checkouts"])])
+    yield ("steampipe_pool_wait_timeouts_total", "counter", "Steampipe 풀 대기 시간 초과 수", [({}, pool["wait_timeouts"])])
+    yield ("steampipe_pool_wait_max_seconds", "gauge", "Steampipe 풀 최대 대기 시간", [({}, pool["wait_max_ms"] / 1000)])
+
+    cache = cache_stats()
+    backend = cache["backend"]
+    yield ("response_cache_backend_events_total", "counter", "세션 캐시 백엔드 hit/miss/eviction/expiration",
+           [({"backend": backend, "event": k}, cache[k]) for k in ("hits", "misses", "evictions", "expirations") if k in cache])
+    if backend == "memory":
+        yield ("response_cache_items", "gauge", "인메모리 캐시 항목 수", [({}, cache["items"])])
+        yield ("response_cache_bytes", "gauge", "인메모리 캐시 바이트", [({}, cache["bytes"])])
+
+    # 대상 주소는 요청 파라미터에서 오므로 라벨로 쓰지 않고 합계만
+    targets = pg_pool.stats().values()
+    yield ("explorer_pg_pool_connections", "gauge", "Explorer RDS/Redshift 풀 유휴 커넥션 수", [({}, sum(t["idle"] for t in targets))])
+    yield ("explorer_pg_pool_checkouts_total", "counter", "Explorer RDS/Redshift 풀 체크아웃 (새 연결/재사용)",
+           [({"kind": "created"}, sum(t["created"] for t in targets)), ({"kind": "reused"}, sum(t["reused"] for t in targets))])
+    consumers = kafka_pool.stats().values()
+    yield ("explorer_kafka_consumers", "gauge", "Explorer MSK 풀 컨슈머 수",
+           [({"state": "open"}, sum(1 for c in consumers if c["open"])), ({"state": "busy"}, sum(1 for c in consumers if c["busy"]))])
+    yield ("explorer_s3_budget_used_bytes", "gauge", "Explorer S3 전역 샘플 버퍼 사용량", [({}, explorer._s3_global_budget.used)])
+
+    executor = getattr(asyncio.get_running_loop(), "_default_executor", None)
+    queue = getattr(executor, "_work_queue", None)
+    yield ("threadpool_queue_depth", "gauge", "asyncio 기본 스레드풀(to_thread) 대기 작업 수",
+           [({}, queue.qsize() if queue is not None else 0)])
+
+    status = snapshot.store.status()
+    yield ("snapshot_age_seconds", "gauge", "리소스별 스냅샷 나이",
+           [({"resource": name}, s["age_sec"]) for name, s in status.items()])
+    yield ("change_log_events", "gauge", "변경 로그 보관 이벤트 수", [({}, change_log.stats()["events"])])
+
+metrics.registry.register_collector(_runtime_samples)
+
+@app.get("/metrics", tags=["Health"])
+async def prometheus_metrics():
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/health/steampipe", tags=["Health"])
+async def health_steampipe():
+    # Steampipe 커넥션 풀 상태 (풀 대기 시간이 늘면 STEAMPIPE_POOL_SIZE 조정)
+    return steampipe.pool_stats()
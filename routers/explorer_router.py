@@ -1,30 +1,83 @@
 from fastapi import APIRouter, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 import asyncio
 import apps.explorer as explorer
+from utils import codec
 from utils.etag_utils import etag_response
+from utils.metrics import EXPLORER_ITEMS
+from utils.timing import span
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_QUERY = Query(False, description="true면 NDJSON으로 항목을 수집하는 즉시 스트리밍 (Accept: application/x-ndjson 과 동일)")
+
 async def _run_with_etag(request: Request, response: Response, fn, *args):
-    data = await asyncio.to_thread(fn, *args)
-    return etag_response(request, response, data)
+    with span("explore"):
+        data = await asyncio.to_thread(fn, *args)
+    with span("etag"):
+        return etag_response(request, response, data)
+
+def _wants_stream(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in (request.headers.get("Accept") or "")
+
+def _backend(request: Request) -> str:
+    # /api/explorer/<backend>/... (메트릭 라벨)
+    parts = request.url.path.split("/")
+    return parts[3] if len(parts) > 3 else "unknown"
+
+def _ndjson_lines(items, backend: str):
+    # 제너레이터 도중 예외는 마지막 에러 줄로 (이미 보낸 줄은 되돌릴 수 없으므로)
+    # 항목은 일반 JSON 응답과 같은 jsonable_encoder를 거쳐 datetime/Decimal/bytes 표현을 맞춘다
+    try:
+        for item in items:
+            EXPLORER_ITEMS.inc(backend)
+            yield codec.dumps(jsonable_encoder(item)) + b"\n"
+    except Exception as e:
+        yield codec.dumps({"error": str(e), "code": e.__class__.__name__}) + b"\n"
+
+async def _run_with_etag_or_stream(request: Request, response: Response, stream: bool, fn, iter_fn, *args):
+    """
+    스트리밍 요청이면 iter_fn 제너레이터를 NDJSON StreamingResponse로 흘려보내고
+    (동기 제너레이터는 Starlette가 스레드풀에서 한 줄씩 당겨온다 → 결과 크기와 무관한 메모리),
+    아니면 기존처럼 전체 결과 + ETag
+    """
+    if _wants_stream(request, stream):
+        return StreamingResponse(_ndjson_lines(iter_fn(*args), _backend(request)), media_type=NDJSON_MEDIA_TYPE)
+    return await _run_with_etag(request, response, fn, *args)
 
 @router.get("/explorer/s3/{bucket_name}")
-async def s3_all_objects(bucket_name: str, request: Request, response: Response, prefix: str = "", max_keys: int = Query(10, le=10000000)):
-    return await _run_with_etag(request, response, explorer.get_s3_all_objects_content, bucket_name, prefix, max_keys)
+async def s3_all_objects(
+    bucket_name: str,
+    request: Request, response: Response,
+    prefix: str = "",
+    max_keys: int = Query(10, le=10000000),
+    concurrency: int = Query(None, ge=1, le=64, description="동시 GetObject 수 (기본 S3_FETCH_CONCURRENCY)"),
+    sample_bytes: int = Query(None, ge=1, le=16 * 1024 * 1024, description="객체당 읽을 앞부분 바이트 (기본 S3_SAMPLE_BYTES)"),
+    max_total_bytes: int = Query(None, ge=1, le=1024 * 1024 * 1024, description="요청 전체 읽기 한도 (기본 S3_REQUEST_MAX_BYTES)"),
+    stream: bool = STREAM_QUERY,
+):
+    return await _run_with_etag_or_stream(
+        request, response, stream, explorer.get_s3_all_objects_content, explorer.iter_s3_objects_content,
+        bucket_name, prefix, max_keys, concurrency, sample_bytes, max_total_bytes,
+    )
 
 @router.get("/explorer/dynamodb/{table_name}")
-async def dynamodb_items(table_name: str, request: Request, response: Response, limit: int = Query(50, le=200)):
-    return await _run_with_etag(request, response, explorer.get_dynamodb_items, table_name, limit)
+async def dynamodb_items(table_name: str, request: Request, response: Response, limit: int = Query(50, le=200), stream: bool = STREAM_QUERY):
+    return await _run_with_etag_or_stream(request, response, stream, explorer.get_dynamodb_items, explorer.iter_dynamodb_items, table_name, limit)
 
 @router.get("/explorer/glue/{database_name}")
 async def glue_explorer(
     database_name: str,
     request: Request, response: Response,
     table_name: str = None,
-    max_keys: int = Query(20, le=100)
+    max_keys: int = Query(20, le=100),
+    table_concurrency: int = Query(None, ge=1, le=32, description="DB 전체 조회 시 동시에 샘플링할 테이블 수 (기본 GLUE_TABLE_CONCURRENCY)"),
+    deadline_sec: float = Query(None, gt=0, le=600, description="DB 전체 조회 마감 시간(초), 넘으면 끝난 테이블까지만 응답 (기본 GLUE_DEADLINE_SEC)"),
+    stream: bool = STREAM_QUERY,
 ):
-    return await _run_with_etag(request, response, explorer.get_glue_data, database_name, table_name, max_keys)
+    return await _run_with_etag_or_stream(request, response, stream, explorer.get_glue_data, explorer.iter_glue_data, database_name, table_name, max_keys, table_concurrency, deadline_sec)
 
 @router.get("/explorer/redshift")
 async def redshift_explorer(
@@ -35,26 +88,33 @@ async def redshift_explorer(
     user: str = Query(..., description="Redshift 사용자 이름"),
     password: str = Query(..., description="Redshift 사용자 비밀번호"),
     table_name: str = Query(None, description="특정 테이블 이름 (없으면 전체 테이블 목록 조회)"),
-    limit: int = Query(50, le=200, description="조회할 행 개수 (기본 50)")
+    limit: int = Query(50, le=200, description="조회할 행 개수 (기본 50)"),
+    stream: bool = STREAM_QUERY,
 ):
-    return await _run_with_etag(request, response, explorer.get_redshift_data, endpoint, port, db_name, user, password, table_name, limit)
+    return await _run_with_etag_or_stream(request, response, stream, explorer.get_redshift_data, explorer.iter_redshift_data, endpoint, port, db_name, user, password, table_name, limit)
 
 @router.get("/explorer/kinesis/{stream_name}")
 async def kinesis_explorer(
     stream_name: str,
     request: Request, response: Response,
     shard_id: str = None,
-    limit: int = Query(20, le=100)
+    limit: int = Query(20, le=100),
+    iterator_type: str = Query(None, pattern="^(TRIM_HORIZON|LATEST|AT_TIMESTAMP)$", description="샤드 반복자 (기본 KINESIS_ITERATOR_TYPE)"),
+    timestamp: str = Query(None, description="AT_TIMESTAMP 기준 시각 (epoch 초 또는 ISO 8601)"),
+    shard_concurrency: int = Query(None, ge=1, le=64, description="동시에 읽을 샤드 수 (기본 KINESIS_SHARD_CONCURRENCY)"),
+    time_budget_sec: float = Query(None, gt=0, le=60, description="샘플링 최대 시간(초) (기본 KINESIS_TIME_BUDGET_SEC)"),
 ):
-    return await _run_with_etag(request, response, explorer.get_kinesis_records, stream_name, shard_id, limit)
+    return await _run_with_etag(request, response, explorer.get_kinesis_records, stream_name, shard_id, limit,
+                                iterator_type, timestamp, shard_concurrency, time_budget_sec)
 
 @router.get("/explorer/feature-group/{feature_group_name}")
 async def feature_group_data(
     feature_group_name: str,
     request: Request, response: Response,
-    max_keys: int = Query(20, le=100)
+    max_keys: int = Query(20, le=100),
+    stream: bool = STREAM_QUERY,
 ):
-    return await _run_with_etag(request, response, explorer.get_feature_group_data, feature_group_name, max_keys)
+    return await _run_with_etag_or_stream(request, response, stream, explorer.get_feature_group_data, explorer.iter_feature_group_data, feature_group_name, max_keys)
 
 @router.get("/explorer/rds/{db_identifier}")
 async def rds_explorer(
@@ -66,13 +126,20 @@ async def rds_explorer(
     user: str = "postgres",
     password: str = Query(..., description="Database password"),
     table_name: str = None,
-    limit: int = Query(50, le=200)
+    limit: int = Query(50, le=200),
+    stream: bool = STREAM_QUERY,
 ):
-    return await _run_with_etag(request, response, explorer.get_rds_data, endpoint, port, db_name, user, password, table_name, limit)
+    return await _run_with_etag_or_stream(request, response, stream, explorer.get_rds_data, explorer.iter_rds_data, endpoint, port, db_name, user, password, table_name, limit)
 
 @router.get("/explorer/msk/{cluster_arn}")
-async def msk_explorer(cluster_arn: str, request: Request, response: Response, topic: str = None, limit: int = Query(20, le=100)):
-    return await _run_with_etag(request, response, explorer.get_msk_records, cluster_arn, topic, limit)
+async def msk_explorer(
+    cluster_arn: str,
+    request: Request, response: Response,
+    topic: str = Query(None, description="토픽 이름 (없으면 토픽 목록)"),
+    limit: int = Query(20, le=100),
+    timeout_sec: float = Query(None, gt=0, le=60, description="샘플 최대 대기 시간(초) (기본 MSK_SAMPLE_TIMEOUT_SEC)"),
+):
+    return await _run_with_etag(request, response, explorer.get_msk_records, cluster_arn, topic, limit, timeout_sec)
 
 @router.get("/explorer/elasticache/redis")
 async def elasticache_redis_explorer(
@@ -84,5 +151,6 @@ async def elasticache_redis_explorer(
     pattern: str = Query("*", description="SCAN 매칭 패턴"),
     limit: int = Query(50, le=500, description="최대 키 개수"),
     per_collection_limit: int = Query(50, le=500, description="LIST/SET/ZSET/HASH 등 컬렉션 당 샘플 개수"),
+    stream: bool = STREAM_QUERY,
 ):
-    return await _run_with_etag(request, response, explorer.get_redis_data, host, port, password, db, pattern, limit, per_collection_limit)
\ No newline at end of file
+    return await _run_with_etag_or_stream(request, response, stream, explorer.get_redis_data, explorer.iter_redis_data, host, port, password, db, pattern, limit, per_collection_limit)
\ No newline at end of file
@@ -1,11 +1,13 @@
 from __future__ import annotations
 from fastapi import APIRouter, HTTPException, Request, Response
 import asyncio
+import inspect
 import apps.inspector as inspector
-from utils.etag_utils import etag_response
+from utils.etag_utils import etag_blob_response
+from utils.timing import span
 
 # ⬇ 세션 캐시 헬퍼 추가
-from utils.caching import maybe_return_cached, store_response_to_cache
+from utils.caching import maybe_return_cached_response, compute_single_flight
 
 router = APIRouter()
 
@@ -17,72 +19,74 @@ async def _run_with_cache_and_etag(
     ttl_sec: int = 600,
 ):
     # 1) 캐시 조회
-    cached = await maybe_return_cached(request, response, ttl=ttl_sec)
+    # (저장 시 이미 정리된 데이터이므로 HIT은 저장된 바이트를 그대로 전송)
+    cached = await maybe_return_cached_response(request, response, ttl=ttl_sec)
     if cached is not None:
-        return etag_response(request, response, cached)
+        return cached
 
-    # 2) 원래 계산
-    data = await asyncio.to_thread(fn, *args)
+    # 2) 원래 계산 + 3) 캐시에 저장 (동시 MISS는 하나의 계산을 공유)
+    async def _compute():
+        # 비동기 조회 함수는 그대로 await (스레드 미사용), 동기 함수는 스레드에서 실행
+        with span("inspect"):
+            return await fn(*args) if inspect.iscoroutinefunction(fn) else await asyncio.to_thread(fn, *args)
 
-    # 3) 캐시에 저장
-    store_response_to_cache(request, data)
-    response.headers["Cache-Control"] = f"public, max-age={ttl_sec}"
+    blob = await compute_single_flight(request, response, _compute)
 
-    # 4) ETag 응답
-    return etag_response(request, response, data)
+    # 4) ETag 응답 (저장 시 계산된 ETag + 직렬화된 바이트 그대로)
+    return etag_blob_response(request, response, blob)
 
 @router.get("/repositories/s3/{bucket_name}")
 async def s3_bucket_detail(bucket_name: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_s3_bucket_detail, bucket_name)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_s3_bucket_detail, bucket_name)
 
 @router.get("/repositories/efs/{file_system_id}")
 async def efs_detail(file_system_id: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_efs_filesystem_detail, file_system_id)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_efs_filesystem_detail, file_system_id)
 
 @router.get("/repositories/fsx/{file_system_id}")
 async def fsx_detail(file_system_id: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_fsx_filesystem_detail, file_system_id)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_fsx_filesystem_detail, file_system_id)
 
 @router.get("/repositories/rds/{db_identifier}")
 async def rds_detail(db_identifier: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_rds_instance_detail, db_identifier)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_rds_instance_detail, db_identifier)
 
 @router.get("/repositories/dynamodb/{table_name}")
 async def dynamodb_detail(table_name: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_dynamodb_table_detail, table_name)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_dynamodb_table_detail, table_name)
 
 @router.get("/repositories/redshift/{cluster_id}")
 async def redshift_detail(cluster_id: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_redshift_cluster_detail, cluster_id)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_redshift_cluster_detail, cluster_id)
 
 @router.get("/repositories/rds-snapshot/{snapshot_id}")
 async def rds_snapshot_detail(snapshot_id: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_rds_snapshot_detail, snapshot_id)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_rds_snapshot_detail, snapshot_id)
 
 @router.get("/repositories/elasticache/{cluster_id}")
 async def elasticache_detail(cluster_id: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_elasticache_cluster_detail, cluster_id)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_elasticache_cluster_detail, cluster_id)
 
 @router.get("/repositories/glacier/{vault_name}")
 async def glacier_detail(vault_name: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_glacier_vault_detail, vault_name)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_glacier_vault_detail, vault_name)
 
 @router.get("/repositories/backup/{plan_id}")
 async def backup_detail(plan_id: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_backup_plan_detail, plan_id)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_backup_plan_detail, plan_id)
 
 @router.get("/repositories/feature-group/{feature_group_name}")
 async def feature_group_detail(feature_group_name: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_sagemaker_feature_group_detail, feature_group_name)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_sagemaker_feature_group_detail, feature_group_name)
 
 @router.get("/repositories/glue/{name}")
 async def glue_database_detail(name: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_glue_database_detail, name)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_glue_database_detail, name)
 
 @router.get("/repositories/kinesis/{stream_name}")
 async def kinesis_detail(stream_name: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_kinesis_stream_detail, stream_name)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_kinesis_stream_detail, stream_name)
 
 @router.get("/repositories/msk/{cluster_name}")
 async def msk_detail(cluster_name: str, request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, inspector.get_msk_cluster_detail, cluster_name)
+    return await _run_with_cache_and_etag(request, response, inspector.aget_msk_cluster_detail, cluster_name)
@@ -1,15 +1,37 @@
 from __future__ import annotations
-from fastapi import APIRouter, Request, Response
+from typing import Any
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 import asyncio
+import inspect
 import apps.collector as collector
-from utils.etag_utils import etag_response
+import apps.snapshot as snapshot
+from apps.change_log import change_log, InvalidCursor, CHANGES_PAGE_MAX
+from apps.pagination import page_index, InvalidPageCursor, LIST_PAGE_DEFAULT, LIST_PAGE_MAX
+from utils import codec
+from utils.etag_utils import etag_blob_response
+from utils.timing import span
 
 # ⬇ 세션 캐시 헬퍼 추가
-from utils.caching import maybe_return_cached, store_response_to_cache
+from utils.caching import maybe_return_cached_response, compute_single_flight
 
 router = APIRouter()
 DEFAULT_TTL = 600  # 초
 
+# 목록 라우트 공통 프로젝션 파라미터
+FIELDS_QUERY = Query(None, description="쉼표 구분 컬럼 목록 (profile보다 우선)")
+PROFILE_QUERY = Query(None, description="컬럼 프로필: summary | full (기본 full)")
+# 둘 다 생략하면 기존처럼 전체 목록, 하나라도 주면 스냅샷에서 {items, next_cursor, limit, total} 페이지
+LIMIT_QUERY = Query(None, ge=1, le=LIST_PAGE_MAX, description=f"페이지 크기 (cursor만 주면 {LIST_PAGE_DEFAULT})")
+CURSOR_QUERY = Query(None, description="이전 페이지의 next_cursor")
+
+
+async def _check_projection(resource: str, fields: str | None, profile: str | None):
+    """잘못된 fields/profile(문법 오류, 테이블에 없는 컬럼)은 Steampipe까지 가기 전에 400으로 거절"""
+    try:
+        await collector.acheck_columns(resource, fields, profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 def _sanitize_value(val):
     """JSON 직렬화가 안 되는 NaN/inf 등을 None으로 치환"""
@@ -47,147 +69,190 @@ async def _run_with_cache_and_etag(
     ttl_sec: int = DEFAULT_TTL,
 ):
     # 1) 캐시 조회
-    cached = await maybe_return_cached(request, response, ttl=ttl_sec)
+    # (저장 시 이미 정리된 데이터이므로 HIT은 저장된 바이트를 그대로 전송)
+    cached = await maybe_return_cached_response(request, response, ttl=ttl_sec)
     if cached is not None:
-        sanitized = _sanitize_value(cached)
-        return etag_response(request, response, sanitized)
+        return cached
+
+    # 2) 원래 계산 + 3) 캐시에 저장 (동시 MISS는 하나의 계산을 공유)
+    async def _compute():
+        # 비동기 수집 함수는 그대로 await (스레드 미사용), 동기 함수는 스레드에서 실행
+        with span("collect"):
+            data = await fn(*args) if inspect.iscoroutinefunction(fn) else await asyncio.to_thread(fn, *args)
+        with span("sanitize"):
+            return _sanitize_value(data)
+
+    blob = await compute_single_flight(request, response, _compute)
+
+    # 4) ETag 응답 (저장 시 계산된 ETag + 직렬화된 바이트 그대로)
+    return etag_blob_response(request, response, blob)
 
-    # 2) 원래 계산
-    data = await asyncio.to_thread(fn, *args)
-    data = _sanitize_value(data)
+def _encode_page(resource: str, data: list, cursor: str | None, limit: int, columns: list[str] | None) -> bytes:
+    rows, next_cursor, total = page_index.page(resource, data, cursor, limit)
+    if columns is not None:
+        rows = [{c: row.get(c) for c in columns} for row in rows]
+    return codec.encode(_sanitize_value({"items": rows, "next_cursor": next_cursor, "limit": limit, "total": total}))
 
-    # 3) 캐시에 저장
-    store_response_to_cache(request, data)
-    response.headers["Cache-Control"] = f"public, max-age={ttl_sec}"
 
-    # 4) ETag 응답
-    return etag_response(request, response, data)
+async def _page_from_snapshot(request: Request, response: Response, resource: str, fields: str | None,
+                              profile: str | None, limit: int, cursor: str | None):
+    """
+    스냅샷(전체 컬럼)에서 식별자 순 keyset 페이지를 잘라 응답 (Steampipe 재조회 없음).
+    fields/profile 프로젝션은 파이썬에서 적용하고, 페이지 본문마다 ETag가 붙는다.
+    """
+    with span("snapshot"):
+        data, age = await snapshot.store.get(resource)
+    if data is None:
+        error = snapshot.store.status()[resource]["last_error"]
+        raise HTTPException(status_code=503, detail=f"{resource} snapshot is not loaded yet: {error}")
+
+    columns = collector.project_columns(resource, fields, profile)
+    if columns is not None and data:
+        unknown = [c for c in columns if c not in data[0]]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"unknown field(s): {', '.join(unknown)}")
+
+    try:
+        with span("page"):
+            blob = await asyncio.to_thread(_encode_page, resource, data, cursor, limit, columns)
+    except InvalidPageCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["X-Cache"] = "SNAPSHOT"
+    response.headers["Age"] = str(int(age))
+    return etag_blob_response(request, response, blob)
+
+
+async def _list_response(request: Request, response: Response, resource: str, fn, fields: str | None,
+                         profile: str | None, limit: int | None, cursor: str | None):
+    await _check_projection(resource, fields, profile)
+    if limit is None and cursor is None:
+        return await _run_with_cache_and_etag(request, response, fn, fields, profile)
+    return await _page_from_snapshot(request, response, resource, fields, profile, limit or LIST_PAGE_DEFAULT, cursor)
 
 @router.get("/s3-buckets")
-async def s3_buckets(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_s3_buckets)
+async def s3_buckets(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "s3_buckets", collector.aget_s3_buckets, fields, profile, limit, cursor)
 
 @router.get("/ebs-volumes")
-async def ebs_volumes(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_ebs_volumes)
+async def ebs_volumes(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "ebs_volumes", collector.aget_ebs_volumes, fields, profile, limit, cursor)
 
 @router.get("/efs-filesystems")
-async def efs_filesystems(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_efs_filesystems)
+async def efs_filesystems(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "efs_filesystems", collector.aget_efs_filesystems, fields, profile, limit, cursor)
 
 @router.get("/fsx-filesystems")
-async def fsx_filesystems(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_fsx_filesystems)
+async def fsx_filesystems(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "fsx_filesystems", collector.aget_fsx_filesystems, fields, profile, limit, cursor)
 
 @router.get("/rds-instances")
-async def rds_instances(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_rds_instances)
+async def rds_instances(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "rds_instances", collector.aget_rds_instances, fields, profile, limit, cursor)
 
 @router.get("/dynamodb-tables")
-async def dynamodb_tables(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_dynamodb_tables)
+async def dynamodb_tables(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "dynamodb_tables", collector.aget_dynamodb_tables, fields, profile, limit, cursor)
 
 @router.get("/redshift-clusters")
-async def redshift_clusters(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_redshift_clusters)
+async def redshift_clusters(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "redshift_clusters", collector.aget_redshift_clusters, fields, profile, limit, cursor)
 
 @router.get("/rds-snapshots")
-async def rds_snapshots(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_rds_snapshots)
+async def rds_snapshots(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "rds_snapshots", collector.aget_rds_snapshots, fields, profile, limit, cursor)
 
 @router.get("/elasticache-clusters")
-async def elasticache_clusters(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_elasticache_clusters)
+async def elasticache_clusters(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "elasticache_clusters", collector.aget_elasticache_clusters, fields, profile, limit, cursor)
 
 @router.get("/glacier-vaults")
-async def glacier_vaults(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_glacier_vaults)
+async def glacier_vaults(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "glacier_vaults", collector.aget_glacier_vaults, fields, profile, limit, cursor)
 
 @router.get("/backup-plans")
-async def backup_plans(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_backup_plans)
+async def backup_plans(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "backup_plans", collector.aget_backup_plans, fields, profile, limit, cursor)
 
 @router.get("/feature-groups")
 async def sagemaker_feature_groups(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_sagemaker_feature_group)
+    return await _run_with_cache_and_etag(request, response, collector.aget_sagemaker_feature_group)
 
 @router.get("/glue-databases")
-async def glue_databases(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_glue_catalog_database)
+async def glue_databases(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "glue_databases", collector.aget_glue_catalog_database, fields, profile, limit, cursor)
 
 @router.get("/kinesis-streams")
-async def kinesis_streams(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_kinesis_stream)
+async def kinesis_streams(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "kinesis_streams", collector.aget_kinesis_stream, fields, profile, limit, cursor)
 
 @router.get("/msk-clusters")
-async def msk_clusters(request: Request, response: Response):
-    return await _run_with_cache_and_etag(request, response, collector.get_msk_cluster)
+async def msk_clusters(request: Request, response: Response, fields: str | None = FIELDS_QUERY, profile: str | None = PROFILE_QUERY, limit: int | None = LIMIT_QUERY, cursor: str | None = CURSOR_QUERY):
+    return await _list_response(request, response, "msk_clusters", collector.aget_msk_cluster, fields, profile, limit, cursor)
+
+# 스냅샷 버전별 직렬화 결과 메모 (스냅샷이 바뀌기 전까지 재직렬화/재해시 없음)
+_all_resources_blob: dict[str, Any] = {"version": None, "blob": None}
+
+
+def _encode_all_resources(data) -> bytes:
+    return codec.encode(_sanitize_value(data))
+
 
 @router.get("/all-resources")
 async def all_resources(request: Request, response: Response):
-    # 1) 캐시 조회 (결합 응답도 캐시)
-    cached = await maybe_return_cached(request, response, ttl=DEFAULT_TTL)
-    if cached is not None:
-        return etag_response(request, response, cached)
-
-    # 2) 원래 계산 (병렬 수집)
-    (
-        s3_buckets,
-        ebs_volumes,
-        efs_filesystems,
-        fsx_filesystems,
-        rds_instances,
-        rds_snapshots,
-        dynamodb_tables,
-        redshift_clusters,
-        elasticache_clusters,
-        glacier_vaults,
-        backup_plans,
-        feature_groups,
-        glue_databases,
-        kinesis_streams,
-        msk_clusters,
-    ) = await asyncio.gather(
-        asyncio.to_thread(collector.get_s3_buckets),
-        asyncio.to_thread(collector.get_ebs_volumes),
-        asyncio.to_thread(collector.get_efs_filesystems),
-        asyncio.to_thread(collector.get_fsx_filesystems),
-        asyncio.to_thread(collector.get_rds_instances),
-        asyncio.to_thread(collector.get_rds_snapshots),
-        asyncio.to_thread(collector.get_dynamodb_tables),
-        asyncio.to_thread(collector.get_redshift_clusters),
-        asyncio.to_thread(collector.get_elasticache_clusters),
-        asyncio.to_thread(collector.get_glacier_vaults),
-        asyncio.to_thread(collector.get_backup_plans),
-        asyncio.to_thread(collector.get_sagemaker_feature_group),
-        asyncio.to_thread(collector.get_glue_catalog_database),
-        asyncio.to_thread(collector.get_kinesis_stream),
-        asyncio.to_thread(collector.get_msk_cluster),
-    )
-
-    data = {
-        "s3_buckets": s3_buckets,
-        "ebs_volumes": ebs_volumes,
-        "efs_filesystems": efs_filesystems,
-        "fsx_filesystems": fsx_filesystems,
-        "rds_instances": rds_instances,
-        "rds_snapshots": rds_snapshots,
-        "dynamodb_tables": dynamodb_tables,
-        "redshift_clusters": redshift_clusters,
-        "elasticache_clusters": elasticache_clusters,
-        "glacier_vaults": glacier_vaults,
-        "backup_plans": backup_plans,
-        "feature_groups": feature_groups,
-        "glue_databases": glue_databases,
-        "kinesis_streams": kinesis_streams,
-        "msk_clusters": msk_clusters,
-    }
-
-    data = _sanitize_value(data)
-
-    # 3) 캐시에 저장 + 헤더
-    store_response_to_cache(request, data)
-    response.headers["Cache-Control"] = f"public, max-age={DEFAULT_TTL}"
-
-    # 4) ETag 응답
-    return etag_response(request, response, data)
+    # 백그라운드 스냅샷에서 즉시 응답 (?refresh=1 이면 전체 수집 후 응답)
+    if request.query_params.get("refresh") in ("1", "true", "True"):
+        await snapshot.store.refresh_all()
+        response.headers["X-Cache"] = "BYPASS"
+    else:
+        response.headers["X-Cache"] = "SNAPSHOT"
+
+    # 버전을 먼저 읽어 두면 조회 중 갱신이 끼어들어도 메모가 새 데이터를 가리키는 일이 없다
+    version = snapshot.store.version
+    # 변경 커서도 먼저 읽는다: 스냅샷은 데이터를 교체한 뒤에 변경 이벤트를 기록하므로
+    # 데이터가 커서보다 새로울 수는 있어도(재적용해도 무해) 뒤처지지는 않는다
+    response.headers["X-Change-Cursor"] = change_log.cursor()
+    with span("snapshot"):
+        data, age = await snapshot.store.get_all()
+    response.headers["Age"] = str(int(age))
+
+    blob = _all_resources_blob["blob"]
+    if blob is None or _all_resources_blob["version"] != version:
+        with span("encode"):
+            blob = await asyncio.to_thread(_encode_all_resources, data)
+        _all_resources_blob.update(version=version, blob=blob)
+
+    return etag_blob_response(request, response, blob)
+
+
+@router.get("/changes")
+async def changes(
+    since: str | None = Query(None, description="이전 응답의 next_cursor 또는 /all-resources의 X-Change-Cursor 헤더"),
+    resources: str | None = Query(None, description="쉼표 구분 리소스 키 (예: s3_buckets,rds_instances)"),
+    limit: int = Query(CHANGES_PAGE_MAX, ge=1, le=CHANGES_PAGE_MAX),
+):
+    """
+    스냅샷 간 added/modified/removed 리소스만 반환.
+    reset=true면 커서가 너무 오래됐거나(링 버퍼 밖) 서버가 재시작된 것이므로 /all-resources로 전체 재동기화.
+    """
+    wanted = None
+    if resources:
+        wanted = {r.strip() for r in resources.split(",") if r.strip()}
+        unknown = wanted - snapshot.COLLECTORS.keys()
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"unknown resources: {', '.join(sorted(unknown))}")
+    try:
+        result = change_log.since(since, limit=limit, resources=wanted)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=codec.dumps(_sanitize_value(result)), media_type="application/json")
+
+
+@router.get("/all-resources/status")
+async def all_resources_status():
+    # 수집기별 스냅샷 나이/주기/마지막 오류 (+ fan-out 모드면 리전별 지연/오류)
+    status = snapshot.store.status()
+    for name, entry in status.items():
+        regions = collector.region_report(name)
+        if regions is not None:
+            entry["regions"] = regions
+    return status
@@ -1,7 +1,22 @@
 from __future__ import annotations
-from typing import Any, Optional
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
 from fastapi import Request, Response
-from .session_cache import make_cache_key, cache_get, cache_set, DEFAULT_TTL_SEC
+from . import codec
+from .etag_utils import etag_blob_response
+from .metrics import RESPONSE_CACHE
+from .timing import span
+from .session_cache import make_cache_key, cache_get_raw, cache_set_raw, cache_lock, cache_lock_held, DEFAULT_TTL_SEC
+
+# ── Single-flight: 같은 캐시 키의 동시 MISS는 하나의 계산을 공유
+# SINGLEFLIGHT_REDIS_LOCK=1 이면 (REDIS_URL 설정 시) 워커 간에도 Redis 락으로 합류
+SINGLEFLIGHT_REDIS_LOCK = os.getenv("SINGLEFLIGHT_REDIS_LOCK", "").lower() in ("1", "true", "yes")
+SINGLEFLIGHT_LOCK_TIMEOUT_SEC = int(os.getenv("SINGLEFLIGHT_LOCK_TIMEOUT_SEC", "300"))
+SINGLEFLIGHT_POLL_SEC = float(os.getenv("SINGLEFLIGHT_POLL_SEC", "0.2"))
+
+_inflight: dict[str, asyncio.Task] = {}
 
 def _session_id_from(request: Request) -> Optional[str]:
     # 우선순위: X-Session-Id 헤더 > sid 쿠키
@@ -19,27 +34,104 @@ def compute_request_cache_key(request: Request, *, session_id: Optional[str]) ->
         session_id=session_id,
     )
 
-async def maybe_return_cached(request: Request, response: Response, *, ttl: int = DEFAULT_TTL_SEC) -> Any | None:
+def _lookup(request: Request, response: Response, ttl: int) -> Optional[bytes]:
     # ?refresh=1 이면 캐시 무시
     if request.query_params.get("refresh") in ("1", "true", "True"):
         response.headers["X-Cache"] = "BYPASS"
+        RESPONSE_CACHE.inc("bypass")
         return None
 
     sid = _session_id_from(request)
     key = compute_request_cache_key(request, session_id=sid)
-    cached = cache_get(key)
-    if cached is not None:
+    with span("cache_read"):
+        blob = cache_get_raw(key)
+    if blob is not None:
         response.headers["X-Cache"] = "HIT"
-        return cached
+        RESPONSE_CACHE.inc("hit")
+        return blob
 
     # 키/TTL 저장 (핸들러가 계산 후 저장할 수 있게 state에 보관)
     request.state._cache_key = key
     request.state._cache_ttl = ttl
     response.headers["X-Cache"] = "MISS"
+    RESPONSE_CACHE.inc("miss")
     return None
 
-def store_response_to_cache(request: Request, payload: Any):
+async def maybe_return_cached_response(request: Request, response: Response, *, ttl: int = DEFAULT_TTL_SEC) -> Response | None:
+    """
+    HIT이면 저장된 바이트와 ETag로 바로 Response를 만든다 (JSON 디코딩/재인코딩/재해시 없음).
+    gzip 등으로 압축 저장된 경우 클라이언트가 지원하면 압축된 채로 전송.
+    """
+    blob = _lookup(request, response, ttl)
+    if blob is None:
+        return None
+    return etag_blob_response(request, response, blob)
+
+async def _encode(compute: Callable[[], Awaitable[Any]]) -> bytes:
+    # 저장 시점에 한 번만 직렬화 + ETag 계산
+    data = await compute()
+    with span("encode"):
+        return await asyncio.to_thread(codec.encode, data)
+
+def _store(key: str, blob: bytes, ttl: int):
+    with span("cache_write"):
+        cache_set_raw(key, blob, ttl=ttl)
+
+def _release(lock):
+    try:
+        lock.release()
+    except Exception:
+        pass  # 타임아웃으로 이미 만료된 경우
+
+async def _compute_and_store(key: str, ttl: int, compute: Callable[[], Awaitable[Any]]) -> bytes:
+    lock = cache_lock(key, SINGLEFLIGHT_LOCK_TIMEOUT_SEC) if SINGLEFLIGHT_REDIS_LOCK else None
+    if lock is None:
+        blob = await _encode(compute)
+        _store(key, blob, ttl)
+        return blob
+
+    # 락이 있으면 Redis 모드: 동기 redis 호출은 스레드에서 실행해 이벤트 루프를 막지 않는다
+    if await asyncio.to_thread(lock.acquire):
+        # 이 워커가 리더: 계산 후 캐시에 저장하고 락 해제
+        try:
+            blob = await _encode(compute)
+            await asyncio.to_thread(_store, key, blob, ttl)
+            return blob
+        finally:
+            await asyncio.to_thread(_release, lock)
+
+    # 다른 워커가 계산 중: 결과가 캐시에 올라올 때까지 대기
+    deadline = time.monotonic() + SINGLEFLIGHT_LOCK_TIMEOUT_SEC
+    while time.monotonic() < deadline:
+        await asyncio.sleep(SINGLEFLIGHT_POLL_SEC)
+        cached = await asyncio.to_thread(cache_get_raw, key)
+        if cached is not None:
+            return cached
+        if not await asyncio.to_thread(cache_lock_held, key):
+            break  # 리더가 실패했거나 락이 만료됨 → 직접 계산
+    blob = await _encode(compute)
+    await asyncio.to_thread(_store, key, blob, ttl)
+    return blob
+
+async def compute_single_flight(request: Request, response: Response, compute: Callable[[], Awaitable[Any]]) -> bytes:
+    """
+    maybe_return_cached_response가 MISS로 판단한 요청의 계산 + 캐시 저장.
+    결과는 ETag가 포함된 codec 포맷 바이트로 돌려주므로 etag_blob_response로 그대로 응답할 수 있다.
+    같은 키로 진행 중인 계산이 있으면 새로 시작하지 않고 그 결과를 기다린다.
+    (BYPASS 요청은 캐시 키가 없으므로 저장 없이 계산만)
+    """
     key = getattr(request.state, "_cache_key", None)
-    ttl = getattr(request.state, "_cache_ttl", DEFAULT_TTL_SEC)
-    if key:
-        cache_set(key, payload, ttl=ttl)
+    if not key:
+        return await _encode(compute)
+
+    task = _inflight.get(key)
+    if task is not None:
+        response.headers["X-Cache"] = "COALESCED"
+        RESPONSE_CACHE.inc("coalesced")
+    else:
+        ttl = getattr(request.state, "_cache_ttl", DEFAULT_TTL_SEC)
+        # 리더 요청이 끊겨도 대기 중인 요청들은 결과를 받을 수 있도록 별도 태스크로 실행
+        task = asyncio.ensure_future(_compute_and_store(key, ttl, compute))
+        _inflight[key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+    return await asyncio.shield(task)
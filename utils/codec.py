@@ -0,0 +1,171 @@
+# utils/codec.py
+"""
+응답 캐시 값 직렬화 코덱.
+
+저장 포맷
+- v1: [헤더 1바이트][페이로드]
+- v2: [헤더 1바이트][ETag 길이 1바이트][ETag(ASCII)][페이로드]  ← 현재 쓰기 포맷
+- 헤더 상위 4비트: 포맷 버전
+- 헤더 하위 4비트: 압축 방식 (0=none, 1=gzip, 2=zstd, 3=lz4)
+- 페이로드: 정렬된 compact JSON(UTF-8) 바이트, 필요 시 압축
+- ETag: 압축 전 JSON 본문 기준으로 저장 시점에 한 번 계산 (HIT/304 판단 시 재해시 불필요)
+
+본문을 JSON 바이트로 저장하므로 HIT 시 역직렬화 없이 그대로 HTTP 응답 본문으로 쓸 수 있고,
+gzip/zstd는 클라이언트가 지원하면 압축된 채로 Content-Encoding만 붙여 내보낼 수 있다.
+헤더가 없는 값(예전 포맷: 평문 JSON 텍스트)은 레거시로 간주해 그대로 읽는다.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from typing import Any, Optional
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+try:
+    import zstandard  # type: ignore
+except Exception:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame  # type: ignore
+except Exception:
+    lz4_frame = None
+
+FORMAT_V1 = 1
+FORMAT_V2 = 2  # 쓰기 포맷
+
+COMP_NONE = 0
+COMP_GZIP = 1
+COMP_ZSTD = 2
+COMP_LZ4 = 3
+
+_KNOWN_COMPRESSIONS = {COMP_NONE, COMP_GZIP, COMP_ZSTD, COMP_LZ4}
+_COMP_BY_NAME = {"none": COMP_NONE, "gzip": COMP_GZIP, "zstd": COMP_ZSTD, "lz4": COMP_LZ4}
+
+# HTTP Content-Encoding으로 그대로 내보낼 수 있는 압축 방식
+CONTENT_ENCODINGS = {COMP_GZIP: "gzip", COMP_ZSTD: "zstd"}
+
+# CACHE_COMPRESSION: gzip(기본, 브라우저로 그대로 전송 가능) | zstd | lz4 | none
+# 선택한 라이브러리가 설치되어 있지 않으면 gzip으로 폴백
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "gzip").lower()
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+CACHE_GZIP_LEVEL = int(os.getenv("CACHE_GZIP_LEVEL", "5"))
+
+
+def _resolve_compression(name: str) -> int:
+    comp = _COMP_BY_NAME.get(name, COMP_GZIP)
+    if comp == COMP_ZSTD and zstandard is None:
+        return COMP_GZIP
+    if comp == COMP_LZ4 and lz4_frame is None:
+        return COMP_GZIP
+    return comp
+
+_default_comp = _resolve_compression(CACHE_COMPRESSION)
+
+# ── JSON 직렬화 ────────────────────────────────────────────────
+
+def dumps(obj: Any) -> bytes:
+    """정렬된 compact JSON 바이트 (ETag 계산과 캐시 본문이 같은 바이트를 쓰도록 단일화)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+        except TypeError:
+            pass  # orjson이 못 다루는 값(64비트 초과 정수 등)은 표준 json으로
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# ── 압축 ──────────────────────────────────────────────────────
+
+def _compress(body: bytes, comp: int) -> bytes:
+    if comp == COMP_GZIP:
+        return gzip.compress(body, compresslevel=CACHE_GZIP_LEVEL, mtime=0)
+    if comp == COMP_ZSTD:
+        return zstandard.ZstdCompressor().compress(body)
+    if comp == COMP_LZ4:
+        return lz4_frame.compress(body)
+    return body
+
+def _decompress(payload: bytes, comp: int) -> bytes:
+    if comp == COMP_GZIP:
+        return gzip.decompress(payload)
+    if comp == COMP_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if comp == COMP_LZ4:
+        if lz4_frame is None:
+            raise ValueError("lz4 is not installed")
+        return lz4_frame.decompress(payload)
+    return payload
+
+# ── ETag ───────────────────────────────────────────────────────
+
+def body_etag(body: bytes) -> str:
+    """직렬화된 JSON 본문 바이트의 약한 ETag"""
+    return f'W/"{hashlib.sha1(body).hexdigest()}:{len(body)}"'
+
+# ── 인코딩/디코딩 ──────────────────────────────────────────────
+
+def _parse(blob: bytes) -> tuple[Optional[int], Optional[str], int]:
+    """
+    (압축 방식, 저장된 ETag, 페이로드 시작 오프셋).
+    헤더가 없는 레거시 평문 JSON이면 (None, None, 0).
+    """
+    if not blob:
+        return None, None, 0
+    head = blob[0]
+    version, comp = head >> 4, head & 0x0F
+    if comp not in _KNOWN_COMPRESSIONS:
+        return None, None, 0
+    if version == FORMAT_V1:
+        return comp, None, 1
+    if version == FORMAT_V2 and len(blob) >= 2:
+        n = blob[1]
+        return comp, blob[2:2 + n].decode("ascii"), 2 + n
+    return None, None, 0
+
+def encode_body(body: bytes, compression: Optional[str] = None, etag: Optional[str] = None) -> bytes:
+    """이미 직렬화된 JSON 바이트를 (ETag 포함) 캐시 포맷으로 포장"""
+    comp = _default_comp if compression is None else _resolve_compression(compression)
+    if len(body) < CACHE_COMPRESS_MIN_BYTES:
+        comp = COMP_NONE
+    tag = (etag or body_etag(body)).encode("ascii")
+    return bytes([(FORMAT_V2 << 4) | comp, len(tag)]) + tag + _compress(body, comp)
+
+def encode(obj: Any, compression: Optional[str] = None) -> bytes:
+    return encode_body(dumps(obj), compression)
+
+def etag_of(blob: bytes) -> str:
+    """저장된 ETag (v1/레거시 값이면 본문을 해시해서 계산)"""
+    _, etag, _ = _parse(blob)
+    return etag if etag is not None else body_etag(body_of(blob))
+
+def body_of(blob: bytes) -> bytes:
+    """압축을 푼 JSON 본문 바이트 (역직렬화는 하지 않음)"""
+    comp, _, offset = _parse(blob)
+    if comp is None:
+        return blob
+    return _decompress(blob[offset:], comp)
+
+def content_encoding_of(blob: bytes) -> Optional[str]:
+    """압축된 페이로드를 그대로 HTTP로 보낼 수 있으면 해당 Content-Encoding"""
+    comp, _, _ = _parse(blob)
+    return CONTENT_ENCODINGS.get(comp) if comp is not None else None
+
+def payload_of(blob: bytes) -> bytes:
+    """헤더/ETag를 뗀 (압축된) 페이로드"""
+    _, _, offset = _parse(blob)
+    return blob[offset:]
+
+def decode(blob: bytes) -> Any:
+    return loads(body_of(blob))
@@ -1,19 +1,18 @@
 # etag_utils.py
-import hashlib, json
 from fastapi import Response, Request
+from . import codec
+
+def compute_bytes_etag(payload: bytes) -> str:
+    """이미 직렬화된 응답 본문 바이트로 약한 ETag 생성"""
+    return codec.body_etag(payload)
 
 def compute_obj_etag(obj) -> str:
     """
     응답 객체 전체를 안정적으로 직렬화해서 약한 ETag를 만든다.
-    - 정렬된 JSON + compact separators
+    - 정렬된 JSON + compact separators (캐시 본문과 같은 codec.dumps 사용)
     - 직렬화 안 되는 타입은 default=str 로 처리
     """
-    try:
-        payload = json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
-    except TypeError:
-        payload = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":")).encode("utf-8")
-    h = hashlib.sha1(payload).hexdigest()
-    return f'W/"{h}:{len(payload)}"'
+    return compute_bytes_etag(codec.dumps(obj))
 
 def etag_response(request: Request, response: Response, data):
     """
@@ -27,3 +26,37 @@ def etag_response(request: Request, response: Response, data):
     response.headers["ETag"] = etag
     response.headers["Cache-Control"] = "private, must-revalidate"
     return data
+
+def _accepts_encoding(request: Request, encoding: str) -> bool:
+    accept = request.headers.get("Accept-Encoding") or ""
+    return any(part.split(";")[0].strip() == encoding for part in accept.split(","))
+
+def _with_headers(resp: Response, response: Response, headers: dict) -> Response:
+    """
+    주입된 response의 헤더(Set-Cookie 등 중복 키 포함)를 resp로 옮기고 headers를 덮어쓴다.
+    MutableHeaders는 대소문자를 구분하지 않으므로 같은 이름이 두 번 나가지 않는다.
+    """
+    for key, value in response.raw_headers:
+        if key not in (b"content-length", b"content-type"):
+            resp.raw_headers.append((key, value))
+    for name, value in headers.items():
+        resp.headers[name] = value
+    return resp
+
+def etag_blob_response(request: Request, response: Response, blob: bytes) -> Response:
+    """
+    codec 포맷으로 미리 직렬화된 값(+저장된 ETag)을 재인코딩 없이 그대로 응답.
+    - If-None-Match 일치 시 본문을 풀지 않고 304
+    - 압축 저장된 값은 클라이언트가 지원하면 압축된 바이트 그대로 전송
+    (직접 만든 Response에는 주입된 response의 헤더가 합쳐지지 않으므로 복사해 준다)
+    """
+    etag = codec.etag_of(blob)
+    inm = (request.headers.get("If-None-Match") or "").strip()
+    if inm == etag:
+        return _with_headers(Response(status_code=304), response, {"ETag": etag})
+    headers = {"ETag": etag, "Cache-Control": "private, must-revalidate", "Vary": "Accept-Encoding"}
+    encoding = codec.content_encoding_of(blob)
+    if encoding and _accepts_encoding(request, encoding):
+        headers["Content-Encoding"] = encoding
+        return _with_headers(Response(content=codec.payload_of(blob), media_type="application/json"), response, headers)
+    return _with_headers(Response(content=codec.body_of(blob), media_type="application/json"), response, headers)
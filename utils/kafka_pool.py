@@ -0,0 +1,129 @@
+# utils/kafka_pool.py
+"""
+Explorer용 Kafka(MSK) 컨슈머 풀.
+
+요청마다 KafkaConsumer를 만들면 브로커 접속 + 메타데이터 조회(+ 그룹 조정)를 매번 치르므로
+bootstrap 서버 문자열별로 컨슈머 하나를 유지해 메타데이터를 따뜻하게 둔다.
+
+- 컨슈머 그룹에 가입하지 않는다(group_id=None): 파티션은 호출 측에서 assign()으로 직접 지정
+- KafkaConsumer는 스레드 세이프하지 않으므로 컨슈머마다 락을 두고 빌려 쓴다
+- 유휴 시간이 지난 컨슈머는 정리, 사용 중 예외가 나면 해당 컨슈머는 폐기
+- consumer_factory를 주입할 수 있어 로컬 Kafka 대역이나 가짜 컨슈머로 검증 가능
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+IDLE_TIMEOUT_SEC = float(os.getenv("MSK_CONSUMER_IDLE_SEC", "600"))
+CHECKOUT_TIMEOUT_SEC = float(os.getenv("MSK_CONSUMER_CHECKOUT_TIMEOUT_SEC", "30"))
+
+
+def _default_consumer_factory(bootstrap_servers: str, **config):
+    from kafka import KafkaConsumer  # 지연 임포트(실행 환경 없는 경우 대비)
+
+    return KafkaConsumer(
+        bootstrap_servers=bootstrap_servers,
+        group_id=None,
+        enable_auto_commit=False,
+        security_protocol="PLAINTEXT",
+        **config,
+    )
+
+
+class _Slot:
+    __slots__ = ("consumer", "lock", "last_used")
+
+    def __init__(self):
+        self.consumer: Any = None
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class KafkaConsumerPool:
+    def __init__(
+        self,
+        consumer_factory: Optional[Callable[..., Any]] = None,
+        idle_timeout: float = IDLE_TIMEOUT_SEC,
+        checkout_timeout: float = CHECKOUT_TIMEOUT_SEC,
+    ):
+        self.consumer_factory = consumer_factory or _default_consumer_factory
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self._slots: Dict[str, _Slot] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _close(consumer):
+        try:
+            consumer.close()
+        except Exception:
+            pass
+
+    def _slot(self, bootstrap_servers: str) -> _Slot:
+        with self._lock:
+            slot = self._slots.get(bootstrap_servers)
+            if slot is None:
+                slot = self._slots[bootstrap_servers] = _Slot()
+            return slot
+
+    def evict_idle(self):
+        """쓰이지 않는(락이 비어 있는) 유휴 컨슈머 정리"""
+        now = time.monotonic()
+        with self._lock:
+            slots = list(self._slots.values())
+        for slot in slots:
+            if slot.consumer is None or now - slot.last_used <= self.idle_timeout:
+                continue
+            if slot.lock.acquire(blocking=False):
+                try:
+                    self._close(slot.consumer)
+                    slot.consumer = None
+                finally:
+                    slot.lock.release()
+
+    @contextmanager
+    def consumer(self, bootstrap_servers: str):
+        self.evict_idle()
+        slot = self._slot(bootstrap_servers)
+        if not slot.lock.acquire(timeout=self.checkout_timeout):
+            raise TimeoutError(f"Kafka consumer busy for {bootstrap_servers}")
+        try:
+            if slot.consumer is None:
+                slot.consumer = self.consumer_factory(bootstrap_servers)
+            try:
+                yield slot.consumer
+            except BaseException:
+                # 오류 후 컨슈머 상태(연결/할당)를 믿을 수 없으므로 다음 요청은 새로 만든다
+                self._close(slot.consumer)
+                slot.consumer = None
+                raise
+        finally:
+            slot.last_used = time.monotonic()
+            slot.lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._slots.items())
+        return {
+            servers: {"open": slot.consumer is not None, "busy": slot.lock.locked(), "idle_sec": round(now - slot.last_used, 1)}
+            for servers, slot in items
+        }
+
+    def close_all(self):
+        with self._lock:
+            slots = list(self._slots.values())
+            self._slots.clear()
+        for slot in slots:
+            with slot.lock:
+                if slot.consumer is not None:
+                    self._close(slot.consumer)
+                    slot.consumer = None
+
+
+# Explorer MSK 공용 풀
+kafka_pool = KafkaConsumerPool()
@@ -0,0 +1,250 @@
+# utils/metrics.py
+"""
+외부 라이브러리/서비스 없이 동작하는 최소 Prometheus 메트릭 레지스트리 (/metrics).
+
+- Counter / Histogram: 라벨 값 튜플별로 값을 메모리에 누적 (기록 비용 = 락 + dict 조회 + bisect)
+- 스크레이프 시점에만 계산하면 되는 값(풀/캐시 상태 등)은 register_collector()로 등록한 콜백이 게이지로 내보낸다
+- MetricsMiddleware: 엔드포인트별 요청 수/상태 코드(304 비율 포함)/지연/응답 바이트 분포
+- METRICS_ENABLED=false면 기록 함수가 즉시 반환
+
+텍스트 노출 포맷은 Prometheus exposition format 0.0.4를 따른다.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 기본 버킷: 초 단위 지연 / 바이트 단위 크기
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = tuple(float(4 ** i * 256) for i in range(10))  # 256B ~ 64MB
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        lines = self._header()
+        for labels, v in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 -> [버킷별 개수(+Inf 포함, 누적 아님), 합계]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        if not METRICS_ENABLED:
+            return
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][i] += 1
+            entry[1] += value
+
+    def count(self, *labels: str) -> int:
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        lines = self._header()
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+# 콜백 수집기: (이름, 타입, 도움말, [(라벨 dict, 값), ...]) 목록을 돌려준다
+Sample = Tuple[str, str, str, Iterable[Tuple[Dict[str, Any], float]]]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing  # 모듈 재임포트 등으로 같은 이름이 다시 정의되면 기존 것을 공유
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))  # type: ignore[return-value]
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))  # type: ignore[return-value]
+
+    def register_collector(self, fn: Callable[[], Iterable[Sample]]):
+        with self._lock:
+            if fn not in self._collectors:
+                self._collectors.append(fn)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for fn in collectors:
+            try:
+                samples = list(fn())
+            except Exception as e:
+                lines.append(f"# collector {getattr(fn, '__name__', fn)} failed: {_escape(e)}")
+                continue
+            for name, kind, help_text, values in samples:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in values:
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{_format_labels(list(labels), [str(v) for v in labels.values()])} {_format_value(float(value))}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# ------------------------------------------------------------
+# 공용 메트릭 정의 (기록하는 모듈이 import해서 사용)
+# ------------------------------------------------------------
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP 요청 수 (엔드포인트/상태 코드별, 304 = ETag 재검증 성공)", ("method", "endpoint", "status"))
+HTTP_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간 (스트리밍은 본문 전송 완료까지)", ("method", "endpoint"))
+HTTP_RESPONSE_BYTES = registry.histogram(
+    "http_response_bytes", "응답 본문 바이트 (압축 전송 시 압축된 크기)", ("endpoint",), buckets=SIZE_BUCKETS)
+
+STEAMPIPE_QUERY_SECONDS = registry.histogram(
+    "steampipe_query_duration_seconds", "Steampipe 쿼리 시간 (풀 대기 포함, 테이블별)", ("table",))
+STEAMPIPE_QUERY_ERRORS = registry.counter(
+    "steampipe_query_errors_total", "Steampipe 쿼리 오류 수 (테이블별)", ("table",))
+STEAMPIPE_ROWS = registry.counter(
+    "steampipe_rows_total", "Steampipe 쿼리로 읽은 행 수 (테이블별)", ("table",))
+
+SNAPSHOT_REFRESH_SECONDS = registry.histogram(
+    "snapshot_refresh_duration_seconds", "스냅샷 수집기 갱신 시간 (리소스 타입별)", ("resource", "result"))
+
+RESPONSE_CACHE = registry.counter(
+    "response_cache_requests_total", "응답 캐시 조회 결과 (hit/miss/bypass, coalesced는 miss 중 진행 중인 계산에 합류한 수)", ("result",))
+
+EXPLORER_S3_OBJECTS = registry.counter(
+    "explorer_s3_objects_total", "Explorer S3 샘플링 객체 수", ("result",))
+EXPLORER_S3_BYTES = registry.counter(
+    "explorer_s3_sampled_bytes_total", "Explorer S3 샘플링으로 읽은 바이트")
+EXPLORER_REDIS_KEYS = registry.counter(
+    "explorer_redis_keys_total", "Explorer Redis 샘플링 키 수", ("result",))
+EXPLORER_ITEMS = registry.counter(
+    "explorer_stream_items_total", "Explorer NDJSON 스트리밍으로 내보낸 항목 수 (백엔드별)", ("backend",))
+
+
+# ------------------------------------------------------------
+# ASGI 미들웨어
+# ------------------------------------------------------------
+class MetricsMiddleware:
+    """
+    매칭된 라우트의 엔드포인트 이름(s3_buckets, s3_all_objects 등) 단위로 기록해
+    라벨 수가 경로 값(버킷 이름 등)에 따라 늘지 않는다. 매칭되지 않은 요청은 "unmatched".
+    send를 감싸 상태 코드와 본문 바이트만 더하므로 응답 본문을 복사/버퍼링하지 않는다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        state = {"status": 500, "bytes": 0}
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            endpoint = getattr(scope.get("route"), "name", None) or "unmatched"
+            method = scope.get("method", "GET")
+            HTTP_REQUESTS.inc(method, endpoint, str(state["status"]))
+            HTTP_DURATION.observe(time.perf_counter() - started, method, endpoint)
+            HTTP_RESPONSE_BYTES.observe(state["bytes"], endpoint)
@@ -0,0 +1,181 @@
+# utils/pg_pool.py
+"""
+Explorer용 대상별(keyed) PostgreSQL/Redshift 커넥션 풀.
+
+RDS/Redshift 탐색은 테이블을 하나씩 클릭하며 같은 대상에 반복 접속하므로
+TCP + TLS + 인증 비용을 대상(endpoint/port/db/user)당 한 번만 치르도록 커넥션을 재사용한다.
+
+- 키: (host, port, dbname, user, 비밀번호 해시) → 비밀번호가 다르면 다른 풀 (잘못된 비밀번호로 재사용 불가)
+- 대상별 최대 커넥션 수 제한 (초과 요청은 반납될 때까지 대기)
+- 유휴 시간이 지난 커넥션은 정리, 한동안 안 쓴 커넥션은 꺼낼 때 SELECT 1로 상태 확인
+- 사용 중 예외가 나면 그 커넥션은 폐기 (상태를 알 수 없으므로)
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+MAX_PER_TARGET = int(os.getenv("EXPLORER_PG_POOL_MAX_PER_TARGET", "4"))
+IDLE_TIMEOUT_SEC = float(os.getenv("EXPLORER_PG_POOL_IDLE_SEC", "300"))
+HEALTHCHECK_AFTER_SEC = float(os.getenv("EXPLORER_PG_POOL_HEALTHCHECK_SEC", "30"))
+CHECKOUT_TIMEOUT_SEC = float(os.getenv("EXPLORER_PG_POOL_CHECKOUT_TIMEOUT_SEC", "30"))
+
+PoolKey = Tuple[str, int, str, str, str]
+
+
+def _default_connect(**params):
+    import psycopg2  # 지연 임포트
+    return psycopg2.connect(**params)
+
+
+class _Target:
+    __slots__ = ("idle", "slots", "lock", "created", "reused")
+
+    def __init__(self, max_size: int):
+        self.idle: deque = deque()  # (conn, 마지막 사용 시각), 오른쪽이 가장 최근
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+
+class KeyedConnectionPool:
+    def __init__(
+        self,
+        connect: Optional[Callable[..., Any]] = None,
+        max_per_target: int = MAX_PER_TARGET,
+        idle_timeout: float = IDLE_TIMEOUT_SEC,
+        healthcheck_after: float = HEALTHCHECK_AFTER_SEC,
+        checkout_timeout: float = CHECKOUT_TIMEOUT_SEC,
+    ):
+        self._connect = connect or _default_connect
+        self.max_per_target = max_per_target
+        self.idle_timeout = idle_timeout
+        self.healthcheck_after = healthcheck_after
+        self.checkout_timeout = checkout_timeout
+        self._targets: Dict[PoolKey, _Target] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    @staticmethod
+    def make_key(host: str, port: int, dbname: str, user: str, password: str) -> PoolKey:
+        pw_hash = hashlib.sha256((password or "").encode("utf-8")).hexdigest()
+        return (host, int(port), dbname, user, pw_hash)
+
+    def _target(self, key: PoolKey) -> _Target:
+        with self._lock:
+            t = self._targets.get(key)
+            if t is None:
+                t = self._targets[key] = _Target(self.max_per_target)
+            return t
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn) -> bool:
+        if getattr(conn, "closed", 0):
+            return False
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            return True
+        except Exception:
+            return False
+
+    def _checkout(self, target: _Target, params: Dict[str, Any]):
+        now = time.monotonic()
+        while True:
+            with target.lock:
+                if not target.idle:
+                    break
+                conn, last_used = target.idle.pop()  # LIFO: 가장 최근 커넥션 우선
+            if now - last_used > self.idle_timeout or getattr(conn, "closed", 0):
+                self._close(conn)
+                continue
+            if now - last_used > self.healthcheck_after and not self._healthy(conn):
+                self._close(conn)
+                continue
+            target.reused += 1
+            return conn
+
+        conn = self._connect(**params)
+        # 읽기 전용 탐색 쿼리이므로 풀에 있는 동안 idle-in-transaction 상태가 되지 않게
+        conn.autocommit = True
+        target.created += 1
+        return conn
+
+    def _checkin(self, target: _Target, conn):
+        if getattr(conn, "closed", 0):
+            return
+        with target.lock:
+            target.idle.append((conn, time.monotonic()))
+
+    def evict_idle(self):
+        """모든 대상에서 유휴 시간 초과 커넥션 정리"""
+        now = time.monotonic()
+        self._last_sweep = now
+        with self._lock:
+            targets = list(self._targets.values())
+        for t in targets:
+            expired = []
+            with t.lock:
+                while t.idle and now - t.idle[0][1] > self.idle_timeout:
+                    expired.append(t.idle.popleft()[0])
+            for conn in expired:
+                self._close(conn)
+
+    @contextmanager
+    def connection(self, host: str, port: int, dbname: str, user: str, password: str, **extra):
+        if time.monotonic() - self._last_sweep > self.idle_timeout:
+            self.evict_idle()
+
+        target = self._target(self.make_key(host, port, dbname, user, password))
+        if not target.slots.acquire(timeout=self.checkout_timeout):
+            raise TimeoutError(f"connection pool exhausted for {host}:{port}/{dbname}")
+        conn = None
+        try:
+            conn = self._checkout(target, dict(host=host, port=port, dbname=dbname, user=user, password=password, **extra))
+            yield conn
+        except BaseException:
+            # 쿼리 실패/중단된 커넥션은 상태를 알 수 없으므로 재사용하지 않는다
+            if conn is not None:
+                self._close(conn)
+            raise
+        else:
+            self._checkin(target, conn)
+        finally:
+            target.slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            items = list(self._targets.items())
+        return {
+            f"{k[3]}@{k[0]}:{k[1]}/{k[2]}": {"idle": len(t.idle), "created": t.created, "reused": t.reused}
+            for k, t in items
+        }
+
+    def close_all(self):
+        with self._lock:
+            targets = list(self._targets.values())
+            self._targets.clear()
+        for t in targets:
+            with t.lock:
+                conns = [c for c, _ in t.idle]
+                t.idle.clear()
+            for conn in conns:
+                self._close(conn)
+
+
+# Explorer RDS/Redshift 공용 풀
+pg_pool = KeyedConnectionPool()
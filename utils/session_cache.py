@@ -1,9 +1,11 @@
 from __future__ import annotations
-import os, time, threading, json, hashlib
+import os, time, threading, json, hashlib, heapq
+from collections import OrderedDict
 from typing import Any, Optional, Tuple
 
 DEFAULT_TTL_SEC = int(os.getenv("SESSION_TTL_SEC", "600"))  # 10분
 MAX_ITEMS = int(os.getenv("SESSION_CACHE_MAX", "512"))
+MAX_BYTES = int(os.getenv("SESSION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # 256MB
 
 # ── (선택) Redis 사용: REDIS_URL이 설정되면 자동 전환
 REDIS_URL = os.getenv("REDIS_URL")
@@ -11,40 +13,111 @@ _r = None
 if REDIS_URL:
     try:
         import redis  # type: ignore
-        _r = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+        _r = redis.Redis.from_url(REDIS_URL, decode_responses=False)  # codec 바이트 그대로 저장
     except Exception:
         _r = None  # 문제 있으면 인메모리 폴백
 
+def _estimate_size(value: Any) -> int:
+    """캐시 바이트 예산 계산용 크기 추정 (직렬화 길이 기준)"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+    except Exception:
+        return 0
+
 class _TTLCache:
-    def __init__(self, ttl: int = DEFAULT_TTL_SEC, max_items: int = MAX_ITEMS):
+    """
+    LRU + TTL 인메모리 캐시.
+    - get/set 모두 amortized O(1) (만료는 조회 시 lazy 판단 + 만료 힙에서 앞부분만 정리)
+    - 항목 수(max_items)와 총 바이트(max_bytes) 예산을 넘으면 LRU 순서로 축출
+    """
+    def __init__(self, ttl: int = DEFAULT_TTL_SEC, max_items: int = MAX_ITEMS, max_bytes: int = MAX_BYTES):
         self.ttl = ttl
         self.max_items = max_items
-        self._store: dict[str, Tuple[float, Any]] = {}
+        self.max_bytes = max_bytes
+        # key -> (만료시각, 크기, 값), 삽입/접근 순서 = LRU 순서
+        self._store: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._expiry: list[Tuple[float, str]] = []  # (만료시각, key) 최소 힙
+        self._bytes = 0
         self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: str):
+        v = self._store.pop(key, None)
+        if v is not None:
+            self._bytes -= v[1]
 
-    def _gc(self):
-        now = time.time()
-        # 만료 제거
-        for k, (exp, _) in list(self._store.items()):
-            if exp < now:
-                self._store.pop(k, None)
-        # 용량 초과 시 오래된 것부터 제거
-        if len(self._store) > self.max_items:
-            items = sorted(self._store.items(), key=lambda kv: kv[1][0])
-            for k, _ in items[: len(self._store) - self.max_items]:
-                self._store.pop(k, None)
+    def _purge_expired(self, now: float):
+        heap = self._expiry
+        while heap and heap[0][0] <= now:
+            exp, key = heapq.heappop(heap)
+            v = self._store.get(key)
+            # 같은 키가 다시 set된 경우 힙에 남은 옛 항목은 무시
+            if v is not None and v[0] == exp:
+                self._remove(key)
+                self.expirations += 1
+        # 덮어쓰기가 잦아 힙에 죽은 항목이 쌓이면 재구성
+        if len(heap) > 2 * len(self._store) + 64:
+            self._expiry = [(v[0], k) for k, v in self._store.items()]
+            heapq.heapify(self._expiry)
 
     def get(self, key: str) -> Optional[Any]:
         with self._lock:
-            self._gc()
             v = self._store.get(key)
-            return None if not v else v[1]
+            if v is None:
+                self.misses += 1
+                return None
+            if v[0] <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            return v[2]
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, size: Optional[int] = None):
         ttl = self.ttl if ttl is None else ttl
+        size = _estimate_size(value) if size is None else size
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return  # 단일 항목이 전체 예산보다 크면 저장하지 않음
+            now = time.time()
+            exp = now + ttl
+            self._store[key] = (exp, size, value)
+            self._bytes += size
+            heapq.heappush(self._expiry, (exp, key))
+            self._purge_expired(now)
+            while self._store and (len(self._store) > self.max_items or self._bytes > self.max_bytes):
+                _, (_, old_size, _) = self._store.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+
+    def clear(self):
         with self._lock:
-            self._store[key] = (time.time() + ttl, value)
-            self._gc()
+            self._store.clear()
+            self._expiry.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "items": len(self._store),
+                "bytes": self._bytes,
+                "max_items": self.max_items,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
 
 _mem = _TTLCache()
 
@@ -59,18 +132,34 @@ def make_cache_key(path: str, method: str, query: dict[str, Any], body: Any = No
     raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
     return "RESP:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
-def cache_get(key: str) -> Optional[Any]:
+_redis_stats = {"hits": 0, "misses": 0}
+
+# 캐시 값은 utils.codec 포맷(헤더 + JSON, 필요 시 압축)의 바이트로 저장한다.
+def cache_get_raw(key: str) -> Optional[bytes]:
     if _r:
         raw = _r.get(key)
-        return json.loads(raw) if raw else None
+        _redis_stats["hits" if raw else "misses"] += 1
+        return raw or None
     return _mem.get(key)
 
-def cache_set(key: str, value: Any, ttl: Optional[int] = None):
+def cache_set_raw(key: str, blob: bytes, ttl: Optional[int] = None):
     ttl = DEFAULT_TTL_SEC if ttl is None else ttl
     if _r:
-        _r.set(key, json.dumps(value, ensure_ascii=False), ex=ttl)
+        _r.set(key, blob, ex=ttl)
     else:
-        _mem.set(key, value, ttl=ttl)
+        _mem.set(key, blob, ttl=ttl, size=len(blob))
+
+def cache_lock(key: str, timeout: int):
+    """
+    멀티 워커 간 single-flight용 분산 락 (Redis 사용 시에만).
+    인메모리 모드에서는 프로세스 밖 경쟁자가 없으므로 None.
+    """
+    if _r:
+        return _r.lock("LOCK:" + key, timeout=timeout, blocking=False)
+    return None
+
+def cache_lock_held(key: str) -> bool:
+    return bool(_r and _r.exists("LOCK:" + key))
 
 def cache_clear(prefix: str | None = None):
     if _r:
@@ -78,4 +167,10 @@ def cache_clear(prefix: str | None = None):
         for k in _r.scan_iter(pat):  # type: ignore[attr-defined]
             _r.delete(k)
     else:
-        _mem._store.clear()
+        _mem.clear()
+
+def cache_stats() -> dict[str, Any]:
+    """캐시 hit/miss/eviction 카운터 (Redis 모드는 이 프로세스 기준 hit/miss만)"""
+    if _r:
+        return {"backend": "redis", **_redis_stats}
+    return {"backend": "memory", **_mem.stats()}
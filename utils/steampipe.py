@@ -0,0 +1,385 @@
+# utils/steampipe.py
+"""
+Steampipe PostgreSQL 공용 DB 계층 (collector / inspector가 같은 엔진과 풀을 공유).
+
+- 엔진은 처음 쓸 때 한 번 만든다 (import 시점 접속 없음)
+- 풀 크기는 /all-resources 수집기 동시 실행 수(15) + 상세 조회 여유에 맞춘다
+- pool_pre_ping + pool_recycle: Steampipe 서비스 재시작 후 끊긴 커넥션을 꺼내 쓰지 않도록
+- statement_timeout: 느린 플러그인 호출 하나가 커넥션을 무한정 붙잡지 않도록 (쿼리별 지정 가능)
+- 풀 대기 시간/체크아웃 지표는 pool_stats()로 노출 (/health/steampipe)
+- aquery(): asyncpg 네이티브 비동기 경로 (스레드를 쓰지 않음).
+  asyncpg가 없거나 STEAMPIPE_ASYNC=false면 동기 query()를 to_thread로 실행
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import re
+import threading
+import time
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from utils.metrics import STEAMPIPE_QUERY_ERRORS, STEAMPIPE_QUERY_SECONDS, STEAMPIPE_ROWS
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
+
+# sqlalchemy는 동기 경로에서, asyncpg는 비동기 경로에서 처음 쓸 때 임포트 (기동 시간 단축)
+_UNLOADED = object()
+_asyncpg_mod: Any = _UNLOADED
+
+
+def _asyncpg():
+    """asyncpg 모듈 (미설치면 None)"""
+    global _asyncpg_mod
+    if _asyncpg_mod is _UNLOADED:
+        try:
+            import asyncpg  # type: ignore
+        except Exception:
+            asyncpg = None
+        _asyncpg_mod = asyncpg
+    return _asyncpg_mod
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+POOL_SIZE = int(os.getenv("STEAMPIPE_POOL_SIZE", "16"))
+MAX_OVERFLOW = int(os.getenv("STEAMPIPE_MAX_OVERFLOW", "8"))
+POOL_TIMEOUT_SEC = float(os.getenv("STEAMPIPE_POOL_TIMEOUT_SEC", "30"))
+POOL_RECYCLE_SEC = int(os.getenv("STEAMPIPE_POOL_RECYCLE_SEC", "1800"))
+STATEMENT_TIMEOUT_MS = int(os.getenv("STEAMPIPE_STATEMENT_TIMEOUT_MS", "120000"))  # 0이면 제한 없음
+
+ASYNC_ENABLED = os.getenv("STEAMPIPE_ASYNC", "true").lower() in ("1", "true", "yes")
+
+# 한 번에 커서에서 꺼내올 행 수 (대용량 JSONB 컬럼이 많은 테이블에서 피크 메모리 제한)
+FETCH_BATCH_SIZE = int(os.getenv("STEAMPIPE_FETCH_BATCH", "500"))
+
+
+def build_url() -> str:
+    url = os.getenv("STEAMPIPE_DB_URL")
+    if url:
+        return url
+
+    user = os.getenv("STEAMPIPE_DB_USER", "steampipe")
+    password = os.getenv("STEAMPIPE_DB_PASSWORD", "")
+    host = os.getenv("STEAMPIPE_DB_HOST", "localhost")
+    port = os.getenv("STEAMPIPE_DB_PORT", "9193")
+    name = os.getenv("STEAMPIPE_DB_NAME", "steampipe")
+    credentials = f"{user}:{password}" if password else user
+    return f"postgresql://{credentials}@{host}:{port}/{name}"
+
+# ------------------------------------------------------------
+# 풀 지표
+# ------------------------------------------------------------
+class _PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total_sec = 0.0
+        self.wait_max_sec = 0.0
+        self.wait_timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def record_wait(self, sec: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total_sec += sec
+            self.wait_max_sec = max(self.wait_max_sec, sec)
+
+    def incr(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+metrics = _PoolMetrics()
+
+# ------------------------------------------------------------
+# 엔진
+# ------------------------------------------------------------
+_engine: Optional["Engine"] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> "Engine":
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                from sqlalchemy import create_engine, event
+
+                connect_args = {}
+                if STATEMENT_TIMEOUT_MS > 0:
+                    connect_args["options"] = f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"
+                engine = create_engine(
+                    build_url(),
+                    pool_size=POOL_SIZE,
+                    max_overflow=MAX_OVERFLOW,
+                    pool_timeout=POOL_TIMEOUT_SEC,
+                    pool_recycle=POOL_RECYCLE_SEC,
+                    pool_pre_ping=True,
+                    connect_args=connect_args,
+                )
+                event.listen(engine, "connect", lambda *_: metrics.incr("connects"))
+                event.listen(engine, "invalidate", lambda *_: metrics.incr("invalidations"))
+                _engine = engine
+    return _engine
+
+
+def connect():
+    """풀에서 커넥션을 꺼내며 대기 시간을 기록"""
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+    engine = get_engine()
+    started = time.perf_counter()
+    try:
+        conn = engine.connect()
+    except PoolTimeoutError:
+        metrics.incr("wait_timeouts")
+        raise
+    metrics.record_wait(time.perf_counter() - started)
+    return conn
+
+
+def pool_stats() -> Dict[str, Any]:
+    out: Dict[str, Any] = {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "checkouts": metrics.checkouts,
+        "wait_avg_ms": round(metrics.wait_total_sec / metrics.checkouts * 1000, 2) if metrics.checkouts else 0.0,
+        "wait_max_ms": round(metrics.wait_max_sec * 1000, 2),
+        "wait_timeouts": metrics.wait_timeouts,
+        "connects": metrics.connects,
+        "invalidations": metrics.invalidations,
+    }
+    if _engine is not None:
+        from sqlalchemy.pool import QueuePool
+
+        pool = _engine.pool
+        if isinstance(pool, QueuePool):
+            out.update({
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+    return out
+
+# ------------------------------------------------------------
+# 행 디코딩
+# ------------------------------------------------------------
+_PASSTHROUGH_TYPES = (str, int, bool, type(None))
+
+def json_safe(val):
+    """
+    psycopg2가 돌려준 값을 JSON 직렬화 가능한 파이썬 값으로 한 번에 변환.
+    - NaN/inf -> None
+    - Decimal -> int/float, datetime/date/time -> ISO 문자열
+    - JSONB(dict/list)는 재귀적으로 처리
+    """
+    t = type(val)
+    if t in _PASSTHROUGH_TYPES:
+        return val
+    if t is dict:
+        return {k: json_safe(v) for k, v in val.items()}
+    if t is list:
+        return [json_safe(v) for v in val]
+    if t is float:
+        return None if math.isnan(val) or math.isinf(val) else val
+    if isinstance(val, Decimal):
+        if not val.is_finite():
+            return None
+        return int(val) if val == val.to_integral_value() else float(val)
+    if isinstance(val, (datetime, date, dt_time)):
+        return val.isoformat()
+    if isinstance(val, (bytes, bytearray, memoryview)):
+        return bytes(val).hex()
+    if isinstance(val, (str, int)):  # str/int 서브클래스(enum 등)
+        return val
+    if isinstance(val, float):
+        return json_safe(float(val))
+    if isinstance(val, dict):
+        return {k: json_safe(v) for k, v in val.items()}
+    if isinstance(val, (list, tuple, set)):
+        return [json_safe(v) for v in val]
+    return str(val)
+
+def iter_rows(result, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """커서에서 fetchmany 단위로 행을 읽어 JSON-safe dict로 변환해 흘려보낸다."""
+    columns = list(result.keys())
+    while True:
+        batch = result.fetchmany(batch_size)
+        if not batch:
+            break
+        for row in batch:
+            yield {col: json_safe(v) for col, v in zip(columns, row)}
+
+# ------------------------------------------------------------
+# 조회
+# ------------------------------------------------------------
+_TABLE_RE = re.compile(r"\bfrom\s+([A-Za-z_][\w.]*)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def table_of(sql: str) -> str:
+    """메트릭 라벨용: 쿼리의 첫 FROM 테이블 (없으면 "other")"""
+    m = _TABLE_RE.search(sql)
+    return m.group(1).lower() if m else "other"
+
+
+def _observe(sql: str, started: float, rows: Optional[List[Any]]):
+    table = table_of(sql)
+    STEAMPIPE_QUERY_SECONDS.observe(time.perf_counter() - started, table)
+    if rows is None:
+        STEAMPIPE_QUERY_ERRORS.inc(table)
+    else:
+        STEAMPIPE_ROWS.inc(table, amount=len(rows))
+
+
+def query(sql: str, params: Optional[Dict[str, Any]] = None, timeout_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    쿼리 실행 후 JSON-safe dict 목록 반환 (오류는 그대로 올림).
+    timeout_ms를 주면 이 쿼리에만 statement_timeout을 덮어쓴다.
+    """
+    from sqlalchemy import text
+
+    started = time.perf_counter()
+    rows = None
+    try:
+        with connect() as conn:
+            if timeout_ms is not None:
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            result = conn.execution_options(stream_results=True).execute(text(sql), params or {})
+            rows = list(iter_rows(result))
+            return rows
+    finally:
+        _observe(sql, started, rows)
+
+# ------------------------------------------------------------
+# 비동기 조회 (asyncpg)
+# ------------------------------------------------------------
+_apool = None
+_apool_loop = None
+_apool_lock: Optional[asyncio.Lock] = None
+
+# 작은따옴표 문자열과 :: 캐스트는 건너뛰고 :name 바인드만 찾는다
+_BIND_RE = re.compile(r"'(?:[^']|'')*'|::|:([A-Za-z_][A-Za-z0-9_]*)")
+
+
+def to_positional(sql: str, params: Optional[Dict[str, Any]] = None) -> tuple[str, list]:
+    """SQLAlchemy 스타일 :name 바인드를 asyncpg의 $1, $2 ... 로 변환"""
+    order: Dict[str, int] = {}
+
+    def _sub(m):
+        name = m.group(1)
+        if name is None:
+            return m.group(0)
+        if name not in order:
+            order[name] = len(order) + 1
+        return f"${order[name]}"
+
+    converted = _BIND_RE.sub(_sub, sql)
+    params = params or {}
+    missing = [n for n in order if n not in params]
+    if missing:
+        raise KeyError(f"missing bind parameter(s): {', '.join(missing)}")
+    return converted, [params[n] for n in order]
+
+
+async def _init_connection(conn):
+    # asyncpg는 json/jsonb를 문자열로 돌려주므로 psycopg2와 같이 파이썬 객체로 디코딩
+    for typename in ("json", "jsonb"):
+        await conn.set_type_codec(typename, encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+
+async def _get_apool():
+    global _apool, _apool_loop, _apool_lock
+    loop = asyncio.get_running_loop()
+    if _apool_loop is not loop:  # 첫 호출 또는 이벤트 루프가 바뀐 경우
+        _apool, _apool_loop, _apool_lock = None, loop, asyncio.Lock()
+    if _apool is None:
+        async with _apool_lock:
+            if _apool is None:
+                server_settings = {}
+                if STATEMENT_TIMEOUT_MS > 0:
+                    server_settings["statement_timeout"] = str(STATEMENT_TIMEOUT_MS)
+                _apool = await _asyncpg().create_pool(
+                    build_url(),
+                    min_size=1,
+                    max_size=POOL_SIZE + MAX_OVERFLOW,
+                    max_inactive_connection_lifetime=POOL_RECYCLE_SEC,
+                    server_settings=server_settings,
+                    init=_init_connection,
+                )
+    return _apool
+
+
+def async_available() -> bool:
+    return ASYNC_ENABLED and _asyncpg() is not None
+
+
+async def aquery(sql: str, params: Optional[Dict[str, Any]] = None, timeout_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+    """query()의 비동기 버전 (같은 :name 바인드, 같은 JSON-safe 결과)"""
+    if not async_available():
+        return await asyncio.to_thread(query, sql, params, timeout_ms)
+
+    query_started = time.perf_counter()
+    result = None
+    try:
+        result = await _aquery(sql, params, timeout_ms)
+        return result
+    finally:
+        _observe(sql, query_started, result)
+
+
+async def _aquery(sql: str, params: Optional[Dict[str, Any]], timeout_ms: Optional[int]) -> List[Dict[str, Any]]:
+    converted, args = to_positional(sql, params)
+    pool = await _get_apool()
+    started = time.perf_counter()
+    try:
+        conn = await pool.acquire(timeout=POOL_TIMEOUT_SEC)
+    except asyncio.TimeoutError:
+        metrics.incr("wait_timeouts")
+        raise
+    metrics.record_wait(time.perf_counter() - started)
+    try:
+        rows: List[Dict[str, Any]] = []
+        async with conn.transaction(readonly=True):
+            if timeout_ms is not None:
+                await conn.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            async for rec in conn.cursor(converted, *args, prefetch=FETCH_BATCH_SIZE):
+                rows.append({k: json_safe(v) for k, v in rec.items()})
+        return rows
+    finally:
+        await pool.release(conn)
+
+
+async def aping(timeout_sec: float) -> None:
+    """Steampipe가 쿼리에 응답하는지 확인 (실패/시간 초과 시 예외, /ready용)"""
+    await asyncio.wait_for(aquery("select 1"), timeout=timeout_sec)
+
+
+def is_connection_error(e: BaseException) -> bool:
+    """연결 실패/타임아웃 계열 (collector는 빈 결과로 처리)"""
+    if isinstance(e, (OSError, asyncio.TimeoutError)):
+        return True
+    if e.__class__.__module__.startswith("sqlalchemy"):
+        from sqlalchemy.exc import OperationalError
+
+        if isinstance(e, OperationalError):
+            return True
+    if e.__class__.__module__.startswith("asyncpg"):
+        asyncpg = _asyncpg()
+        return isinstance(e, (asyncpg.PostgresConnectionError, asyncpg.InterfaceError, asyncpg.QueryCanceledError))
+    return False
+
+
+async def aclose():
+    global _apool
+    if _apool is not None:
+        await _apool.close()
+        _apool = None
@@ -0,0 +1,202 @@
+# utils/timing.py
+"""
+요청 단위 구간 측정(Server-Timing 헤더)과 관리자용 단일 요청 프로파일링.
+
+- span("collect") / record("collect.s3_buckets", sec): 현재 요청의 구간 목록(ContextVar)에 소요 시간을 남긴다
+  (asyncio.to_thread/create_task는 컨텍스트를 복사하므로 스레드·태스크에서 기록한 구간도 같은 요청 목록에 들어간다)
+- TimingMiddleware: 응답 시작 시점까지 기록된 구간을 `Server-Timing` 헤더로 내보낸다 (같은 이름은 합산, desc="xN")
+- PROFILE_ADMIN_TOKEN이 설정되어 있고 요청에 `X-Profile: cprofile|pyinstrument` + `X-Admin-Token`이 오면
+  그 요청 하나를 프로파일링하고 원래 응답 대신 프로파일 결과(text/plain)를 돌려준다
+
+SERVER_TIMING_ENABLED=false면 미들웨어는 그대로 통과하고 span()은 ContextVar 조회 한 번 후 공용 nullcontext를 돌려준다.
+"""
+from __future__ import annotations
+
+import contextlib
+import hmac
+import io
+import os
+import time
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes")
+# 비어 있으면 프로파일 모드 비활성 (X-Profile 헤더 무시)
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "60"))
+
+_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_spans", default=None)
+_NOOP = contextlib.nullcontext()
+
+
+@contextlib.contextmanager
+def _timed(spans: List[Tuple[str, float]], name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.append((name, time.perf_counter() - started))
+
+
+def span(name: str):
+    """with span("sanitize"): ... (측정 중인 요청 밖이면 아무것도 하지 않음)"""
+    spans = _spans.get()
+    if spans is None:
+        return _NOOP
+    return _timed(spans, name)
+
+
+def record(name: str, seconds: float):
+    """이미 잰 소요 시간을 현재 요청 구간에 추가"""
+    spans = _spans.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+def server_timing_header(spans: List[Tuple[str, float]], total: float) -> str:
+    # 같은 이름(리전 fan-out, 반복 호출 등)은 합산해 헤더 길이가 호출 수에 비례해 늘지 않게 한다
+    merged: dict[str, list] = {}
+    for name, seconds in list(spans):
+        entry = merged.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    parts = []
+    for name, (seconds, count) in merged.items():
+        part = f"{name};dur={seconds * 1000:.1f}"
+        if count > 1:
+            part += f';desc="x{count}"'
+        parts.append(part)
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+# ------------------------------------------------------------
+# 프로파일러 (요청 하나를 감싸 실행)
+# ------------------------------------------------------------
+def _cprofile_runner():
+    import cProfile
+    import pstats
+
+    prof = cProfile.Profile()
+
+    def report() -> str:
+        out = io.StringIO()
+        pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+        return out.getvalue()
+
+    return prof.enable, prof.disable, report
+
+
+def _pyinstrument_runner():
+    from pyinstrument import Profiler  # 선택 의존성
+
+    prof = Profiler(async_mode="enabled")
+    return prof.start, prof.stop, lambda: prof.output_text(unicode=True, color=False)
+
+
+PROFILERS = {"cprofile": _cprofile_runner, "pyinstrument": _pyinstrument_runner}
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers") or ():
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _send_text(send, status: int, text: str, extra_headers: Optional[list] = None):
+    body = text.encode("utf-8")
+    headers = [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers + (extra_headers or [])})
+    await send({"type": "http.response.body", "body": body})
+
+
+# ------------------------------------------------------------
+# ASGI 미들웨어
+# ------------------------------------------------------------
+class TimingMiddleware:
+    """
+    Server-Timing은 http.response.start에 붙이므로 스트리밍 응답은 본문 전송 전 구간(설정/첫 조회)까지만 담긴다.
+    프로파일 모드:
+    - cprofile: 이벤트 루프 스레드에서 실행된 코드 전체(같은 시간대의 다른 요청 포함)가 잡히고 to_thread 작업은 빠진다
+    - pyinstrument(설치 시): async 인식 샘플러라 await 구간이 요청 단위로 묶인다
+    - 동시에 하나만 실행 (진행 중이면 409)
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._profiling = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not SERVER_TIMING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        if PROFILE_ADMIN_TOKEN:
+            mode = _header(scope, b"x-profile")
+            if mode:
+                await self._profile(scope, receive, send, mode.strip().lower())
+                return
+
+        await self._timed(scope, receive, send)
+
+    async def _timed(self, scope, receive, send):
+        spans: List[Tuple[str, float]] = []
+        token = _spans.set(spans)
+        started = time.perf_counter()
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                value = server_timing_header(spans, time.perf_counter() - started)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", value.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _spans.reset(token)
+
+    async def _profile(self, scope, receive, send, mode: str):
+        if not hmac.compare_digest((_header(scope, b"x-admin-token") or "").encode(), PROFILE_ADMIN_TOKEN.encode()):
+            await _send_text(send, 403, "invalid admin token\n")
+            return
+        runner = PROFILERS.get(mode)
+        if runner is None:
+            await _send_text(send, 400, f"unknown profiler: {mode} (supported: {', '.join(PROFILERS)})\n")
+            return
+        try:
+            start, stop, report = runner()
+        except ImportError as e:
+            await _send_text(send, 501, f"{mode} is not installed: {e}\n")
+            return
+        if self._profiling:
+            await _send_text(send, 409, "another profile is in progress\n")
+            return
+
+        # 원래 응답은 버리고 상태 코드/바이트 수만 남긴다
+        result = {"status": 500, "bytes": 0, "server_timing": b""}
+
+        async def _discard(message):
+            if message["type"] == "http.response.start":
+                result["status"] = message["status"]
+                for key, value in message.get("headers", []):
+                    if key == b"server-timing":
+                        result["server_timing"] = value
+            elif message["type"] == "http.response.body":
+                result["bytes"] += len(message.get("body", b""))
+
+        self._profiling = True
+        start()
+        try:
+            await self._timed(scope, receive, _discard)
+        finally:
+            stop()
+            self._profiling = False
+
+        headers = [
+            (b"x-profiled-status", str(result["status"]).encode()),
+            (b"x-profiled-bytes", str(result["bytes"]).encode()),
+        ]
+        if result["server_timing"]:
+            headers.append((b"server-timing", result["server_timing"]))
+        await _send_text(send, 200, report(), headers)